@@ -5,6 +5,7 @@ from config import config
 from app.extensions import register_extensions
 from app.errors import register_error_handlers
 from app.api import register_blueprints
+from app.commands import register_commands
 
 def create_app(config_name='default'):
     if config_name is None:
@@ -20,5 +21,6 @@ def create_app(config_name='default'):
     from app import models
 
     register_blueprints(app)
+    register_commands(app)
     
     return app
\ No newline at end of file
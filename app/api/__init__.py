@@ -9,6 +9,8 @@ from .interactions import interactions_bp
 from .explore import explore_bp
 from .search import search_bp
 from .wrapped import wrapped_bp
+from .metrics import metrics_bp
+from .jobs import jobs_bp
 
 def register_blueprints(app):
     """Registra todos os blueprints da aplicação."""
@@ -22,4 +24,6 @@ def register_blueprints(app):
     app.register_blueprint(interactions_bp)
     app.register_blueprint(explore_bp)
     app.register_blueprint(search_bp)
-    app.register_blueprint(wrapped_bp)
\ No newline at end of file
+    app.register_blueprint(wrapped_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(jobs_bp)
\ No newline at end of file
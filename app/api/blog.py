@@ -1,7 +1,7 @@
 from flask import Blueprint, request
 from app.services import BlogService
 from app.schemas import PostCreate, PostUpdate
-from app.utils import success_response, require_auth
+from app.utils import success_response, cursor_response, require_auth, is_cursor_request, parse_cursor_args
 
 blog_bp = Blueprint('blog', __name__, url_prefix='/api/blog')
 
@@ -10,7 +10,13 @@ def list_posts():
     """
     Lista os posts publicados.
     Público: Qualquer um pode ver.
+    Com ?cursor=...&limit=... a paginação é por cursor (sem OFFSET).
     """
+    if is_cursor_request(request.args):
+        args = parse_cursor_args(request.args)
+        page = BlogService.list_posts_cursor(args.cursor, args.limit, public_only=True, include_total=args.include_total)
+        return cursor_response(page, message="Posts listados com sucesso.")
+
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     
@@ -26,6 +32,12 @@ def list_posts():
 @require_auth
 def list_my_posts(current_user):
     status = request.args.get('status', None)
+
+    if is_cursor_request(request.args):
+        args = parse_cursor_args(request.args)
+        page = BlogService.list_user_posts_cursor(current_user, args.cursor, args.limit, status, args.include_total)
+        return cursor_response(page, message="Posts listados com sucesso.")
+
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     
@@ -1,13 +1,22 @@
-from flask import Blueprint
-from app.utils import success_response, require_auth
+from flask import Blueprint, request
+from pydantic import ValidationError
+from app.utils import success_response, cursor_response, require_auth, is_cursor_request, parse_cursor_args
+from app.schemas import ExploreWindowQuery
 from app.services.explore_service import ExploreService
+from app.exceptions import BusinessRuleError
 
 explore_bp = Blueprint('explore', __name__, url_prefix='/api/explore')
 
+def _parse_window() -> ExploreWindowQuery:
+    try:
+        return ExploreWindowQuery.model_validate(request.args.to_dict())
+    except ValidationError:
+        raise BusinessRuleError("Parâmetro 'window' inválido. Use 24h, 7d ou 30d.")
+
 @explore_bp.route('/trending', methods=['GET'])
 def get_trending():
-    """Álbuns em alta na comunidade."""
-    data = ExploreService.get_trending_albums()
+    """Álbuns em alta na comunidade (?window=24h|7d|30d)."""
+    data = ExploreService.get_trending_albums(window=_parse_window().window)
     return success_response(data=data, message="Álbuns em alta recuperados.")
 
 @explore_bp.route('/hall-of-fame', methods=['GET'])
@@ -18,14 +27,19 @@ def get_hall_of_fame():
 
 @explore_bp.route('/feed', methods=['GET'])
 def get_global_feed():
-    """Feed de reviews recentes da comunidade."""
+    """Feed de reviews recentes da comunidade (com ?cursor/&limit, paginado por cursor)."""
+    if is_cursor_request(request.args):
+        args = parse_cursor_args(request.args)
+        page = ExploreService.get_global_feed_page(args.cursor, args.limit, args.include_total)
+        return cursor_response(page, message="Feed global recuperado.")
+
     data = ExploreService.get_global_feed()
     return success_response(data=data, message="Feed global recuperado.")
 
 @explore_bp.route('/top-reviewers', methods=['GET'])
 def get_top_reviewers():
-    """Usuários mais ativos da semana."""
-    data = ExploreService.get_top_reviewers()
+    """Usuários mais ativos na janela (?window=24h|7d|30d, padrão 7d)."""
+    data = ExploreService.get_top_reviewers(window=_parse_window().window)
     return success_response(data=data, message="Top avaliadores recuperados.")
 
 @explore_bp.route('/bubble', methods=['GET'])
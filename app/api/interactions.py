@@ -2,7 +2,7 @@ from flask import Blueprint, request
 from pydantic import ValidationError
 
 from app.services import InteractionService
-from app.utils import require_auth, success_response, paginated_response
+from app.utils import require_auth, success_response, paginated_response, cursor_response, is_cursor_request, parse_cursor_args
 from app.schemas import CommentCreate, VoteCreate
 from app.exceptions import BusinessRuleError
 
@@ -32,16 +32,27 @@ def create_comment(current_user):
 
 @interactions_bp.route('/<string:target_type>/<uuid:target_id>/comments', methods=['GET'])
 def get_comments(target_type, target_id):
-    """Busca os comentários de algo (paginado)."""
+    """Busca os comentários de algo (paginado por página ou, com ?cursor/&limit, por cursor)."""
+    if is_cursor_request(request.args):
+        args = parse_cursor_args(request.args)
+        page = InteractionService.get_comments_cursor(str(target_id), target_type, args.cursor, args.limit, args.include_total)
+        return cursor_response(page, message="Comentários recuperados com sucesso.")
+
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     
     pagination = InteractionService.get_comments(str(target_id), target_type, page, per_page)
     
-    # Converte os objetos do banco para dicionários para o JSON não quebrar
-    pagination.items = [item.to_dict() for item in pagination.items]
-    
-    return paginated_response(pagination, message="Comentários recuperados com sucesso.")
+    # O Service já devolve os itens como dicionários
+    return paginated_response({
+        "items": pagination.items,
+        "page": pagination.page,
+        "per_page": per_page,
+        "total": pagination.total,
+        "pages": pagination.pages,
+        "has_next": pagination.page < pagination.pages,
+        "has_prev": pagination.page > 1
+    }, message="Comentários recuperados com sucesso.")
 
 @interactions_bp.route('/comment/<uuid:comment_id>', methods=['DELETE'])
 @require_auth
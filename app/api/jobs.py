@@ -0,0 +1,15 @@
+from flask import Blueprint
+from app.utils import success_response, require_auth
+from app.services.job_service import JobService
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+@jobs_bp.route('/<path:job_id>', methods=['GET'])
+@require_auth
+def get_job_status(current_user, job_id):
+    """
+    Status de um job em segundo plano (queued, running, done, failed).
+    Uso: GET /api/jobs/sync_artist_discography:4xWY...
+    """
+    job = JobService.get_status(job_id)
+    return success_response(data=job, message="Status do job recuperado.")
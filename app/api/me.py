@@ -1,6 +1,6 @@
 from flask import Blueprint, request
 from app.utils import success_response, require_auth, ensure_spotify_token
-from app.services import SpotifyService, MetaService, StatsService
+from app.services import SpotifyService, MetaService, StatsService, UserService
 from app.exceptions import BusinessRuleError
 
 me_bp = Blueprint('me', __name__, url_prefix='/api/me')
@@ -102,4 +102,22 @@ def generate_my_title(current_user):
     return success_response(
         data=meta.to_dict(),
         message=f"Título '{meta.title}' gerado com sucesso!"
-    )
\ No newline at end of file
+    )
+
+@me_bp.route('/timezone', methods=['PUT'])
+@require_auth
+def set_my_timezone(current_user):
+    """
+    Define o fuso usado no calendário, no título automático e no Wrapped.
+    Payload esperado: {"timezone": "America/Sao_Paulo"} (null volta pra UTC)
+    """
+    payload = request.json or {}
+    if 'timezone' not in payload:
+        raise BusinessRuleError("Parâmetro 'timezone' é obrigatório no JSON.")
+
+    tz_name = UserService.set_timezone(current_user, payload.get('timezone'))
+
+    return success_response(
+        data={"timezone": tz_name},
+        message="Fuso horário atualizado com sucesso!"
+    )
@@ -0,0 +1,30 @@
+from flask import Blueprint
+from app.utils import success_response, require_admin
+from app.utils import metrics_util, cache_util
+from app.services.spotify_service import SpotifyService
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+
+@metrics_bp.route('', methods=['GET'])
+@require_admin
+def get_metrics(current_user):
+    """Métricas internas deste worker (contadores, medidas e tempos)."""
+    return success_response(data=metrics_util.snapshot(), message="Métricas recuperadas.")
+
+@metrics_bp.route('/spotify', methods=['GET'])
+@require_admin
+def get_spotify_metrics(current_user):
+    """Governador de taxa, token da aplicação, registro de clientes e chamadas coalescidas."""
+    data = {
+        "governor": SpotifyService.get_governor_stats(),
+        "app_client": SpotifyService.get_app_client_stats(),
+        "user_clients": SpotifyService.get_user_client_stats(),
+        "single_flight": metrics_util.snapshot('singleflight')['counters']
+    }
+    return success_response(data=data, message="Métricas do Spotify recuperadas.")
+
+@metrics_bp.route('/cache', methods=['GET'])
+@require_admin
+def get_cache_metrics(current_user):
+    """Taxa de acerto por camada do cache (L1 em memória e L2 compartilhado)."""
+    return success_response(data=cache_util.stats(), message="Métricas do cache recuperadas.")
@@ -1,6 +1,6 @@
 from flask import Blueprint, request
 from pydantic import ValidationError
-from app.utils import success_response, require_auth, paginated_response, resolve_target_user 
+from app.utils import success_response, require_auth, paginated_response, cursor_response, resolve_target_user, is_cursor_request, parse_cursor_args
 from app.models import UserPlatinum
 from app.services import UserService, ReviewService, StatsService, MetaService
 from app.schemas import PlatinumTrophyOutput, UserStatsOutput
@@ -50,12 +50,27 @@ def get_user_reviews(current_user, user_param):
     except ValidationError as e:
         raise BusinessRuleError(f"Parâmetros de busca inválidos.")
 
+    filters = query_data.model_dump(exclude={'page', 'per_page'}, exclude_none=True)
+
+    # Com ?cursor/&limit, paginação por cursor (sem OFFSET nem COUNT)
+    if is_cursor_request(request.args):
+        args = parse_cursor_args(request.args)
+        page = ReviewService.get_reviews_cursor(
+            user_id=target_id,
+            cursor=args.cursor,
+            limit=args.limit,
+            filters=filters,
+            request_user_id=req_user_id,
+            include_total=args.include_total
+        )
+        return cursor_response(page, message="Histórico recuperado com sucesso.")
+
     # Passamos os filtros limpinhos pro Service
     pagination = ReviewService.get_reviews(
         user_id=target_id,
         page=query_data.page,
         per_page=query_data.per_page,
-        filters=query_data.model_dump(exclude={'page', 'per_page'}, exclude_none=True),
+        filters=filters,
         request_user_id=req_user_id
     )
     
@@ -0,0 +1,115 @@
+import click
+from flask.cli import AppGroup
+from app.extensions import db
+from app.services.job_service import JobService
+from app.services.album_stats_service import AlbumStatsService
+from app.services.activity_service import ActivityService
+from app.services.user_stats_service import UserStatsService
+from app.services.user_service import UserService
+from app.services.search_service import SearchService
+from app.constants import ACTIVITY_RETENTION_DAYS
+from app.utils.redis_util import get_redis
+
+jobs_cli = AppGroup('jobs', help='Fila de jobs em segundo plano.')
+
+@jobs_cli.command('worker')
+@click.option('--burst', is_flag=True, help='Processa o que estiver na fila e sai.')
+def jobs_worker(burst):
+    """
+    Worker dedicado da fila de jobs. Com REDIS_URL, consome a fila compartilhada
+    pelos workers web. Uso: flask jobs worker
+    """
+    # Sem Redis a fila é em memória: cada processo web consome a sua e este worker nunca veria nada
+    if get_redis() is None:
+        raise click.ClickException("REDIS_URL não configurado: a fila é em memória, por processo. O worker dedicado precisa do Redis.")
+    click.echo("Worker de jobs iniciado.")
+    processed = JobService.run_worker(burst=burst)
+    click.echo(f"{processed} job(s) processado(s).")
+
+maintenance_cli = AppGroup('maintenance', help='Tarefas de manutenção do banco.')
+
+@maintenance_cli.command('rebuild-album-stats')
+def rebuild_album_stats():
+    """
+    Recalcula a tabela album_stats a partir das reviews (backfill ou correção).
+    Uso: flask maintenance rebuild-album-stats
+    """
+    total = AlbumStatsService.rebuild()
+    db.session.commit()
+    click.echo(f"{total} álbum(ns) recalculado(s).")
+
+@maintenance_cli.command('prune-activity')
+@click.option('--keep-days', default=ACTIVITY_RETENTION_DAYS, show_default=True, help='Dias de baldes diários mantidos.')
+def prune_activity(keep_days):
+    """
+    Apaga os baldes diários de atividade mais antigos que a maior janela do explore.
+    Uso: flask maintenance prune-activity
+    """
+    removed = ActivityService.prune(keep_days)
+    db.session.commit()
+    click.echo(f"{removed} balde(s) removido(s).")
+
+@maintenance_cli.command('rebuild-user-stats')
+def rebuild_user_stats():
+    """
+    Recalcula os retratos de estatísticas de perfil (user_stats) de todos os usuários.
+    Uso: flask maintenance rebuild-user-stats
+    """
+    total = UserStatsService.rebuild()
+    db.session.commit()
+    click.echo(f"{total} usuário(s) recalculado(s).")
+
+@maintenance_cli.command('check-user-stats')
+@click.option('--user-id', 'user_ids', multiple=True, help='Confere só esse(s) usuário(s).')
+@click.option('--fix', is_flag=True, help='Recalcula os usuários com divergência.')
+def check_user_stats(user_ids, fix):
+    """
+    Compara user_stats com o recalculado a partir das reviews e platinas.
+    Sai com código 1 se encontrar divergência (e não tiver sido corrigida com --fix).
+    Uso: flask maintenance check-user-stats [--fix]
+    """
+    issues = UserStatsService.check(list(user_ids) or None)
+    for issue in issues:
+        view = 'público' if issue['is_public_view'] else 'dono'
+        if issue['field'] is None:
+            click.echo(f"{issue['user_id']} ({view}): retrato ausente")
+        else:
+            click.echo(f"{issue['user_id']} ({view}): {issue['field']} = {issue['stored']}, esperado {issue['expected']}")
+
+    if not issues:
+        click.echo("user_stats consistente.")
+        return
+
+    if fix:
+        for user_id in {issue['user_id'] for issue in issues}:
+            UserStatsService.refresh(user_id)
+        db.session.commit()
+        click.echo(f"{len({issue['user_id'] for issue in issues})} usuário(s) corrigido(s).")
+    else:
+        raise SystemExit(1)
+
+@maintenance_cli.command('reconcile-user-counters')
+def reconcile_user_counters():
+    """
+    Recalcula os contadores de atividade em users (reviews, platinas, posts,
+    comentários e votos) e corrige os que divergiram.
+    Uso: flask maintenance reconcile-user-counters
+    """
+    fixed = UserService.reconcile_counters()
+    db.session.commit()
+    click.echo(f"{fixed} usuário(s) corrigido(s).")
+
+@maintenance_cli.command('rebuild-search-index')
+def rebuild_search_index():
+    """
+    Recalcula as colunas de busca normalizadas (reviews e usuários).
+    Uso: flask maintenance rebuild-search-index
+    """
+    updated = SearchService.rebuild_index()
+    db.session.commit()
+    click.echo(f"{updated} linha(s) atualizada(s).")
+
+def register_commands(app):
+    """Registra os comandos de CLI da aplicação (flask <grupo> <comando>)."""
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(maintenance_cli)
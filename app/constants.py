@@ -11,6 +11,20 @@ HALL_OF_FAME_MIN_REVIEWS = 3
 # Quantidade de dias máximo em que um dia pode ser considerado tendência (está em alta). 
 TRENDING_DAYS_LIMIT = 7
 
+# Janelas aceitas no parâmetro 'window' do explore (em alta e top avaliadores), em dias.
+# Os contadores são baldes diários em UTC e a janela é móvel (N x 24h): soma o balde de
+# hoje e os dos N-1 dias anteriores inteiros, mais o do dia N atrás pela fração dele que
+# ainda cai na janela (às 06:00, o '24h' é o balde de hoje + 75% do de ontem).
+TRENDING_WINDOWS = {'24h': 1, '7d': TRENDING_DAYS_LIMIT, '30d': 30}
+TRENDING_DEFAULT_WINDOW = '7d'
+
+# Por quantos dias os baldes diários são mantidos antes do 'flask maintenance prune-activity'.
+# Precisa cobrir a maior janela acima.
+ACTIVITY_RETENTION_DAYS = 35
+
+# Quantos artistas mais avaliados ficam guardados no retrato de estatísticas do perfil (user_stats).
+USER_STATS_TOP_ARTISTS = 5
+
 # Regras para classificar os tiers, calculada para cada review e armazenada para
 # a tier list automática. Se baseia na nota de 0 a 10 e atribui essas classes 
 # para cada álbum, que podem ser usadas para criar uma tier list automática. Ela
@@ -148,4 +162,13 @@ MESES = {
         1: "Janeiro", 2: "Fevereiro", 3: "Março", 4: "Abril",
         5: "Maio", 6: "Junho", 7: "Julho", 8: "Agosto",
         9: "Setembro", 10: "Outubro", 11: "Novembro", 12: "Dezembro"
-    }
\ No newline at end of file
+    }
+
+# Limites dos endpoints de vários IDs do Spotify. Usados na sincronização em lote
+# para buscar muitos álbuns/artistas com o mínimo de chamadas possível.
+SPOTIFY_ALBUMS_BATCH_SIZE = 20
+SPOTIFY_ARTISTS_BATCH_SIZE = 50
+
+# Status da sincronização da discografia devolvido na página do artista. Enquanto o
+# job não termina, vem o status dele ('queued', 'running' ou 'failed').
+SYNC_STATUS_SYNCED = 'synced'
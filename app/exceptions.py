@@ -41,6 +41,13 @@ class SpotifyAPIError(EscutasError):
         super().__init__(message, status_code=status_code)
 
 
+# --- Exceções de Infraestrutura (500) ---
+
+class UnsupportedDatabaseError(EscutasError):
+    def __init__(self, dialect: str):
+        super().__init__(f"Operação não suportada no banco '{dialect}'.", status_code=500)
+
+
 # --- Exceções de Regra de Negócio (400) ---
 
 class BusinessRuleError(EscutasError):
@@ -1,23 +1,29 @@
 from .album_track import AlbumTrack
 from .album import Album
+from .album_stats import AlbumStats
 from .artist import Artist
 from .curation import AlbumCurationVote
 from .custom_album_track import CustomAlbumTrack
 from .custom_album import CustomAlbum
+from .daily_activity import AlbumDailyActivity, UserDailyActivity
 from .interaction import Comment, Vote
 from .monthly_meta import MonthlyMeta
 from .platinum import UserPlatinum
 from .post import BlogPost, BlogPostMention
 from .review import AlbumReview, TrackReview
 from .user import User
+from .user_stats import UserStats
 
 __all__ = [
     'AlbumTrack',
     'Album',
+    'AlbumStats',
     'Artist',
     'AlbumCurationVote',
     'CustomAlbumTrack',
     'CustomAlbum',
+    'AlbumDailyActivity',
+    'UserDailyActivity',
     'Comment',
     'Vote',
     'MonthlyMeta',
@@ -26,5 +32,6 @@ __all__ = [
     'BlogPostMention',
     'AlbumReview', 
     'TrackReview', 
-    'User'
+    'User',
+    'UserStats'
 ]
\ No newline at end of file
@@ -3,6 +3,7 @@ from datetime import datetime, timezone
 from app.extensions import db
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy import String
+from sqlalchemy.orm import validates
 
 class Album(db.Model):
     __tablename__ = 'albums'
@@ -12,10 +13,14 @@ class Album(db.Model):
     name = db.Column(db.String(300), nullable=False)
     clean_name = db.Column(db.String(300), nullable=True)
     artist_name = db.Column(db.String(200), nullable=False)
+    # Título limpo + artista normalizados (minúsculo, sem acento) pra busca local do catálogo
+    search_text = db.Column(db.Text, nullable=True)
     artist_spotify_id = db.Column(db.String(100), db.ForeignKey('artists.spotify_artist_id'), nullable=True, index=True)
     cover_url = db.Column(db.String(500), nullable=True)
     release_date = db.Column(db.String(20), nullable=True)
     total_tracks = db.Column(db.Integer, nullable=True)
+    # 'album', 'single' ou 'compilation', como vem do Spotify (vazio nas linhas de antes da coluna)
+    album_type = db.Column(db.String(20), nullable=True)
     is_canonical = db.Column(db.Boolean, default=True)
     genres = db.Column(ARRAY(String), nullable=True)
     last_synced_at = db.Column(db.DateTime, nullable=True)
@@ -23,6 +28,19 @@ class Album(db.Model):
 
     tracks = db.relationship('AlbumTrack', backref='album', lazy=True)
 
+    __table_args__ = (
+        # Autocomplete por trecho do nome (LIKE '%termo%' e similaridade) via pg_trgm
+        db.Index('idx_albums_search_trgm', 'search_text', postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'}),
+    )
+
+    @validates('name', 'clean_name', 'artist_name')
+    def _sync_search_text(self, key, value):
+        """Mantém o search_text em dia sempre que o título ou o artista muda."""
+        from app.utils.search_util import normalize_search_text
+        names = {'name': self.name, 'clean_name': self.clean_name, 'artist_name': self.artist_name, key: value}
+        self.search_text = normalize_search_text(names['clean_name'] or names['name'], names['artist_name'])
+        return value
+
     def needs_sync(self, days=30) -> bool:
         if not self.last_synced_at:
             return True
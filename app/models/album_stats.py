@@ -0,0 +1,38 @@
+from app.extensions import db
+from datetime import datetime, timezone
+
+class AlbumStats(db.Model):
+    """
+    Agregado das reviews de cada álbum, atualizado na mesma transação das reviews.
+    O explore (hall da fama, em alta, bolha) lê daqui em vez de agrupar album_reviews.
+    Colunas public_* consideram só reviews públicas.
+    """
+    __tablename__ = 'album_stats'
+
+    spotify_album_id = db.Column(db.String(100), primary_key=True)
+
+    # Dados do álbum copiados da review mais recente (evita join/agrupamento por texto)
+    album_name = db.Column(db.String(255), nullable=False)
+    artist_name = db.Column(db.String(255), nullable=False)
+    cover_url = db.Column(db.String(500), nullable=True)
+
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    tier_s_count = db.Column(db.Integer, nullable=False, default=0)
+    last_review_at = db.Column(db.DateTime, nullable=True)
+
+    public_review_count = db.Column(db.Integer, nullable=False, default=0)
+    public_score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    # Reviews públicas com nota: divisor da média (review sem nota não puxa a média pra 0, como no AVG)
+    public_scored_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    public_tier_s_count = db.Column(db.Integer, nullable=False, default=0)
+    public_average_score = db.Column(db.Float, nullable=False, default=0.0)
+    last_public_review_at = db.Column(db.DateTime, nullable=True)
+
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.Index('idx_album_stats_public_average', 'public_average_score', 'public_review_count'),
+        db.Index('idx_album_stats_public_tier_s', 'public_tier_s_count'),
+        db.Index('idx_album_stats_last_public_review', 'last_public_review_at'),
+    )
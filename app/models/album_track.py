@@ -1,6 +1,7 @@
 import uuid
 from app.extensions import db
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import validates
 
 class AlbumTrack(db.Model):
     __tablename__ = 'album_tracks'
@@ -9,10 +10,27 @@ class AlbumTrack(db.Model):
     spotify_track_id = db.Column(db.String(100), nullable=False, index=True)
     album_spotify_id = db.Column(db.String(100), db.ForeignKey('albums.spotify_album_id'), nullable=False, index=True)
     name = db.Column(db.String(300), nullable=False)
+    # name normalizado (minúsculo, sem acento) pra busca local do catálogo.
+    # O upsert em lote da sincronização (fora do ORM) preenche direto com normalize_search_text
+    search_name = db.Column(db.String(300), nullable=True)
     track_number = db.Column(db.Integer, nullable=False)
     duration_ms = db.Column(db.Integer, nullable=True)
     preview_url = db.Column(db.String(500), nullable=True)
     suggested_ignore = db.Column(db.Boolean, default=False)
 
+    __table_args__ = (
+        # Chave do upsert em lote da sincronização: a mesma faixa só aparece uma vez por álbum
+        db.UniqueConstraint('album_spotify_id', 'spotify_track_id', name='uix_album_track'),
+        # Autocomplete por trecho do nome (LIKE '%termo%' e similaridade) via pg_trgm
+        db.Index('idx_album_tracks_search_trgm', 'search_name', postgresql_using='gin', postgresql_ops={'search_name': 'gin_trgm_ops'}),
+    )
+
+    @validates('name')
+    def _sync_search_name(self, key, value):
+        """Mantém o search_name em dia sempre que o nome muda."""
+        from app.utils.search_util import normalize_search_text
+        self.search_name = normalize_search_text(value)
+        return value
+
     def __repr__(self):
         return f'<AlbumTrack {self.name}>'
\ No newline at end of file
@@ -3,6 +3,7 @@ from datetime import datetime, timezone
 from app.extensions import db
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy import String
+from sqlalchemy.orm import validates
 
 class Artist(db.Model):
     __tablename__ = 'artists'
@@ -10,19 +11,40 @@ class Artist(db.Model):
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     spotify_artist_id = db.Column(db.String(100), unique=True, nullable=False, index=True)
     name = db.Column(db.String(200), nullable=False)
+    # name normalizado (minúsculo, sem acento) pra busca local do catálogo
+    search_name = db.Column(db.String(200), nullable=True)
     image_url = db.Column(db.String(500), nullable=True)
     genres = db.Column(ARRAY(String), nullable=True)
     genres_synced_at = db.Column(db.DateTime, nullable=True)
     last_synced_at = db.Column(db.DateTime, nullable=True)
+    discography_synced_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
     albums = db.relationship('Album', backref='artist', lazy=True)
 
+    __table_args__ = (
+        # Autocomplete por trecho do nome (LIKE '%termo%' e similaridade) via pg_trgm
+        db.Index('idx_artists_search_trgm', 'search_name', postgresql_using='gin', postgresql_ops={'search_name': 'gin_trgm_ops'}),
+    )
+
+    @validates('name')
+    def _sync_search_name(self, key, value):
+        """Mantém o search_name em dia sempre que o nome muda."""
+        from app.utils.search_util import normalize_search_text
+        self.search_name = normalize_search_text(value)
+        return value
+
     def needs_sync(self, days=30) -> bool:
         if not self.last_synced_at:
             return True
         delta = datetime.now(timezone.utc) - self.last_synced_at.replace(tzinfo=timezone.utc)
         return delta.days >= days
 
+    def needs_discography_sync(self, days=30) -> bool:
+        if not self.discography_synced_at:
+            return True
+        delta = datetime.now(timezone.utc) - self.discography_synced_at.replace(tzinfo=timezone.utc)
+        return delta.days >= days
+
     def __repr__(self):
         return f'<Artist {self.name}>'
\ No newline at end of file
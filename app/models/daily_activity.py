@@ -0,0 +1,31 @@
+from app.extensions import db
+from sqlalchemy.dialects.postgresql import UUID
+
+class AlbumDailyActivity(db.Model):
+    """
+    Reviews públicas de um álbum em um dia (UTC). O 'em alta' de uma janela
+    soma no máximo um balde por dia, em vez de varrer album_reviews.
+    """
+    __tablename__ = 'album_daily_activity'
+
+    spotify_album_id = db.Column(db.String(100), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    public_review_count = db.Column(db.Integer, nullable=False, default=0)
+    public_score_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.Index('idx_album_daily_activity_day', 'day'),
+    )
+
+
+class UserDailyActivity(db.Model):
+    """Reviews públicas de um usuário em um dia (UTC), para o ranking de avaliadores."""
+    __tablename__ = 'user_daily_activity'
+
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id', ondelete="CASCADE"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    public_review_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('idx_user_daily_activity_day', 'day'),
+    )
@@ -24,6 +24,11 @@ class Comment(db.Model):
     # Relacionamento para acessar os dados do autor facilmente
     author = db.relationship('User', backref=db.backref('comments', lazy=True))
 
+    __table_args__ = (
+        # Comentários de um alvo paginados por cursor (created_at, id)
+        db.Index('idx_comments_target_created', 'target_id', 'target_type', 'created_at', 'id'),
+    )
+
     def to_dict(self):
         return {
             "id": str(self.id),
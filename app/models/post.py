@@ -37,6 +37,12 @@ class BlogPost(db.Model):
     author = db.relationship('User', backref='posts', lazy=True)
     mentions = db.relationship('BlogPostMention', backref='post', cascade="all, delete-orphan", lazy=True)
 
+    __table_args__ = (
+        # Listagens paginadas por cursor (created_at, id)
+        db.Index('idx_blog_posts_status_created', 'status', 'created_at', 'id'),
+        db.Index('idx_blog_posts_user_created', 'user_id', 'created_at', 'id'),
+    )
+
     def to_dict(self):
         return {
             'id': str(self.id),
@@ -1,11 +1,23 @@
 from datetime import datetime, timezone
 from app.extensions import db
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import validates
 import uuid
 
 # IMPORTANDO A NOSSA CONSTANTE!
 from app.constants import calculate_tier
 
+def summarize_track_scores(valid_scores: list) -> tuple:
+    """
+    Média (1 casa) e Tier a partir das notas das faixas válidas (não ignoradas).
+    Sem nenhuma faixa válida, zera com Tier 'E' (o Service impede de chegar aqui).
+    """
+    if not valid_scores:
+        return 0.0, 'E'
+
+    average_score = round(sum(valid_scores) / len(valid_scores), 1)
+    return average_score, calculate_tier(average_score)
+
 class AlbumReview(db.Model):
     __tablename__ = 'album_reviews'
 
@@ -14,6 +26,8 @@ class AlbumReview(db.Model):
     spotify_album_id = db.Column(db.String(100), nullable=False, index=True)
     album_name = db.Column(db.String(255), nullable=False)
     artist_name = db.Column(db.String(255), nullable=False)
+    # Álbum + artista normalizados (minúsculo, sem acento) pra busca por trecho do nome
+    search_text = db.Column(db.Text, nullable=True)
     cover_url = db.Column(db.String(500), nullable=True)
     is_private = db.Column(db.Boolean, default=False)
     artist_genres = db.Column(db.JSON, nullable=True, default=list)
@@ -35,30 +49,25 @@ class AlbumReview(db.Model):
     __table_args__ = (
         db.Index('idx_reviews_user_date', 'user_id', 'created_at'),
         db.Index('idx_reviews_spotify_album', 'spotify_album_id'),
+        # Feed global paginado por cursor (created_at, id)
+        db.Index('idx_reviews_public_feed', 'is_private', 'created_at', 'id'),
+        # Busca por trecho (LIKE '%termo%' e similaridade) via pg_trgm
+        db.Index('idx_reviews_search_trgm', 'search_text', postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'}),
     )
 
+    @validates('album_name', 'artist_name')
+    def _sync_search_text(self, key, value):
+        """Mantém o search_text em dia sempre que o nome do álbum ou do artista muda."""
+        from app.utils.search_util import normalize_search_text
+        names = {'album_name': self.album_name, 'artist_name': self.artist_name, key: value}
+        self.search_text = normalize_search_text(names['album_name'], names['artist_name'])
+        return value
+
     def update_stats(self):
         """Recalcula a média e o Tier baseada APENAS nas faixas válidas."""
-        if not self.tracks:
-            self.average_score = 0.0
-            self.tier = 'E'
-            return
-
         # Filtra apenas as faixas que NÃO foram ignoradas
-        valid_tracks = [t for t in self.tracks if not t.is_ignored]
-        
-        # Trava de segurança no banco: se ignoraram tudo, zera (mas o Service vai impedir de chegar aqui)
-        if not valid_tracks:
-            self.average_score = 0.0
-            self.tier = 'E'
-            return
-
-        total = sum(t.score for t in valid_tracks)
-        self.average_score = round(total / len(valid_tracks), 1)
-        
-        # Tier
-        from app.constants import calculate_tier
-        self.tier = calculate_tier(self.average_score)
+        valid_scores = [t.score for t in self.tracks if not t.is_ignored]
+        self.average_score, self.tier = summarize_track_scores(valid_scores)
 
     def to_dict(self):
         return {
@@ -1,6 +1,7 @@
 from app.extensions import db
 from datetime import datetime, timezone
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import validates
 import uuid
 
 class User(db.Model):
@@ -9,53 +10,50 @@ class User(db.Model):
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     spotify_id = db.Column(db.String(100), unique=True, nullable=False, index=True)
     display_name = db.Column(db.String(150))
+    # display_name normalizado (minúsculo, sem acento) pra busca de usuários
+    search_name = db.Column(db.String(150), nullable=True)
     avatar_url = db.Column(db.String(500), nullable=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     access_token = db.Column(db.Text, nullable=True)
     refresh_token = db.Column(db.Text, nullable=True)
     current_streak = db.Column(db.Integer, default=0)
     longest_streak = db.Column(db.Integer, default=0)
+    # Último dia (no fuso do usuário) com review: base da streak incremental
+    last_review_date = db.Column(db.Date, nullable=True)
+    # Fuso IANA (ex: 'America/Sao_Paulo') usado pra recortar meses e dias. Vazio = UTC
+    timezone = db.Column(db.String(64), nullable=True)
 
     token_expires_at = db.Column(db.Integer, nullable=True)
 
+    # Contadores de atividade mantidos pelos services a cada escrita (review, platina,
+    # post, comentário e voto), em vez de um COUNT(*) por contador a cada serialização.
+    # 'flask maintenance reconcile-user-counters' recalcula a partir das tabelas.
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    platinum_count = db.Column(db.Integer, nullable=False, default=0)
+    blog_post_count = db.Column(db.Integer, nullable=False, default=0)
+    comment_count = db.Column(db.Integer, nullable=False, default=0)
+    vote_count = db.Column(db.Integer, nullable=False, default=0)
+
     # Relacionamento: Um usuário tem muitas avaliações de álbuns
     reviews = db.relationship('AlbumReview', backref='user', lazy=True)
 
-    @property
-    def review_count(self):
-        """Conta o total de reviews do usuário dinamicamente"""
-        from app.models.review import AlbumReview
-        return db.session.query(AlbumReview).filter_by(user_id=self.id).count()
-
-    @property
-    def platinum_count(self):
-        """Conta o total de platinas do usuário dinamicamente"""
-        from app.models.platinum import UserPlatinum
-        return db.session.query(UserPlatinum).filter_by(user_id=self.id).count()
-
-    @property
-    def blog_post_count(self):
-        """Conta quantos posts o usuário escreveu no blog"""
-        from app.models.post import BlogPost
-        return db.session.query(BlogPost).filter_by(author_id=self.id).count()
-
-    @property
-    def comment_count(self):
-        """Conta quantos comentários o usuário já fez na plataforma"""
-        from app.models.interaction import Comment
-        return db.session.query(Comment).filter_by(user_id=self.id).count()
+    __table_args__ = (
+        # Busca por trecho do nome (LIKE '%termo%' e similaridade) via pg_trgm
+        db.Index('idx_users_search_trgm', 'search_name', postgresql_using='gin', postgresql_ops={'search_name': 'gin_trgm_ops'}),
+    )
 
-    @property
-    def vote_count(self):
-        """Conta quantos votos (up/down) o usuário já distribuiu"""
-        from app.models.interaction import Vote
-        return db.session.query(Vote).filter_by(user_id=self.id).count()
+    @validates('display_name')
+    def _sync_search_name(self, key, value):
+        """Mantém o search_name em dia sempre que o nome de exibição muda."""
+        from app.utils.search_util import normalize_search_text
+        self.search_name = normalize_search_text(value)
+        return value
 
     @property
     def ranks(self):
         """
         Calcula e retorna os ranks/badges do usuário dinamicamente
-        com base nas constantes e estatísticas atuais.
+        com base nas constantes e nos contadores já carregados (sem consultas).
         """
         from app.constants import USER_RANKS
         
@@ -75,19 +73,12 @@ class User(db.Model):
             # Se não atingiu nem o Level 1, retorna o DEFAULT (se existir) ou None
             return levels.get('DEFAULT')
 
-        user_ranks['review'] = get_rank_title('REVIEW', self.review_count)
-        user_ranks['platinum'] = get_rank_title('PLATINUM', self.platinum_count)
-        streak = getattr(self, 'current_streak', 0)
-        user_ranks['streak'] = get_rank_title('STREAK', streak)
-
-        post_count = getattr(self, 'blog_post_count', 0)
-        user_ranks['post'] = get_rank_title('POST', post_count)
-        
-        comment_count = getattr(self, 'comment_count', 0)
-        user_ranks['comment'] = get_rank_title('COMMENT', comment_count)
-        
-        vote_count = getattr(self, 'vote_count', 0)
-        user_ranks['vote'] = get_rank_title('VOTE', vote_count)
+        user_ranks['review'] = get_rank_title('REVIEW', self.review_count or 0)
+        user_ranks['platinum'] = get_rank_title('PLATINUM', self.platinum_count or 0)
+        user_ranks['streak'] = get_rank_title('STREAK', self.current_streak or 0)
+        user_ranks['post'] = get_rank_title('POST', self.blog_post_count or 0)
+        user_ranks['comment'] = get_rank_title('COMMENT', self.comment_count or 0)
+        user_ranks['vote'] = get_rank_title('VOTE', self.vote_count or 0)
 
         # Retorna apenas os ranks que o usuário efetivamente conquistou (remove os Nones)
         return {k: v for k, v in user_ranks.items() if v is not None}
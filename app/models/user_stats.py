@@ -0,0 +1,31 @@
+from app.extensions import db
+from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import UUID
+
+class UserStats(db.Model):
+    """
+    Retrato pronto das estatísticas de perfil de um usuário, mantido a cada escrita
+    de review e de platina. Duas linhas por usuário: is_public_view=False conta tudo
+    (o dono vendo o próprio perfil) e is_public_view=True só as reviews públicas.
+    """
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id', ondelete="CASCADE"), primary_key=True)
+    is_public_view = db.Column(db.Boolean, primary_key=True)
+
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    platinum_count = db.Column(db.Integer, nullable=False, default=0)
+
+    tier_s_count = db.Column(db.Integer, nullable=False, default=0)
+    tier_a_count = db.Column(db.Integer, nullable=False, default=0)
+    tier_b_count = db.Column(db.Integer, nullable=False, default=0)
+    tier_c_count = db.Column(db.Integer, nullable=False, default=0)
+    tier_d_count = db.Column(db.Integer, nullable=False, default=0)
+    tier_f_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Derivados dos artistas: recalculados (só do usuário) quando o conjunto de reviews muda
+    artist_count = db.Column(db.Integer, nullable=False, default=0)
+    top_artists = db.Column(db.JSON, nullable=False, default=list)
+
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
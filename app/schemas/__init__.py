@@ -1,6 +1,8 @@
 from .album import AlbumBase, AlbumFull, CurationVoteInput, TrackBase, CustomAlbumCreate, CustomAlbumOutput, CustomAlbumTrackCreate, CustomAlbumTrackOutput
 from .artist import ArtistSummary, PlatinumStats, DiscographyItem, PlatinumProgressOutput, PlatinumTrophyOutput
 from .blog import AuthorSummary, BlogPostDetail, BlogPostList, PostUpdate, PostCreate, MentionBase, MentionResponse, PaginatedBlogPostResponse
+from .explore import ExploreWindowQuery
+from .pagination import CursorQuery
 from .interaction import CommentCreate, PaginatedCommentResponse, VoteCreate
 from .review import TrackInput, AlbumInput, ReviewCreate, TrackOutput, ReviewSummary, ReviewFull, ReviewUpdate, TrackUpdate, CalendarQuery, ReviewHistoryQuery
 from .search import SearchResult
@@ -27,7 +29,9 @@ __all__ = [
     'CommentCreate',
     'CurrentPlaybackResponse',
     'CurationVoteInput',
+    'CursorQuery',
     'DiscographyItem',
+    'ExploreWindowQuery',
     'PlatinumProgressOutput',
     'PlatinumStats',
     'PlatinumTrophyOutput',
@@ -24,6 +24,8 @@ class PlatinumProgressOutput(BaseModel):
     artist: ArtistSummary
     stats: PlatinumStats
     discography: List[DiscographyItem]
+    sync_status: str = "synced"
+    sync_job_id: Optional[str] = None
 
 class PlatinumTrophyOutput(BaseModel):
     model_config = ConfigDict(from_attributes=True)
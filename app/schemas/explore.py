@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+from typing import Literal
+from app.constants import TRENDING_DEFAULT_WINDOW
+
+class ExploreWindowQuery(BaseModel):
+    """Valida a janela de tempo das rotas de em alta e top avaliadores"""
+    window: Literal['24h', '7d', '30d'] = Field(default=TRENDING_DEFAULT_WINDOW, description="Janela: 24h, 7d ou 30d")
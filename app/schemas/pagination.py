@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class CursorQuery(BaseModel):
+    """Valida os parâmetros da paginação por cursor (?cursor=...&limit=...&include_total=true)"""
+    cursor: Optional[str] = Field(default=None, description="Cursor opaco devolvido em meta.next_cursor")
+    limit: int = Field(default=20, ge=1, le=100)
+    include_total: bool = Field(default=False, description="Se True, roda o COUNT(*) e devolve meta.total_items")
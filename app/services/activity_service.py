@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import case, delete
+from app.extensions import db
+from app.models import AlbumDailyActivity, UserDailyActivity
+from app.utils.bulk_util import dialect_insert
+from app.constants import TRENDING_WINDOWS, ACTIVITY_RETENTION_DAYS
+
+class ActivityService:
+    """
+    Baldes diários de reviews públicas (álbum x dia e usuário x dia).
+    Como no AlbumStatsService, só executa SQL na sessão atual: o commit é de quem chama.
+    """
+
+    @staticmethod
+    def contribution(review) -> dict:
+        """Quanto uma review soma no balde do dia dela (só reviews públicas contam)."""
+        is_public = 0 if review.is_private else 1
+        return {
+            'public_review_count': is_public,
+            'public_score_sum': (review.average_score or 0.0) * is_public
+        }
+
+    @staticmethod
+    def record_review(review) -> None:
+        ActivityService._apply(review, ActivityService.contribution(review))
+
+    @staticmethod
+    def update_review(review, before: dict) -> None:
+        """Aplica a diferença entre a contribuição antiga ('before') e a atual."""
+        after = ActivityService.contribution(review)
+        ActivityService._apply(review, {key: after[key] - before[key] for key in after})
+
+    @staticmethod
+    def remove_review(review) -> None:
+        contribution = ActivityService.contribution(review)
+        ActivityService._apply(review, {key: -value for key, value in contribution.items()})
+
+    @staticmethod
+    def _apply(review, delta: dict) -> None:
+        if not any(delta.values()):
+            return
+        day = _utc_day(review.created_at)
+
+        album_stmt = dialect_insert(AlbumDailyActivity).values(
+            spotify_album_id=review.spotify_album_id, day=day, **delta
+        )
+        album_table = AlbumDailyActivity.__table__
+        db.session.execute(album_stmt.on_conflict_do_update(
+            index_elements=['spotify_album_id', 'day'],
+            set_={col: album_table.c[col] + album_stmt.excluded[col] for col in delta}
+        ))
+
+        user_stmt = dialect_insert(UserDailyActivity).values(
+            user_id=review.user_id, day=day, public_review_count=delta['public_review_count']
+        )
+        db.session.execute(user_stmt.on_conflict_do_update(
+            index_elements=['user_id', 'day'],
+            set_={'public_review_count': UserDailyActivity.__table__.c.public_review_count + user_stmt.excluded.public_review_count}
+        ))
+
+    @staticmethod
+    def window_buckets(window: str, day_column) -> tuple:
+        """
+        Janela móvel sobre os baldes diários. Retorna (primeiro dia, peso do balde):
+        '7d' pega hoje e os 6 dias anteriores inteiros, mais o balde de 7 dias atrás
+        multiplicado pela fração dele que ainda está nas últimas 7 x 24h.
+        """
+        now = datetime.now(timezone.utc)
+        elapsed = (now - now.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds() / 86400
+        first_day = now.date() - timedelta(days=TRENDING_WINDOWS[window])
+        return first_day, case((day_column == first_day, 1.0 - elapsed), else_=1.0)
+
+    @staticmethod
+    def prune(keep_days: int = ACTIVITY_RETENTION_DAYS) -> int:
+        """Apaga baldes mais velhos que 'keep_days' (e os que zeraram). Retorna quantos saíram."""
+        cutoff = datetime.now(timezone.utc).date() - timedelta(days=keep_days)
+        removed = 0
+        for model in (AlbumDailyActivity, UserDailyActivity):
+            result = db.session.execute(
+                delete(model).where((model.day < cutoff) | (model.public_review_count <= 0))
+            )
+            removed += result.rowcount
+        return removed
+
+
+def _utc_day(moment):
+    """Dia UTC de um horário (as colunas sem fuso já são gravadas em UTC)."""
+    moment = moment or datetime.now(timezone.utc)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.date()
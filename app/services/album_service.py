@@ -1,5 +1,6 @@
 from typing import List, Optional
-from app.extensions import cache, db
+from sqlalchemy import or_
+from app.extensions import db
 from app.schemas import AlbumBase, AlbumFull, TrackBase
 from spotipy.exceptions import SpotifyException
 from app.services.curation_service import CurationService
@@ -8,47 +9,82 @@ from app.services.spotify_sync_service import SpotifySyncService
 from app.models.album import Album
 from app.models.album_track import AlbumTrack
 from app.exceptions import SpotifyAPIError, ResourceNotFoundError
-from app.utils import is_canonical_album, is_track_skippable, clean_album_title
+from app.utils import is_canonical_album, is_track_skippable, clean_album_title, ranked_search, metrics_util
+from app.utils.cache_util import memoize
 
 class AlbumService:
 
     @staticmethod
     def search_albums(user, query: str) -> List[AlbumBase]:
         """
-        Busca álbuns, aplica o Regex de limpeza e verifica o veredito da comunidade.
+        Busca álbuns (catálogo local primeiro, Spotify só se faltar), aplica o Regex de
+        limpeza e verifica o veredito da comunidade.
+        A busca é de catálogo, então o resultado é compartilhado entre todos os usuários.
         """
-        sp = SpotifyService.get_client(user)
-        return AlbumService._search_albums_cached(user.spotify_id, query, sp)
+        return AlbumService._search_albums_cached(query)
 
     @staticmethod
-    @cache.memoize(timeout=3600)
-    def _search_albums_cached(spotify_id: str, query: str, sp) -> List[AlbumBase]:
+    @memoize(timeout=3600)
+    def _search_albums_cached(query: str, limit: int = 10) -> List[AlbumBase]:
+        # Catálogo local primeiro (índice de trigramas); o Spotify só completa se faltou.
+        # Coletâneas ficam de fora, como no /search do Spotify logo abaixo
+        not_compilation = or_(Album.album_type.is_(None), Album.album_type != 'compilation')
+        local_albums = ranked_search(Album.query.filter(not_compilation), Album.search_text, query).limit(limit).all()
+        albums_list = [
+            AlbumBase(
+                id=album.spotify_album_id,
+                name=album.name,
+                clean_name=album.clean_name or clean_album_title(album.name),
+                artist=album.artist_name,
+                cover_url=album.cover_url,
+                release_date=album.release_date,
+                is_canonical=album.is_canonical if album.is_canonical is not None else is_canonical_album(album.name)
+            )
+            for album in local_albums
+        ]
+
+        if len(albums_list) < limit:
+            metrics_util.increment('search.albums.spotify_fallback')
+            try:
+                albums_list += AlbumService._search_spotify_albums(query, limit, {a.id for a in albums_list})
+            except SpotifyAPIError:
+                # Com resultado local, a busca ainda responde mesmo com o Spotify fora
+                if not albums_list:
+                    raise
+        else:
+            metrics_util.increment('search.albums.local_hit')
+
+        albums_list = albums_list[:limit]
+        community_overrides = CurationService.get_community_overrides([a.id for a in albums_list])
+        for album in albums_list:
+            album.is_canonical = community_overrides.get(album.id, album.is_canonical)
+
+        return albums_list
+
+    @staticmethod
+    def _search_spotify_albums(query: str, limit: int, skip_ids: set) -> List[AlbumBase]:
+        """/search de álbuns no Spotify, sem coletâneas e sem os IDs já achados localmente."""
+        sp = SpotifyService.get_client()
         try:
-            results = sp.search(q=query, type='album', limit=10)
+            results = sp.search(q=query, type='album', limit=limit)
             items = results['albums']['items']
 
-            spotify_ids = [item['id'] for item in items]
-            community_overrides = CurationService.get_community_overrides(spotify_ids)
-
             albums_list = []
             for item in items:
-                if item.get('album_type') == 'compilation':
+                if item.get('album_type') == 'compilation' or item['id'] in skip_ids:
                     continue
 
                 raw_name = item['name']
-                album_id = item['id']
                 cover = item['images'][0]['url'] if item['images'] else None
-                regex_decision = is_canonical_album(raw_name)
-                final_canonical_status = community_overrides.get(album_id, regex_decision)
 
                 albums_list.append(AlbumBase(
-                    id=album_id,
+                    id=item['id'],
                     name=raw_name,
                     clean_name=clean_album_title(raw_name),
                     artist=", ".join([artist['name'] for artist in item['artists']]),
                     cover_url=cover,
                     release_date=item['release_date'],
-                    is_canonical=final_canonical_status
+                    is_canonical=is_canonical_album(raw_name)
                 ))
 
             return albums_list
@@ -65,47 +101,15 @@ class AlbumService:
             from app.services.custom_album_service import CustomAlbumService
             return CustomAlbumService.get_custom_album(album_id)
 
-        sp = SpotifyService.get_client(user)
-        return AlbumService._get_album_details_cached(user.spotify_id, album_id, sp)
+        return AlbumService._get_album_details_cached(album_id)
 
     @staticmethod
-    @cache.memoize(timeout=604800)
-    def _get_album_details_cached(spotify_id: str, album_id: str, sp) -> Optional[AlbumFull]:
+    @memoize(timeout=604800, l1_ttl=60)
+    def _get_album_details_cached(album_id: str) -> Optional[AlbumFull]:
         try:
-            # Tenta ler do banco primeiro
-            album = Album.query.filter_by(spotify_album_id=album_id).first()
-
-            if album and not album.needs_sync():
-                tracks_db = AlbumTrack.query.filter_by(
-                    album_spotify_id=album_id
-                ).order_by(AlbumTrack.track_number).all()
-
-                community_overrides = CurationService.get_community_overrides([album_id])
-                final_canonical_status = community_overrides.get(album_id, album.is_canonical)
-
-                return AlbumFull(
-                    id=album.spotify_album_id,
-                    name=album.name,
-                    clean_name=album.clean_name,
-                    artist=album.artist_name,
-                    cover_url=album.cover_url,
-                    release_date=album.release_date,
-                    total_tracks=album.total_tracks,
-                    is_canonical=final_canonical_status,
-                    tracks=[
-                        TrackBase(
-                            id=t.spotify_track_id,
-                            name=t.name,
-                            track_number=t.track_number,
-                            duration_ms=t.duration_ms,
-                            preview_url=t.preview_url,
-                            suggested_ignore=is_track_skippable(t.name)
-                        ) for t in tracks_db
-                    ]
-                )
-
-            # Banco vazio ou desatualizado — vai ao Spotify e sincroniza
-            album = SpotifySyncService.sync_album(album_id, sp)
+            # Lê do banco; só bloqueia no Spotify se o álbum não existir ou estiver expirado.
+            # Se estiver apenas desatualizado, volta na hora e um job atualiza em segundo plano.
+            album = SpotifySyncService.sync_album(album_id)
             db.session.commit()
 
             tracks_db = AlbumTrack.query.filter_by(
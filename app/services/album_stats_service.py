@@ -0,0 +1,189 @@
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from app.extensions import db
+from app.models import AlbumReview, AlbumStats
+from app.utils.bulk_util import dialect_insert
+
+# Contadores somados/subtraídos a cada escrita de review
+_COUNTERS = (
+    'review_count', 'score_sum', 'tier_s_count',
+    'public_review_count', 'public_score_sum', 'public_tier_s_count', 'public_scored_count'
+)
+
+class AlbumStatsService:
+    """
+    Mantém a tabela album_stats em dia com as reviews.
+    Os métodos só executam SQL na sessão atual: quem chama faz o commit, então o
+    agregado entra (ou é desfeito) junto com a própria review.
+    """
+
+    @staticmethod
+    def contribution(review) -> dict:
+        """Quanto uma review soma nos contadores do álbum dela."""
+        score = review.average_score or 0.0
+        is_scored = 0 if review.average_score is None else 1
+        is_tier_s = 1 if review.tier == 'S' else 0
+        is_public = 0 if review.is_private else 1
+
+        return {
+            'review_count': 1,
+            'score_sum': score,
+            'tier_s_count': is_tier_s,
+            'public_review_count': is_public,
+            'public_score_sum': score * is_public,
+            'public_tier_s_count': is_tier_s * is_public,
+            'public_scored_count': is_scored * is_public
+        }
+
+    @staticmethod
+    def record_review(review) -> None:
+        """Soma uma review nova ao agregado do álbum."""
+        AlbumStatsService._apply(review, AlbumStatsService.contribution(review))
+
+    @staticmethod
+    def update_review(review, before: dict) -> None:
+        """
+        Aplica só a diferença entre a contribuição antiga ('before', pega com
+        contribution() antes de alterar a review) e a atual.
+        """
+        after = AlbumStatsService.contribution(review)
+        delta = {key: after[key] - before[key] for key in _COUNTERS}
+        if any(delta.values()):
+            AlbumStatsService._apply(review, delta)
+        if delta['public_review_count'] < 0:
+            # Ficou privada: a última review pública do álbum pode ter sido esta
+            AlbumStatsService._refresh_latest(review, removing=False)
+
+    @staticmethod
+    def remove_review(review) -> None:
+        """Retira a review do agregado (chamar antes de apagá-la)."""
+        contribution = AlbumStatsService.contribution(review)
+        AlbumStatsService._apply(review, {key: -value for key, value in contribution.items()})
+        AlbumStatsService._refresh_latest(review, removing=True)
+
+        # Álbum sem nenhuma review some do agregado
+        db.session.execute(
+            delete(AlbumStats).where(
+                AlbumStats.spotify_album_id == review.spotify_album_id,
+                AlbumStats.review_count <= 0
+            )
+        )
+
+    @staticmethod
+    def _apply(review, delta: dict) -> None:
+        """
+        INSERT ... ON CONFLICT DO UPDATE somando o delta nos contadores.
+        A soma acontece no banco (coluna = coluna + delta), então escritas
+        simultâneas no mesmo álbum não se sobrescrevem.
+        """
+        table = AlbumStats.__table__
+        adding = delta['review_count'] >= 0
+        reviewed_at = review.created_at if adding else None
+        public_reviewed_at = reviewed_at if delta['public_review_count'] > 0 else None
+
+        stmt = dialect_insert(AlbumStats).values(
+            spotify_album_id=review.spotify_album_id,
+            album_name=review.album_name,
+            artist_name=review.artist_name,
+            cover_url=review.cover_url,
+            last_review_at=reviewed_at,
+            last_public_review_at=public_reviewed_at,
+            public_average_score=delta['public_score_sum'] if delta['public_scored_count'] > 0 else 0.0,
+            **delta
+        )
+
+        public_sum = table.c.public_score_sum + stmt.excluded.public_score_sum
+        public_count = table.c.public_scored_count + stmt.excluded.public_scored_count
+
+        set_ = {col: table.c[col] + stmt.excluded[col] for col in _COUNTERS}
+        set_.update(
+            public_average_score=func.coalesce(public_sum / func.nullif(public_count, 0), 0.0),
+            last_review_at=_latest(table.c.last_review_at, stmt.excluded.last_review_at),
+            last_public_review_at=_latest(table.c.last_public_review_at, stmt.excluded.last_public_review_at),
+            updated_at=func.now()
+        )
+        if adding:
+            set_.update(
+                album_name=stmt.excluded.album_name,
+                artist_name=stmt.excluded.artist_name,
+                cover_url=func.coalesce(stmt.excluded.cover_url, table.c.cover_url)
+            )
+
+        db.session.execute(stmt.on_conflict_do_update(index_elements=['spotify_album_id'], set_=set_))
+
+    @staticmethod
+    def _refresh_latest(review, removing: bool) -> None:
+        """
+        Recalcula last_review_at e last_public_review_at a partir das reviews, como o rebuild.
+        O _apply só avança esses horários; quando uma review sai (apagada, ou ficou privada
+        pro last_public_review_at), o horário dela pode ter que voltar pro da anterior.
+        """
+        others = (AlbumReview.spotify_album_id == review.spotify_album_id, AlbumReview.id != review.id)
+        is_public = func.coalesce(AlbumReview.is_private, False) == False
+        last_other = select(func.max(AlbumReview.created_at)).where(*others).scalar_subquery()
+        last_public_other = select(func.max(AlbumReview.created_at)).where(*others, is_public).scalar_subquery()
+
+        # A própria review ainda conta enquanto existir (e, pro público, enquanto for pública)
+        own = None if removing else review.created_at
+        own_public = None if removing or review.is_private else review.created_at
+        column_type = AlbumStats.last_review_at.type
+
+        db.session.execute(
+            update(AlbumStats)
+            .where(AlbumStats.spotify_album_id == review.spotify_album_id)
+            .values(
+                last_review_at=_latest(last_other, literal(own, column_type)),
+                last_public_review_at=_latest(last_public_other, literal(own_public, column_type))
+            )
+        )
+
+    @staticmethod
+    def rebuild() -> int:
+        """
+        Recalcula a tabela inteira a partir de album_reviews (backfill ou correção).
+        Retorna quantos álbuns foram gravados. Quem chama faz o commit.
+        """
+        is_public = func.coalesce(AlbumReview.is_private, False) == False
+        is_tier_s = AlbumReview.tier == 'S'
+        score = func.coalesce(AlbumReview.average_score, 0.0)
+
+        public_count = func.sum(case((is_public, 1), else_=0))
+        public_sum = func.sum(case((is_public, score), else_=0.0))
+        public_scored = func.sum(case((is_public & AlbumReview.average_score.isnot(None), 1), else_=0))
+
+        aggregates = select(
+            AlbumReview.spotify_album_id,
+            func.max(AlbumReview.album_name),
+            func.max(AlbumReview.artist_name),
+            func.max(AlbumReview.cover_url),
+            func.count(AlbumReview.id),
+            func.sum(score),
+            func.sum(case((is_tier_s, 1), else_=0)),
+            func.max(AlbumReview.created_at),
+            public_count,
+            public_sum,
+            func.sum(case((is_public & is_tier_s, 1), else_=0)),
+            public_scored,
+            func.coalesce(public_sum / func.nullif(public_scored, 0), 0.0),
+            func.max(case((is_public, AlbumReview.created_at), else_=None)),
+        ).group_by(AlbumReview.spotify_album_id)
+
+        columns = [
+            'spotify_album_id', 'album_name', 'artist_name', 'cover_url',
+            'review_count', 'score_sum', 'tier_s_count', 'last_review_at',
+            'public_review_count', 'public_score_sum', 'public_tier_s_count',
+            'public_scored_count', 'public_average_score', 'last_public_review_at'
+        ]
+
+        db.session.execute(delete(AlbumStats))
+        db.session.execute(insert(AlbumStats).from_select(columns, aggregates))
+        return db.session.query(func.count(AlbumStats.spotify_album_id)).scalar()
+
+
+def _latest(current, incoming):
+    """O mais recente entre dois horários, ignorando NULL dos dois lados."""
+    return case(
+        (current.is_(None), incoming),
+        (incoming.is_(None), current),
+        (incoming > current, incoming),
+        else_=current
+    )
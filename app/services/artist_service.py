@@ -1,9 +1,15 @@
-from app.extensions import cache, db
+import uuid
+from app.extensions import db
 from app.services.curation_service import CurationService
 from app.services.spotify_service import SpotifyService
 from app.services.spotify_sync_service import SpotifySyncService
+from app.services.job_service import JobService, JOB_DONE
+from app.services.user_stats_service import UserStatsService
+from app.services.user_service import UserService
 from app.models import AlbumReview, UserPlatinum, Artist, Album
-from app.utils import clean_album_title
+from app.utils import clean_album_title, ranked_search, metrics_util
+from app.constants import SYNC_STATUS_SYNCED
+from app.utils.cache_util import memoize, bump_generation, get_generation, USER_NAMESPACE, ARTIST_NAMESPACE
 from app.exceptions import SpotifyAPIError, ResourceNotFoundError
 from spotipy.exceptions import SpotifyException
 
@@ -12,22 +18,60 @@ class ArtistService:
     @staticmethod
     def search_artists(user, query: str, limit=10) -> list:
         """
-        Busca artistas no Spotify.
+        Busca artistas (catálogo local primeiro, Spotify só se faltar; cache compartilhado entre usuários).
         """
-        sp = SpotifyService.get_client(user)
-        return ArtistService._search_artists_cached(user.spotify_id, query, limit, sp)
+        return ArtistService._search_artists_cached(query, limit)
 
     @staticmethod
-    @cache.memoize(timeout=3600)
-    def _search_artists_cached(spotify_id: str, query: str, limit: int, sp) -> list:
+    @memoize(timeout=3600)
+    def _search_artists_cached(query: str, limit: int) -> list:
+        # Catálogo local primeiro (índice de trigramas); o Spotify só completa se faltou
+        artists = [
+            {
+                "id": artist.spotify_artist_id,
+                "name": artist.name,
+                "image_url": artist.image_url,
+                "genres": artist.genres or []
+            }
+            for artist in ranked_search(Artist.query, Artist.search_name, query).limit(limit).all()
+        ]
+
+        if len(artists) >= limit:
+            metrics_util.increment('search.artists.local_hit')
+            return artists
+
+        metrics_util.increment('search.artists.spotify_fallback')
+        try:
+            found_ids = {artist["id"] for artist in artists}
+            for artist in ArtistService._search_spotify_artists(query, limit):
+                if len(artists) >= limit:
+                    break
+                if artist["id"] not in found_ids:
+                    artists.append(artist)
+                    found_ids.add(artist["id"])
+        except SpotifyAPIError:
+            # Com resultado local, a busca ainda responde mesmo com o Spotify fora
+            if not artists:
+                raise
+
+        return artists
+
+    @staticmethod
+    def _search_spotify_artists(query: str, limit: int) -> list:
+        """/search de artistas no Spotify; os que ainda não estão no banco são salvos."""
+        sp = SpotifyService.get_client()
         try:
             results = sp.search(q=query, type='artist', limit=limit)
+            items = results['artists']['items']
             artists = []
 
-            for item in results['artists']['items']:
-                # Salva artista no banco (aproveita gêneros enquanto API retorna)
-                existing = Artist.query.filter_by(spotify_artist_id=item['id']).first()
-                if not existing:
+            # Salva artista no banco (aproveita gêneros enquanto API retorna)
+            existing_ids = {
+                artist_id for (artist_id,) in db.session.query(Artist.spotify_artist_id)
+                .filter(Artist.spotify_artist_id.in_([item['id'] for item in items])).all()
+            }
+            for item in items:
+                if item['id'] not in existing_ids:
                     new_artist = Artist(
                         spotify_artist_id=item['id'],
                         name=item['name'],
@@ -35,6 +79,7 @@ class ArtistService:
                         genres=item.get('genres', []) or []
                     )
                     db.session.add(new_artist)
+                    existing_ids.add(item['id'])
 
                 artists.append({
                     "id": item['id'],
@@ -54,105 +99,141 @@ class ArtistService:
         """
         Calcula o progresso de Platina de um usuário para um artista específico.
         Também é usado pra construir a página do artista com todas as informações de discografia e progresso.
+        A discografia é sincronizada por um job em segundo plano: enquanto ele não termina,
+        a resposta traz o que já está no banco com sync_status 'queued'/'running'/'failed',
+        sem cache e sem mexer na medalha (o progresso ainda está incompleto).
         """
-        sp = SpotifyService.get_client(user)
-        result = ArtistService._get_platinum_progress_cached(str(user.id), artist_id, sp, user)
-        
-        ArtistService._handle_platinum_medal(user, artist_id, result)
-        
-        return result
-
-    @staticmethod
-    @cache.memoize(timeout=3600)
-    def _get_platinum_progress_cached(user_id: str, artist_id: str, sp, user) -> dict:
         if not artist_id:
             raise ResourceNotFoundError("Artista")
 
-        try:
-            # Sincroniza artista e discografia (respeita needs_sync — só vai ao Spotify se necessário)
-            artist = SpotifySyncService.sync_artist_discography(artist_id, sp)
-
-            # Lê discografia do banco
-            albums_db = Album.query.filter_by(artist_spotify_id=artist_id).all()
-            spotify_ids = [a.spotify_album_id for a in albums_db]
-            community_overrides = CurationService.get_community_overrides(spotify_ids)
-
-            canonical_discography = {}
-
-            for album in albums_db:
-                clean_name = album.clean_name or clean_album_title(album.name)
-                is_canonical = community_overrides.get(album.spotify_album_id, album.is_canonical)
-
-                if clean_name not in canonical_discography:
-                    canonical_discography[clean_name] = {
-                        "clean_name": clean_name,
-                        "cover_url": album.cover_url,
-                        "release_date": album.release_date,
-                        "is_canonical": is_canonical,
-                        "versions": [album.spotify_album_id]
-                    }
-                else:
-                    canonical_discography[clean_name]["versions"].append(album.spotify_album_id)
-                    if is_canonical:
-                        canonical_discography[clean_name]["is_canonical"] = True
-
-            required_albums = {
-                name: data for name, data in canonical_discography.items()
-                if data["is_canonical"]
-            }
+        sync_status, sync_job_id = ArtistService._ensure_discography_sync(artist_id)
+
+        if sync_status == SYNC_STATUS_SYNCED:
+            # A geração do artista entra na chave: voto de curadoria e sync da discografia
+            # mudam os álbuns exigidos pra todo mundo, não só pro usuário
+            artist_generation = get_generation(ARTIST_NAMESPACE, artist_id)
+            result = ArtistService._get_platinum_progress_cached(str(user.id), artist_id, artist_generation)
+            ArtistService._handle_platinum_medal(user, artist_id, result)
+        else:
+            result = ArtistService._build_platinum_progress(str(user.id), artist_id)
+
+        return {**result, "sync_status": sync_status, "sync_job_id": sync_job_id}
+
+    @staticmethod
+    def _ensure_discography_sync(artist_id: str) -> tuple:
+        """
+        Garante que a discografia do artista esteja (ou vá ficar) sincronizada.
+        Só o artista em si é buscado na hora, se ainda não existir (uma chamada),
+        pra página ter nome e foto. O resto vai pra fila.
+        Retorna (sync_status, id do job ou None).
+        """
+        artist = Artist.query.filter_by(spotify_artist_id=artist_id).first()
+        if artist and not artist.needs_discography_sync():
+            return SYNC_STATUS_SYNCED, None
+
+        if not artist:
+            try:
+                SpotifySyncService.sync_artist(artist_id)
+                db.session.commit()
+            except SpotifyAPIError as e:
+                # Só um 404 do Spotify quer dizer que o artista não existe; 502/503 sobem como estão
+                if e.status_code == 404:
+                    raise ResourceNotFoundError("Artista")
+                raise
 
-            all_required_version_ids = []
-            for data in required_albums.values():
-                all_required_version_ids.extend(data["versions"])
+        job = JobService.enqueue('sync_artist_discography', artist_id)
+        if job['status'] == JOB_DONE:
+            return SYNC_STATUS_SYNCED, job['id']
+        return job['status'], job['id']
 
-            user_reviews = AlbumReview.query.filter(
-                AlbumReview.user_id == user.id,
-                AlbumReview.spotify_album_id.in_(all_required_version_ids)
-            ).all()
+    @staticmethod
+    @memoize(timeout=21600, namespace=USER_NAMESPACE)
+    def _get_platinum_progress_cached(user_id: str, artist_id: str, artist_generation: int) -> dict:
+        return ArtistService._build_platinum_progress(user_id, artist_id)
 
-            reviewed_spotify_ids = {r.spotify_album_id for r in user_reviews}
+    @staticmethod
+    def _build_platinum_progress(user_id: str, artist_id: str) -> dict:
+        """Monta o progresso só com o que está no banco (nenhuma chamada ao Spotify)."""
+        artist = Artist.query.filter_by(spotify_artist_id=artist_id).first()
+        if not artist:
+            raise ResourceNotFoundError("Artista")
 
-            progress_list = []
-            completed_count = 0
+        # Lê discografia do banco
+        albums_db = Album.query.filter_by(artist_spotify_id=artist_id).all()
+        spotify_ids = [a.spotify_album_id for a in albums_db]
+        community_overrides = CurationService.get_community_overrides(spotify_ids)
 
-            for clean_name, data in required_albums.items():
-                is_completed = any(vid in reviewed_spotify_ids for vid in data["versions"])
-                if is_completed:
-                    completed_count += 1
+        canonical_discography = {}
 
-                progress_list.append({
-                    "album_id": data["versions"][0],
+        for album in albums_db:
+            clean_name = album.clean_name or clean_album_title(album.name)
+            is_canonical = community_overrides.get(album.spotify_album_id, album.is_canonical)
+
+            if clean_name not in canonical_discography:
+                canonical_discography[clean_name] = {
                     "clean_name": clean_name,
-                    "cover_url": data["cover_url"],
-                    "release_date": data["release_date"][:4],
-                    "is_completed": is_completed
-                })
+                    "cover_url": album.cover_url,
+                    "release_date": album.release_date,
+                    "is_canonical": is_canonical,
+                    "versions": [album.spotify_album_id]
+                }
+            else:
+                canonical_discography[clean_name]["versions"].append(album.spotify_album_id)
+                if is_canonical:
+                    canonical_discography[clean_name]["is_canonical"] = True
 
-            progress_list.sort(key=lambda x: x['release_date'], reverse=True)
-
-            total_required = len(required_albums)
-            percentage = round((completed_count / total_required) * 100) if total_required > 0 else 0
-            is_platinum = (total_required > 0) and (completed_count == total_required)
-
-            return {
-                "artist": {
-                    "id": artist_id,
-                    "name": artist.name,
-                    "image_url": artist.image_url
-                },
-                "stats": {
-                    "total_required": total_required,
-                    "completed_count": completed_count,
-                    "percentage": percentage,
-                    "is_platinum": is_platinum
-                },
-                "discography": progress_list
-            }
+        required_albums = {
+            name: data for name, data in canonical_discography.items()
+            if data["is_canonical"]
+        }
 
-        except SpotifyException as e:
-            if e.http_status == 404:
-                raise ResourceNotFoundError("Artista")
-            raise SpotifyAPIError(f"Erro ao buscar artista no Spotify: {e.msg}")
+        all_required_version_ids = []
+        for data in required_albums.values():
+            all_required_version_ids.extend(data["versions"])
+
+        user_reviews = AlbumReview.query.filter(
+            AlbumReview.user_id == uuid.UUID(user_id),
+            AlbumReview.spotify_album_id.in_(all_required_version_ids)
+        ).all()
+
+        reviewed_spotify_ids = {r.spotify_album_id for r in user_reviews}
+
+        progress_list = []
+        completed_count = 0
+
+        for clean_name, data in required_albums.items():
+            is_completed = any(vid in reviewed_spotify_ids for vid in data["versions"])
+            if is_completed:
+                completed_count += 1
+
+            progress_list.append({
+                "album_id": data["versions"][0],
+                "clean_name": clean_name,
+                "cover_url": data["cover_url"],
+                "release_date": data["release_date"][:4],
+                "is_completed": is_completed
+            })
+
+        progress_list.sort(key=lambda x: x['release_date'], reverse=True)
+
+        total_required = len(required_albums)
+        percentage = round((completed_count / total_required) * 100) if total_required > 0 else 0
+        is_platinum = (total_required > 0) and (completed_count == total_required)
+
+        return {
+            "artist": {
+                "id": artist_id,
+                "name": artist.name,
+                "image_url": artist.image_url
+            },
+            "stats": {
+                "total_required": total_required,
+                "completed_count": completed_count,
+                "percentage": percentage,
+                "is_platinum": is_platinum
+            },
+            "discography": progress_list
+        }
 
     @staticmethod
     def _handle_platinum_medal(user, artist_id: str, result: dict):
@@ -171,7 +252,13 @@ class ArtistService:
                 artist_name=artist['name'],
                 artist_image_url=artist['image_url']
             ))
+            UserStatsService.record_platinum(user.id, 1)
+            UserService.adjust_counters(user.id, platinum_count=1)
             db.session.commit()
+            bump_generation(USER_NAMESPACE, str(user.id))
         elif not is_platinum and existing_plat:
             db.session.delete(existing_plat)
-            db.session.commit()
\ No newline at end of file
+            UserStatsService.record_platinum(user.id, -1)
+            UserService.adjust_counters(user.id, platinum_count=-1)
+            db.session.commit()
+            bump_generation(USER_NAMESPACE, str(user.id))
\ No newline at end of file
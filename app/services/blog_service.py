@@ -1,9 +1,11 @@
 from datetime import datetime, timezone
+from sqlalchemy.orm import joinedload
 from app.extensions import db
 from app.models import BlogPost, BlogPostMention
 from app.exceptions import ResourceNotFoundError, AuthorizationError
 from app.schemas import PostCreate, PostUpdate, BlogPostDetail, PaginatedBlogPostResponse, BlogPostList
-from app.utils import generate_unique_slug, sync_post_mentions
+from app.utils import generate_unique_slug, sync_post_mentions, keyset_paginate
+from app.services.user_service import UserService
 
 class BlogService:
     @staticmethod
@@ -44,6 +46,7 @@ class BlogService:
         if data.mentions:
             sync_post_mentions(post.id, data.mentions, db.session, BlogPostMention)
 
+        UserService.adjust_counters(user.id, blog_post_count=1)
         db.session.commit()
         return BlogPostDetail.model_validate(post)
 
@@ -101,6 +104,32 @@ class BlogService:
             pages=paginacao.pages
         )
 
+    @staticmethod
+    def list_posts_cursor(cursor=None, limit=20, public_only=True, include_total=False) -> dict:
+        """Listagem paginada por cursor (keyset em created_at, id), sem OFFSET."""
+        query = BlogPost.query.options(joinedload(BlogPost.author))
+
+        if public_only:
+            query = query.filter_by(status='PUBLISHED')
+
+        return BlogService._cursor_page(query, cursor, limit, include_total)
+
+    @staticmethod
+    def list_user_posts_cursor(user, cursor=None, limit=20, status=None, include_total=False) -> dict:
+        """Posts do usuário logado paginados por cursor, opcionalmente filtrados por status."""
+        query = BlogPost.query.options(joinedload(BlogPost.author)).filter_by(user_id=user.id)
+
+        if status:
+            query = query.filter_by(status=status)
+
+        return BlogService._cursor_page(query, cursor, limit, include_total)
+
+    @staticmethod
+    def _cursor_page(query, cursor, limit, include_total) -> dict:
+        page = keyset_paginate(query, BlogPost, cursor, limit, include_total)
+        page["items"] = [BlogPostList.model_validate(p).model_dump(mode='json') for p in page["items"]]
+        return page
+
     @staticmethod
     def list_user_posts(user, page=1, per_page=10, status=None) -> PaginatedBlogPostResponse:
         """Lista posts do usuário logado, opcionalmente filtrado por status."""
@@ -123,6 +152,7 @@ class BlogService:
         """Deleta um post (CASCADE deleta as menções junto!)"""
         post = BlogService._get_post_and_verify_author(post_id, user_id)
             
+        UserService.adjust_counters(post.user_id, blog_post_count=-1)
         db.session.delete(post)
         db.session.commit()
         return True
@@ -1,5 +1,6 @@
 from app.extensions import db
-from app.models import AlbumCurationVote
+from app.models import AlbumCurationVote, Album
+from app.utils.cache_util import bump_generation, ARTIST_NAMESPACE
 from app.constants import CURATION_THRESHOLD
 
 class CurationService:
@@ -25,6 +26,11 @@ class CurationService:
             db.session.add(vote)
             
         db.session.commit()
+
+        # O voto pode mudar os álbuns exigidos pra platina do artista
+        album = Album.query.filter_by(spotify_album_id=spotify_album_id).first()
+        if album and album.artist_spotify_id:
+            bump_generation(ARTIST_NAMESPACE, album.artist_spotify_id)
         return vote
 
     @staticmethod
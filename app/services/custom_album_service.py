@@ -3,6 +3,7 @@ from app.models.custom_album import CustomAlbum
 from app.models.custom_album_track import CustomAlbumTrack
 from app.schemas.album import CustomAlbumOutput, AlbumFull, TrackBase
 from app.exceptions import ResourceNotFoundError
+from app.utils import bulk_insert
 import uuid
 
 class CustomAlbumService:
@@ -18,13 +19,14 @@ class CustomAlbumService:
         db.session.add(album)
         db.session.flush()
 
-        for track_data in payload.tracks:
-            db.session.add(CustomAlbumTrack(
-                custom_album_id=album.id,
-                name=track_data.name,
-                track_number=track_data.track_number,
-                duration_ms=track_data.duration_ms
-            ))
+        bulk_insert(CustomAlbumTrack, [
+            {
+                "custom_album_id": album.id,
+                "name": track_data.name,
+                "track_number": track_data.track_number,
+                "duration_ms": track_data.duration_ms
+            } for track_data in payload.tracks
+        ])
 
         db.session.commit()
         return CustomAlbumOutput.model_validate(album)
@@ -1,37 +1,47 @@
-from datetime import datetime, timedelta, timezone
 from sqlalchemy import func, desc
-from app.extensions import db, cache
-from app.models import AlbumReview, User
-from app.constants import HALL_OF_FAME_MIN_REVIEWS, TRENDING_DAYS_LIMIT
+from app.extensions import db
+from app.models import AlbumReview, AlbumStats, AlbumDailyActivity, UserDailyActivity, User
+from app.constants import HALL_OF_FAME_MIN_REVIEWS, TRENDING_DEFAULT_WINDOW
 from app.schemas import ReviewSummary
-from app.utils import get_community_bubble
+from app.utils import get_community_bubble, keyset_paginate
+from app.utils.cache_util import memoize
+from app.services.activity_service import ActivityService
 
 class ExploreService:
 
     @staticmethod
-    @cache.memoize(timeout=300) 
-    def get_trending_albums(limit=10) -> list:
+    @memoize(timeout=300, l1_ttl=30, early_refresh=True)
+    def get_trending_albums(limit=10, window=TRENDING_DEFAULT_WINDOW) -> list:
         """
-        Retorna os álbuns com mais reviews públicas nos últimos X dias.
+        Retorna os álbuns com mais reviews públicas na janela (24h, 7d ou 30d).
+        Soma os baldes diários de cada álbum (no máximo um por dia da janela, o mais
+        antigo pesado pela parte dele que cai na janela); nome, artista e capa vêm do album_stats.
         """
-        days_ago = datetime.now(timezone.utc) - timedelta(days=TRENDING_DAYS_LIMIT)
+        window_start, weight = ActivityService.window_buckets(window, AlbumDailyActivity.day)
 
-        trending_query = db.session.query(
-            AlbumReview.spotify_album_id,
-            AlbumReview.album_name,
-            AlbumReview.artist_name,
-            AlbumReview.cover_url,
-            func.count(AlbumReview.id).label('review_count'),
-            func.avg(AlbumReview.score).label('average_score')
+        review_count = func.sum(AlbumDailyActivity.public_review_count * weight)
+        score_sum = func.sum(AlbumDailyActivity.public_score_sum * weight)
+
+        buckets = db.session.query(
+            AlbumDailyActivity.spotify_album_id.label('album_id'),
+            review_count.label('review_count'),
+            score_sum.label('score_sum')
         ).filter(
-            AlbumReview.is_private == False,
-            AlbumReview.created_at >= days_ago
+            AlbumDailyActivity.day >= window_start
         ).group_by(
-            AlbumReview.spotify_album_id,
-            AlbumReview.album_name,
-            AlbumReview.artist_name,
-            AlbumReview.cover_url
-        ).order_by(desc('review_count')).limit(limit).all()
+            AlbumDailyActivity.spotify_album_id
+        ).having(review_count >= 0.5).subquery()
+
+        trending_query = db.session.query(
+            AlbumStats.spotify_album_id,
+            AlbumStats.album_name,
+            AlbumStats.artist_name,
+            AlbumStats.cover_url,
+            buckets.c.review_count,
+            buckets.c.score_sum
+        ).join(
+            buckets, buckets.c.album_id == AlbumStats.spotify_album_id
+        ).order_by(desc(buckets.c.review_count)).limit(limit).all()
 
         return [
             {
@@ -39,35 +49,24 @@ class ExploreService:
                 "name": row.album_name,
                 "artist": row.artist_name,
                 "cover_url": row.cover_url,
-                "review_count": row.review_count,
-                "average_score": round(row.average_score, 2) if row.average_score else 0.0
+                "review_count": round(row.review_count),
+                "average_score": round(row.score_sum / row.review_count, 2) if row.score_sum else 0.0
             } for row in trending_query
         ]
 
     @staticmethod
-    @cache.memoize(timeout=600)
+    @memoize(timeout=600, l1_ttl=60, early_refresh=True)
     def get_hall_of_fame(limit=10) -> list:
         """
         Retorna os álbuns com a maior média de notas de todos os tempos.
         Exige um número mínimo de reviews para evitar que um álbum com 1 review nota 10 ganhe.
+        Leitura top-N indexada no album_stats, independente do total de reviews.
         """
-        fame_query = db.session.query(
-            AlbumReview.spotify_album_id,
-            AlbumReview.album_name,
-            AlbumReview.artist_name,
-            AlbumReview.cover_url,
-            func.count(AlbumReview.id).label('review_count'),
-            func.avg(AlbumReview.score).label('average_score')
-        ).filter(
-            AlbumReview.is_private == False
-        ).group_by(
-            AlbumReview.spotify_album_id,
-            AlbumReview.album_name,
-            AlbumReview.artist_name,
-            AlbumReview.cover_url
-        ).having(
-            func.count(AlbumReview.id) >= HALL_OF_FAME_MIN_REVIEWS
-        ).order_by(desc('average_score'), desc('review_count')).limit(limit).all()
+        fame_query = AlbumStats.query.filter(
+            AlbumStats.public_review_count >= HALL_OF_FAME_MIN_REVIEWS
+        ).order_by(
+            desc(AlbumStats.public_average_score), desc(AlbumStats.public_review_count)
+        ).limit(limit).all()
 
         return [
             {
@@ -75,53 +74,65 @@ class ExploreService:
                 "name": row.album_name,
                 "artist": row.artist_name,
                 "cover_url": row.cover_url,
-                "review_count": row.review_count,
-                "average_score": round(row.average_score, 2) if row.average_score else 0.0
+                "review_count": row.public_review_count,
+                "average_score": round(row.public_average_score, 2) if row.public_average_score else 0.0
             } for row in fame_query
         ]
 
     @staticmethod
-    @cache.memoize(timeout=300)
+    @memoize(timeout=300, l1_ttl=30, early_refresh=True)
     def get_global_feed(limit=20) -> list:
         """
         Retorna as reviews públicas mais recentes feitas por qualquer usuário na plataforma.
         """
-        reviews = AlbumReview.query.filter_by(is_private=False)\
-            .order_by(AlbumReview.created_at.desc())\
-            .limit(limit).all()
-        
-        return [ReviewSummary.model_validate(r).model_dump() for r in reviews]
+        return ExploreService.get_global_feed_page(limit=limit)["items"]
+
+    @staticmethod
+    @memoize(timeout=60, l1_ttl=15)
+    def get_global_feed_page(cursor=None, limit=20, include_total=False) -> dict:
+        """
+        Feed global paginado por cursor: cada página continua de onde a anterior parou,
+        sem OFFSET. Páginas com cursor mudam pouco, então o cache é curto.
+        """
+        query = AlbumReview.query.filter_by(is_private=False)
+        page = keyset_paginate(query, AlbumReview, cursor, limit, include_total)
+        page["items"] = [ReviewSummary.model_validate(r).model_dump() for r in page["items"]]
+        return page
 
     @staticmethod
-    @cache.memoize(timeout=300)
-    def get_top_reviewers(limit=5) -> list:
+    @memoize(timeout=300, l1_ttl=30, early_refresh=True)
+    def get_top_reviewers(limit=5, window=TRENDING_DEFAULT_WINDOW) -> list:
         """
-        Retorna os usuários que mais fizeram reviews públicas nos últimos X dias.
+        Retorna os usuários que mais fizeram reviews públicas na janela (24h, 7d ou 30d),
+        somando os baldes diários de cada usuário (com o mesmo peso do get_trending_albums).
         """
-        days_ago = datetime.now(timezone.utc) - timedelta(days=TRENDING_DAYS_LIMIT)
+        window_start, weight = ActivityService.window_buckets(window, UserDailyActivity.day)
+        review_count = func.sum(UserDailyActivity.public_review_count * weight)
+
+        buckets = db.session.query(
+            UserDailyActivity.user_id,
+            review_count.label('review_count')
+        ).filter(
+            UserDailyActivity.day >= window_start
+        ).group_by(
+            UserDailyActivity.user_id
+        ).having(review_count >= 0.5).subquery()
 
         top_users_query = db.session.query(
             User.id,
             User.display_name,
             User.avatar_url,
-            func.count(AlbumReview.id).label('review_count')
+            buckets.c.review_count
         ).join(
-            AlbumReview, User.id == AlbumReview.user_id
-        ).filter(
-            AlbumReview.is_private == False,
-            AlbumReview.created_at >= days_ago
-        ).group_by(
-            User.id,
-            User.display_name,
-            User.avatar_url
-        ).order_by(desc('review_count')).limit(limit).all()
+            buckets, buckets.c.user_id == User.id
+        ).order_by(desc(buckets.c.review_count)).limit(limit).all()
 
         return [
             {
                 "user_id": str(row.id),
                 "display_name": row.display_name,
                 "avatar_url": row.avatar_url,
-                "review_count": row.review_count
+                "review_count": round(row.review_count)
             } for row in top_users_query
         ]
 
@@ -1,8 +1,11 @@
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from app.extensions import db
 from app.schemas import PaginatedCommentResponse
 from app.models import Comment, Vote, AlbumReview,BlogPost
 from app.exceptions import BusinessRuleError, ResourceNotFoundError
+from app.utils import keyset_paginate
+from app.services.user_service import UserService
 
 class InteractionService:
 
@@ -45,6 +48,7 @@ class InteractionService:
             content=content.strip()
         )
         db.session.add(new_comment)
+        UserService.adjust_counters(user_id, comment_count=1)
         db.session.commit()
         return new_comment
 
@@ -65,6 +69,18 @@ class InteractionService:
             pages=paginacao.pages
         )
 
+    @staticmethod
+    def get_comments_cursor(target_id: str, target_type: str, cursor: str = None, limit: int = 20, include_total: bool = False) -> dict:
+        """Comentários paginados por cursor (keyset em created_at, id), com o autor já carregado."""
+        query = db.session.query(Comment).options(joinedload(Comment.author)).filter_by(
+            target_id=target_id,
+            target_type=target_type.upper()
+        )
+
+        page = keyset_paginate(query, Comment, cursor, limit, include_total)
+        page["items"] = [c.to_dict() for c in page["items"]]
+        return page
+
     @staticmethod
     def delete_comment(user_id: str, comment_id: str):
         """Deleta um comentário (Apenas o autor pode deletar)."""
@@ -72,6 +88,7 @@ class InteractionService:
         if not comment:
             raise ResourceNotFoundError("Comentário não encontrado ou você não tem permissão para apagá-lo.")
         
+        UserService.adjust_counters(comment.user_id, comment_count=-1)
         db.session.delete(comment)
         db.session.commit()
         return True
@@ -101,6 +118,7 @@ class InteractionService:
             if vote.value == value:
                 # Clicou no mesmo botão que já estava ativo: Remove o voto
                 db.session.delete(vote)
+                UserService.adjust_counters(user_id, vote_count=-1)
                 action_result = "removed"
             else:
                 # Trocou de ideia (ex: era Downvote, virou Upvote)
@@ -115,6 +133,7 @@ class InteractionService:
                 value=value
             )
             db.session.add(new_vote)
+            UserService.adjust_counters(user_id, vote_count=1)
 
         db.session.commit()
         return action_result
@@ -0,0 +1,286 @@
+import json
+import time
+import queue
+import threading
+from datetime import datetime, timezone
+from flask import current_app
+from app.extensions import db
+from app.utils import metrics_util
+from app.utils.lru_util import BoundedTTLCache
+from app.utils.redis_util import get_redis
+from app.exceptions import ResourceNotFoundError
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+# O status do job é lido por qualquer usuário logado: a exceção crua fica só no log
+JOB_ERROR_MESSAGE = "Não foi possível concluir a tarefa. Tente novamente mais tarde."
+
+class _MemoryBackend:
+    """
+    Fila em memória com threads do próprio processo (dev/testes, sem Redis).
+    Os status ficam num LRU com TTL pra não crescer sem limite.
+    """
+
+    def __init__(self, app, status_ttl: int, workers: int):
+        self.app = app
+        self.queue = queue.Queue()
+        self.statuses = BoundedTTLCache(maxsize=5000, default_ttl=status_ttl)
+        self.lock = threading.Lock()
+        self.workers = workers
+        self._threads = []
+
+    def claim(self, job: dict) -> dict:
+        """Registra o job, a não ser que já exista um igual na fila ou rodando."""
+        with self.lock:
+            current = self.statuses.get(job['id'])
+            if current and current['status'] in (JOB_QUEUED, JOB_RUNNING):
+                return dict(current)
+            self.statuses.set(job['id'], dict(job))
+            return None
+
+    def push(self, job_id: str, delay: float = 0) -> None:
+        if delay > 0:
+            timer = threading.Timer(delay, self.queue.put, args=(job_id,))
+            timer.daemon = True
+            timer.start()
+        else:
+            self.queue.put(job_id)
+        self._ensure_workers()
+
+    def pop(self, timeout: float):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def get(self, job_id: str):
+        job = self.statuses.get(job_id)
+        return dict(job) if job else None
+
+    def save(self, job: dict) -> None:
+        self.statuses.set(job['id'], dict(job))
+
+    def release(self, job_id: str) -> None:
+        pass
+
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    def _ensure_workers(self) -> None:
+        with self.lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, daemon=True, name='escutas-job-worker')
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self) -> None:
+        with self.app.app_context():
+            while True:
+                job_id = self.queue.get()
+                JobService.run_job(job_id)
+                db.session.remove()
+
+
+class _RedisBackend:
+    """
+    Fila no Redis, compartilhada por todos os workers (web e 'flask jobs worker').
+    Jobs com retry ficam num sorted set pelo horário em que devem voltar pra fila.
+    """
+    QUEUE_KEY = 'jobs:queue'
+    DELAYED_KEY = 'jobs:delayed'
+
+    def __init__(self, redis_client, status_ttl: int):
+        self.redis = redis_client
+        self.status_ttl = status_ttl
+
+    def _status_key(self, job_id: str) -> str:
+        return f"jobs:status:{job_id}"
+
+    def _lock_key(self, job_id: str) -> str:
+        return f"jobs:lock:{job_id}"
+
+    def claim(self, job: dict) -> dict:
+        # A trava de dedupe vive enquanto o job estiver pendente (ou até expirar, se um worker morrer)
+        if not self.redis.set(self._lock_key(job['id']), '1', nx=True, ex=self.status_ttl):
+            return self.get(job['id']) or job
+        self.save(job)
+        return None
+
+    def push(self, job_id: str, delay: float = 0) -> None:
+        if delay > 0:
+            self.redis.zadd(self.DELAYED_KEY, {job_id: time.time() + delay})
+        else:
+            self.redis.lpush(self.QUEUE_KEY, job_id)
+
+    def pop(self, timeout: float):
+        self._promote_delayed()
+        item = self.redis.brpop(self.QUEUE_KEY, timeout=max(int(timeout), 1))
+        return item[1].decode() if item else None
+
+    def _promote_delayed(self) -> None:
+        for job_id in self.redis.zrangebyscore(self.DELAYED_KEY, 0, time.time()):
+            # zrem garante que só um worker move cada job
+            if self.redis.zrem(self.DELAYED_KEY, job_id):
+                self.redis.lpush(self.QUEUE_KEY, job_id)
+
+    def get(self, job_id: str):
+        raw = self.redis.get(self._status_key(job_id))
+        return json.loads(raw) if raw else None
+
+    def save(self, job: dict) -> None:
+        self.redis.set(self._status_key(job['id']), json.dumps(job), ex=self.status_ttl)
+
+    def release(self, job_id: str) -> None:
+        self.redis.delete(self._lock_key(job_id))
+
+    def depth(self) -> int:
+        return self.redis.llen(self.QUEUE_KEY) + self.redis.zcard(self.DELAYED_KEY)
+
+
+class JobService:
+    """
+    Jobs em segundo plano (ex: sincronizar a discografia de um artista).
+    Usa Redis quando REDIS_URL existe e uma fila em threads do processo caso contrário.
+    Com JOB_QUEUE_EAGER (testes), o job roda na hora, dentro do enqueue.
+    """
+    _handlers = {}
+    _backend = None
+    _backend_lock = threading.Lock()
+
+    @staticmethod
+    def register(name: str, handler) -> None:
+        """Associa um nome de job à função que o executa."""
+        JobService._handlers[name] = handler
+
+    @staticmethod
+    def job_id(name: str, *args) -> str:
+        """Id determinístico: o mesmo job com os mesmos argumentos é deduplicado."""
+        return ":".join([name, *[str(a) for a in args]])
+
+    @staticmethod
+    def _get_backend():
+        if JobService._backend is None:
+            with JobService._backend_lock:
+                if JobService._backend is None:
+                    status_ttl = current_app.config.get('JOB_STATUS_TTL', 86400)
+                    redis_client = get_redis()
+                    if redis_client is not None:
+                        JobService._backend = _RedisBackend(redis_client, status_ttl)
+                    else:
+                        JobService._backend = _MemoryBackend(
+                            current_app._get_current_object(), status_ttl,
+                            current_app.config.get('JOB_WORKERS', 2)
+                        )
+        return JobService._backend
+
+    @staticmethod
+    def enqueue(name: str, *args) -> dict:
+        """
+        Coloca o job na fila e devolve o status dele.
+        Se o mesmo job já estiver na fila ou rodando, devolve o status existente.
+        """
+        if name not in JobService._handlers:
+            raise ValueError(f"Job desconhecido: {name}")
+
+        now = datetime.now(timezone.utc).isoformat()
+        job = {
+            "id": JobService.job_id(name, *args),
+            "name": name,
+            "args": list(args),
+            "status": JOB_QUEUED,
+            "attempts": 0,
+            "error": None,
+            "enqueued_at": now,
+            "updated_at": now
+        }
+
+        backend = JobService._get_backend()
+        existing = backend.claim(job)
+        if existing:
+            metrics_util.increment('jobs.deduplicated')
+            return existing
+
+        metrics_util.increment(f"jobs.enqueued.{name}")
+
+        if current_app.config.get('JOB_QUEUE_EAGER'):
+            JobService.run_job(job['id'])
+        else:
+            backend.push(job['id'])
+
+        return backend.get(job['id']) or job
+
+    @staticmethod
+    def get_status(job_id: str) -> dict:
+        job = JobService._get_backend().get(job_id)
+        if not job:
+            raise ResourceNotFoundError("Job")
+        return job
+
+    @staticmethod
+    def run_job(job_id: str) -> None:
+        """
+        Executa um job da fila. Em caso de erro, re-agenda com backoff exponencial
+        até JOB_MAX_ATTEMPTS; depois disso o job fica como 'failed'.
+        """
+        backend = JobService._get_backend()
+        job = backend.get(job_id)
+        if not job:
+            return
+
+        job.update(status=JOB_RUNNING, attempts=job['attempts'] + 1, updated_at=datetime.now(timezone.utc).isoformat())
+        backend.save(job)
+
+        started = time.monotonic()
+        try:
+            JobService._handlers[job['name']](*job['args'])
+            job.update(status=JOB_DONE, error=None)
+            metrics_util.increment(f"jobs.done.{job['name']}")
+        except Exception as e:
+            db.session.rollback()
+
+            max_attempts = current_app.config.get('JOB_MAX_ATTEMPTS', 3)
+            job['error'] = JOB_ERROR_MESSAGE
+
+            if job['attempts'] < max_attempts and not current_app.config.get('JOB_QUEUE_EAGER'):
+                delay = current_app.config.get('JOB_RETRY_BACKOFF', 5) * 2 ** (job['attempts'] - 1)
+                job['status'] = JOB_QUEUED
+                backend.save(job)
+                backend.push(job_id, delay=delay)
+                metrics_util.increment(f"jobs.retried.{job['name']}")
+                current_app.logger.warning(f"[jobs] {job_id} falhou (tentativa {job['attempts']}), nova tentativa em {delay}s: {e!r}")
+                return
+
+            job['status'] = JOB_FAILED
+            metrics_util.increment(f"jobs.failed.{job['name']}")
+            current_app.logger.error(f"[jobs] {job_id} falhou definitivamente: {e!r}")
+        finally:
+            metrics_util.observe(f"jobs.duration.{job['name']}", time.monotonic() - started)
+
+        job['updated_at'] = datetime.now(timezone.utc).isoformat()
+        backend.save(job)
+        backend.release(job_id)
+
+    @staticmethod
+    def run_worker(burst: bool = False, poll_timeout: float = 5) -> int:
+        """
+        Loop do worker dedicado ('flask jobs worker'). Com burst=True, processa o que
+        estiver na fila e sai. Retorna quantos jobs foram executados.
+        """
+        backend = JobService._get_backend()
+        processed = 0
+
+        while True:
+            metrics_util.set_gauge('jobs.queue_depth', backend.depth())
+            job_id = backend.pop(timeout=poll_timeout)
+            if job_id is None:
+                if burst:
+                    return processed
+                continue
+
+            JobService.run_job(job_id)
+            db.session.remove()
+            processed += 1
@@ -1,7 +1,7 @@
 from app.extensions import db
 from app.models import MonthlyMeta, AlbumReview
 from app.exceptions import BusinessRuleError
-from app.utils import generate_monthly_title
+from app.utils import generate_monthly_title, month_window, get_user_timezone
 
 class MetaService:
     @staticmethod
@@ -43,22 +43,21 @@ class MetaService:
         Analisa os géneros das reviews do utilizador no mês 
         e gera um título automático.
         """
-        # Procura todas as reviews do utilizador naquele mês/ano
-        from sqlalchemy import extract
-        reviews = AlbumReview.query.filter(
+        # Procura os géneros das reviews do utilizador naquele mês/ano (no fuso dele)
+        tz_name = get_user_timezone(user_id, db.session)
+        rows = db.session.query(AlbumReview.artist_genres).filter(
             AlbumReview.user_id == user_id,
-            extract('month', AlbumReview.created_at) == month,
-            extract('year', AlbumReview.created_at) == year
+            month_window(AlbumReview.created_at, month, year, tz_name)
         ).all()
 
-        if not reviews:
+        if not rows:
             raise BusinessRuleError("Ainda não tens reviews este mês para gerar um título!")
 
         # Coleta todos os géneros (artist_genres é uma lista/JSON no banco)
         all_genres = []
-        for r in reviews:
-            if r.artist_genres:
-                all_genres.extend(r.artist_genres)
+        for (genres,) in rows:
+            if genres:
+                all_genres.extend(genres)
 
         # Usa o nosso utilitário da Missão 1
         new_title = generate_monthly_title(all_genres)
@@ -1,9 +1,19 @@
 import uuid
 from app.schemas import ReviewSummary
-from app.extensions import db, cache
+from app.extensions import db
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models import AlbumReview, TrackReview
+from app.models.review import summarize_track_scores
 from app.exceptions import BusinessRuleError, ResourceNotFoundError
 from app.services.stats_service import StatsService
+from app.services.album_stats_service import AlbumStatsService
+from app.services.activity_service import ActivityService
+from app.services.user_stats_service import UserStatsService
+from app.services.user_service import UserService
+from app.utils import bulk_insert, bulk_update, text_match
+from app.utils.cache_util import memoize, bump_generation, USER_NAMESPACE
+from app.utils.pagination_util import keyset_paginate
+from app.utils.date_util import month_window, to_local, get_user_timezone
 
 class ReviewService:
     @staticmethod
@@ -32,7 +42,12 @@ class ReviewService:
             if artist and artist.genres:
                 final_genres = artist.genres
             else:
-                final_genres = SpotifyService.get_artist_genres(user, artist_id)
+                final_genres = SpotifyService.get_artist_genres(artist_id)
+
+        # Média e Tier saem do payload já validado, sem reler as faixas do banco depois
+        average_score, tier = summarize_track_scores(
+            [track.get('userScore') for track in tracks_data if not track.get('is_ignored', False)]
+        )
 
         # Criando o registro pai
         review = AlbumReview(
@@ -44,34 +59,58 @@ class ReviewService:
             review_text=payload.get('review_text'),
             created_at=final_created_at,
             is_private=payload.get('is_private', False),
-            artist_genres=final_genres
+            artist_genres=final_genres,
+            average_score=average_score,
+            tier=tier
         )
         
         db.session.add(review)
         db.session.flush()
 
         # O Pydantic já validou que as notas são floats válidos e que pelo menos 1 faixa foi avaliada!
-        for track in tracks_data:
-            track_review = TrackReview(
-                album_review_id=review.id,
-                spotify_track_id=track.get('id'),
-                track_name=track.get('name'),
-                track_number=track.get('track_number'),
-                score=track.get('userScore'), # Se for ignorada, será None automaticamente
-                is_ignored=track.get('is_ignored', False)
-            )
-            db.session.add(track_review)
+        ReviewService._insert_tracks(review, tracks_data)
 
-        review.update_stats()
-        db.session.commit()
+        AlbumStatsService.record_review(review)
+        ActivityService.record_review(review)
+        UserStatsService.record_review(review)
+        UserService.adjust_counters(user.id, review_count=1)
+        StatsService.register_review_day(user, review)
 
-        StatsService.calculate_and_update_streak(user.id)
+        # A review já está completa na memória: desanexada da sessão, o commit não a
+        # expira e quem serializa a resposta não precisa recarregá-la do banco
+        db.session.expunge(review)
+        db.session.commit()
 
-        cache.delete_memoized(ReviewService._get_reviews_cached, str(user.id))
-        cache.delete_memoized(ReviewService.get_calendar_data, str(user.id))
+        # Histórico, calendário, estatísticas e platinas do usuário ficam inválidos de uma vez
+        bump_generation(USER_NAMESPACE, str(user.id))
 
         return review
 
+    @staticmethod
+    def _insert_tracks(review, tracks_data: list) -> list:
+        """
+        Grava todas as faixas da review num único executemany (sem um objeto ORM por faixa
+        na sessão) e já deixa review.tracks preenchido com elas, sem SELECT.
+        """
+        rows = [
+            {
+                'id': uuid.uuid4(),
+                'album_review_id': review.id,
+                'spotify_track_id': track.get('id'),
+                'track_name': track.get('name'),
+                'track_number': track.get('track_number'),
+                'score': track.get('userScore'), # Se for ignorada, será None automaticamente
+                'is_ignored': track.get('is_ignored', False)
+            }
+            for track in tracks_data
+        ]
+        # Faixas ignoradas têm score None: render_nulls mantém tudo no mesmo lote
+        bulk_insert(TrackReview, rows, render_nulls=True)
+
+        tracks = [TrackReview(**row) for row in rows]
+        set_committed_value(review, 'tracks', tracks)
+        return tracks
+
     @staticmethod
     def update_review(user, review_id, payload):
         """
@@ -82,6 +121,11 @@ class ReviewService:
         if not review:
             raise ResourceNotFoundError("Review não encontrada ou você não tem permissão para alterá-la.")
 
+        # Contribuição antiga nos agregados, pra aplicar só a diferença no final
+        stats_before = AlbumStatsService.contribution(review)
+        activity_before = ActivityService.contribution(review)
+        user_stats_before = UserStatsService.contribution(review)
+
         # Atualiza campos básicos
         if 'review_text' in payload:
             review.review_text = payload['review_text']
@@ -92,43 +136,83 @@ class ReviewService:
         # Atualiza as faixas se foram enviadas
         tracks_data = payload.get('tracks', [])
         if tracks_data:
-            for track_data in tracks_data:
-                # Busca a faixa no banco pelo ID do Spotify
-                track_review = TrackReview.query.filter_by(
-                    album_review_id=review.id, 
-                    spotify_track_id=track_data.get('id')
-                ).first()
-
-                if track_review:
-                    # Como o Pydantic já validou, podemos confiar cegamente nos dados
-                    track_review.is_ignored = track_data.get('is_ignored', track_review.is_ignored)
-                    
-                    # O dict.get retorna None se a chave não existir, mantendo a nota antiga se o usuário não enviou
-                    if not track_review.is_ignored:
-                        track_review.score = track_data.get('userScore', track_review.score)
-                    else:
-                        track_review.score = None # Se ignorou agora, a nota evapora
-
-            # PREPARA AS MUDANÇAS NA MEMÓRIA DO BANCO ANTES DE PERGUNTAR
-            db.session.flush()
-
-            # Sobrou alguma faixa avaliada no álbum inteiro? (nothing pro beta)
-            has_valid_track = TrackReview.query.filter_by(album_review_id=review.id, is_ignored=False).first()
-            
-            if not has_valid_track:
-                db.session.rollback()
-                raise BusinessRuleError("Você não pode ignorar todas as faixas do álbum. Pelo menos uma deve ser avaliada.")
-
-            # Recalcula a nota média e o tier do álbum baseado nas novas notas
-            review.update_stats()
+            ReviewService._apply_track_updates(review, tracks_data)
 
+        AlbumStatsService.update_review(review, stats_before)
+        ActivityService.update_review(review, activity_before)
+        UserStatsService.update_review(review, user_stats_before)
         db.session.commit()
 
-        cache.delete_memoized(ReviewService._get_reviews_cached, str(review.user_id))
-        cache.delete_memoized(ReviewService.get_calendar_data, str(review.user_id))
+        # Histórico, calendário, estatísticas e platinas do usuário ficam inválidos de uma vez
+        bump_generation(USER_NAMESPACE, str(review.user_id))
 
         return review
 
+    @staticmethod
+    def _apply_track_updates(review, tracks_data: list) -> None:
+        """
+        Aplica as notas enviadas com número fixo de idas ao banco, seja o álbum de 5 ou de 100
+        faixas: um SELECT com todas as faixas da review, validação e média na memória e um
+        único UPDATE em lote só com as faixas que mudaram.
+        """
+        tracks = TrackReview.query.filter_by(album_review_id=review.id).all()
+
+        # Faixas indexadas pelo ID do Spotify (a primeira vence, como o .first() de antes)
+        by_spotify_id = {}
+        for track in tracks:
+            by_spotify_id.setdefault(track.spotify_track_id, track)
+
+        # Estado final de cada faixa tocada: {id: {'id', 'is_ignored', 'score'}}
+        changes = {}
+        for track_data in tracks_data:
+            track_review = by_spotify_id.get(track_data.get('id'))
+            if not track_review:
+                continue
+
+            current = changes.get(track_review.id, {'is_ignored': track_review.is_ignored, 'score': track_review.score})
+
+            # Como o Pydantic já validou, podemos confiar cegamente nos dados (null = mantém)
+            is_ignored = track_data.get('is_ignored')
+            if is_ignored is None:
+                is_ignored = current['is_ignored']
+
+            # O dict.get retorna None se a chave não existir, mantendo a nota antiga se o usuário não enviou
+            # Se ignorou agora, a nota evapora
+            score = None if is_ignored else track_data.get('userScore', current['score'])
+
+            changes[track_review.id] = {'id': track_review.id, 'is_ignored': is_ignored, 'score': score}
+
+        # Sobrou alguma faixa avaliada no álbum inteiro? (nothing pro beta)
+        has_valid_track = any(
+            not changes.get(track.id, {'is_ignored': track.is_ignored})['is_ignored']
+            for track in tracks
+        )
+        if not has_valid_track:
+            db.session.rollback()
+            raise BusinessRuleError("Você não pode ignorar todas as faixas do álbum. Pelo menos uma deve ser avaliada.")
+
+        # Faixa avaliada precisa de nota (ex: voltou de ignorada sem mandar userScore)
+        final_states = [changes.get(track.id, {'is_ignored': track.is_ignored, 'score': track.score}) for track in tracks]
+        if any(not state['is_ignored'] and state['score'] is None for state in final_states):
+            db.session.rollback()
+            raise BusinessRuleError("Toda faixa avaliada precisa de uma nota. Envie 'userScore' ou ignore a faixa.")
+
+        by_id = {track.id: track for track in tracks}
+        rows = [
+            row for row in changes.values()
+            if (row['is_ignored'], row['score']) != (by_id[row['id']].is_ignored, by_id[row['id']].score)
+        ]
+        bulk_update(TrackReview, rows)
+
+        # O UPDATE em lote não mexe nos objetos da sessão: espelha os valores neles sem sujá-los
+        for row in rows:
+            set_committed_value(by_id[row['id']], 'is_ignored', row['is_ignored'])
+            set_committed_value(by_id[row['id']], 'score', row['score'])
+        set_committed_value(review, 'tracks', tracks)
+
+        # Recalcula a nota média e o tier do álbum com as faixas já em memória
+        review.update_stats()
+
     @staticmethod
     def delete_review(user, review_id):
         """
@@ -138,27 +222,32 @@ class ReviewService:
         if not review:
             raise ResourceNotFoundError("Review não encontrada ou você não tem permissão para apagá-la.")
 
+        AlbumStatsService.remove_review(review)
+        ActivityService.remove_review(review)
+        UserStatsService.remove_review(review)
+        UserService.adjust_counters(review.user_id, review_count=-1)
         db.session.delete(review)
+        StatsService.unregister_review_day(user, review)
         db.session.commit()
 
-        StatsService.calculate_and_update_streak(user.id)
-
-        cache.delete_memoized(ReviewService._get_reviews_cached, str(review.user_id))
-        cache.delete_memoized(ReviewService.get_calendar_data, str(review.user_id))
+        # Histórico, calendário, estatísticas e platinas do usuário ficam inválidos de uma vez
+        bump_generation(USER_NAMESPACE, str(review.user_id))
 
         return True
 
     @staticmethod
-    @cache.memoize(timeout=120)
+    @memoize(timeout=86400, namespace=USER_NAMESPACE)
     def get_calendar_data(user_id, month, year, request_user_id=None):
-        """Retorna reviews agrupadas por dia para o calendário (Já formatadas para JSON)."""
-        from sqlalchemy import extract
-        
-        # Constrói a Base da Busca
+        """
+        Retorna reviews agrupadas por dia para o calendário (Já formatadas para JSON).
+        Mês e dias seguem o fuso do dono do calendário.
+        """
+        tz_name = get_user_timezone(user_id, db.session)
+
+        # Constrói a Base da Busca (faixa em created_at, usa o idx_reviews_user_date)
         query = AlbumReview.query.filter(
             AlbumReview.user_id == user_id,
-            extract('month', AlbumReview.created_at) == month,
-            extract('year', AlbumReview.created_at) == year
+            month_window(AlbumReview.created_at, month, year, tz_name)
         )
 
         # Aplica o Filtro de Privacidade se for um visitante
@@ -170,7 +259,7 @@ class ReviewService:
         
         calendar = {}
         for review in reviews:
-            day = str(review.created_at.day)
+            day = str(to_local(review.created_at, tz_name).day)
             if day not in calendar:
                 calendar[day] = []
             
@@ -185,8 +274,13 @@ class ReviewService:
         return ReviewService._get_reviews_cached(user_id, page, per_page, filters_tuple, request_user_id)
 
     @staticmethod
-    @cache.memoize(timeout=120)
-    def _get_reviews_cached(user_id, page, per_page, filters_tuple, request_user_id):
+    def get_reviews_cursor(user_id, cursor=None, limit=20, filters=None, request_user_id=None, include_total=False):
+        """Histórico paginado por cursor (keyset em created_at, id), sem OFFSET e sem COUNT por padrão."""
+        filters_tuple = tuple(sorted(filters.items())) if filters else None
+        return ReviewService._get_reviews_cursor_cached(user_id, cursor, limit, filters_tuple, request_user_id, include_total)
+
+    @staticmethod
+    def _history_query(user_id, filters_tuple, request_user_id):
         filters = dict(filters_tuple) if filters_tuple else None
 
         query = AlbumReview.query.filter_by(user_id=user_id)
@@ -198,11 +292,15 @@ class ReviewService:
             if filters.get('tier'):
                 query = query.filter(AlbumReview.tier == filters['tier'])
             if filters.get('search'):
-                term = f"%{filters['search']}%"
-                query = query.filter(
-                    (AlbumReview.album_name.ilike(term)) |
-                    (AlbumReview.artist_name.ilike(term))
-                )
+                # Álbum ou artista, sem caixa e sem acento (o histórico segue em ordem de data)
+                query = query.filter(text_match(AlbumReview.search_text, filters['search']))
+
+        return query
+
+    @staticmethod
+    @memoize(timeout=86400, namespace=USER_NAMESPACE)
+    def _get_reviews_cached(user_id, page, per_page, filters_tuple, request_user_id):
+        query = ReviewService._history_query(user_id, filters_tuple, request_user_id)
 
         pagination = query.order_by(AlbumReview.created_at.desc())\
             .paginate(page=page, per_page=per_page, error_out=False)
@@ -215,4 +313,12 @@ class ReviewService:
             "pages": pagination.pages,
             "has_next": pagination.has_next,
             "has_prev": pagination.has_prev
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    @memoize(timeout=86400, namespace=USER_NAMESPACE)
+    def _get_reviews_cursor_cached(user_id, cursor, limit, filters_tuple, request_user_id, include_total):
+        query = ReviewService._history_query(user_id, filters_tuple, request_user_id)
+        page = keyset_paginate(query, AlbumReview, cursor, limit, include_total)
+        page["items"] = [ReviewSummary.model_validate(item).model_dump() for item in page["items"]]
+        return page
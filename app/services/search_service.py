@@ -1,68 +1,50 @@
+from flask import current_app
 from app.extensions import cache, db
 from app.services.spotify_service import SpotifyService
 from app.schemas import SearchResult
-from app.models import AlbumReview
+from app.models import Album, AlbumReview, AlbumTrack, Artist, User
+from app.utils import bulk_update, normalize_search_text, ranked_search, metrics_util
 import sqlalchemy as sa
 
+# Colunas de busca normalizadas: (modelo, coluna de busca, expressões de origem)
+_SEARCH_COLUMNS = (
+    (AlbumReview, 'search_text', (AlbumReview.album_name, AlbumReview.artist_name)),
+    (User, 'search_name', (User.display_name,)),
+    (Artist, 'search_name', (Artist.name,)),
+    (Album, 'search_text', (sa.func.coalesce(sa.func.nullif(Album.clean_name, ''), Album.name), Album.artist_name)),
+    (AlbumTrack, 'search_name', (AlbumTrack.name,)),
+)
+
+# Tipos do catálogo local, na ordem em que aparecem no dropdown
+CATALOG_TYPES = ('ARTIST', 'ALBUM', 'TRACK')
+
 class SearchService:
 
     @staticmethod
     @cache.memoize(timeout=300)
     def quick_search(query: str, limit_per_type: int = 3) -> list[SearchResult]:
         """
-        Realiza uma busca combinada no Spotify e retorna uma lista 
-        padronizada de SearchResult.
+        Busca combinada (artistas, álbuns, faixas e reviews) e retorna uma lista
+        padronizada de SearchResult. Responde primeiro pelo catálogo local; o Spotify
+        só é consultado se algum tipo não encheu o limite, e completa sem repetir IDs.
         """
         if not query or len(query) < 2:
             return []
 
-        sp = SpotifyService.get_client(user=None)
-        if not sp:
-            return []
+        by_type = SearchService.search_catalog(query, limit_per_type)
 
-        results = []
+        if any(len(items) < limit_per_type for items in by_type.values()):
+            metrics_util.increment('search.quick.spotify_fallback')
+            SearchService._merge_spotify_results(by_type, query, limit_per_type)
+        else:
+            metrics_util.increment('search.quick.local_hit')
 
-        try:
-            # Busca no Spotify (Artistas, Álbuns e Faixas de uma vez só)
-            # O limit é aplicado a CADA tipo.
-            search_data = sp.search(q=query, type='artist,album,track', limit=limit_per_type)
-
-            # artistas
-            for item in search_data.get('artists', {}).get('items', []):
-                results.append(SearchResult(
-                    id=item['id'],
-                    name=item['name'],
-                    type='ARTIST',
-                    image_url=item['images'][0]['url'] if item['images'] else None,
-                    subtitle="Artista"
-                ))
-
-            # albuns
-            for item in search_data.get('albums', {}).get('items', []):
-                results.append(SearchResult(
-                    id=item['id'],
-                    name=item['name'],
-                    type='ALBUM',
-                    spotify_artist_id=item['artists'][0]['id'] if item['artists'] else None,
-                    image_url=item['images'][0]['url'] if item['images'] else None,
-                    subtitle=item['artists'][0]['name'] if item['artists'] else "Álbum"
-                ))
-
-            # tracks
-            for item in search_data.get('tracks', {}).get('items', []):
-                results.append(SearchResult(
-                    id=item['id'],
-                    name=item['name'],
-                    type='TRACK',
-                    spotify_album_id=item['album']['id'],
-                    spotify_artist_id=item['artists'][0]['id'] if item['artists'] else None,
-                    image_url=item['album']['images'][0]['url'] if item['album']['images'] else None,
-                    subtitle=f"Música de {item['artists'][0]['name']}"
-                ))
+        results = [result for search_type in CATALOG_TYPES for result in by_type[search_type]]
 
+        try:
             # também pode mencionar reviews específicas:
             reviews = db.session.execute(
-               sa.select(AlbumReview).where(AlbumReview.album_name.ilike(f'%{query}%')).limit(limit_per_type)
+               ranked_search(sa.select(AlbumReview), AlbumReview.search_text, query).limit(limit_per_type)
             ).scalars().all()
             for r in reviews:
                results.append(SearchResult(id=str(r.id), name=r.album_name, type='REVIEW', subtitle="Reviews da Comunidade"))
@@ -70,4 +52,149 @@ class SearchService:
         except Exception as e:
             print(f"Erro na busca rápida: {e}")
             
-        return results
\ No newline at end of file
+        return results
+
+    @staticmethod
+    def search_catalog(query: str, limit_per_type: int, types=CATALOG_TYPES) -> dict:
+        """
+        Busca nas tabelas do catálogo (artists, albums, album_tracks) pelas colunas
+        normalizadas e indexadas por trigramas. Retorna {tipo: [SearchResult]}, mais
+        relevantes primeiro, uma consulta por tipo pedido.
+        """
+        by_type = {}
+
+        if 'ARTIST' in types:
+            artists = db.session.execute(
+                ranked_search(sa.select(Artist), Artist.search_name, query).limit(limit_per_type)
+            ).scalars().all()
+            by_type['ARTIST'] = [
+                SearchResult(id=a.spotify_artist_id, name=a.name, type='ARTIST', image_url=a.image_url, subtitle="Artista")
+                for a in artists
+            ]
+
+        if 'ALBUM' in types:
+            albums = db.session.execute(
+                ranked_search(sa.select(Album), Album.search_text, query).limit(limit_per_type)
+            ).scalars().all()
+            by_type['ALBUM'] = [
+                SearchResult(
+                    id=a.spotify_album_id,
+                    name=a.name,
+                    type='ALBUM',
+                    spotify_artist_id=a.artist_spotify_id,
+                    image_url=a.cover_url,
+                    subtitle=a.artist_name or "Álbum"
+                )
+                for a in albums
+            ]
+
+        if 'TRACK' in types:
+            # A mesma faixa pode estar em mais de um álbum (ex: edição deluxe): busca folga e deduplica
+            rows = db.session.execute(
+                ranked_search(
+                    sa.select(AlbumTrack, Album).join(Album, Album.spotify_album_id == AlbumTrack.album_spotify_id),
+                    AlbumTrack.search_name, query
+                ).limit(limit_per_type * 3)
+            ).all()
+            tracks = {}
+            for track, album in rows:
+                if track.spotify_track_id in tracks or len(tracks) == limit_per_type:
+                    continue
+                tracks[track.spotify_track_id] = SearchResult(
+                    id=track.spotify_track_id,
+                    name=track.name,
+                    type='TRACK',
+                    spotify_album_id=album.spotify_album_id,
+                    spotify_artist_id=album.artist_spotify_id,
+                    image_url=album.cover_url,
+                    subtitle=f"Música de {album.artist_name}"
+                )
+            by_type['TRACK'] = list(tracks.values())
+
+        return by_type
+
+    @staticmethod
+    def _merge_spotify_results(by_type: dict, query: str, limit_per_type: int) -> None:
+        """Completa cada tipo com o /search do Spotify até o limite, sem repetir IDs já achados."""
+        sp = SpotifyService.get_client(user=None)
+        if not sp:
+            return
+
+        try:
+            # Busca no Spotify (Artistas, Álbuns e Faixas de uma vez só)
+            # O limit é aplicado a CADA tipo.
+            search_data = sp.search(q=query, type='artist,album,track', limit=limit_per_type)
+
+            spotify_results = {
+                # artistas
+                'ARTIST': [
+                    SearchResult(
+                        id=item['id'],
+                        name=item['name'],
+                        type='ARTIST',
+                        image_url=item['images'][0]['url'] if item['images'] else None,
+                        subtitle="Artista"
+                    )
+                    for item in search_data.get('artists', {}).get('items', [])
+                ],
+                # albuns
+                'ALBUM': [
+                    SearchResult(
+                        id=item['id'],
+                        name=item['name'],
+                        type='ALBUM',
+                        spotify_artist_id=item['artists'][0].get('id') if item['artists'] else None,
+                        image_url=item['images'][0]['url'] if item['images'] else None,
+                        subtitle=item['artists'][0]['name'] if item['artists'] else "Álbum"
+                    )
+                    for item in search_data.get('albums', {}).get('items', [])
+                ],
+                # tracks
+                'TRACK': [
+                    SearchResult(
+                        id=item['id'],
+                        name=item['name'],
+                        type='TRACK',
+                        spotify_album_id=item['album'].get('id'),
+                        spotify_artist_id=item['artists'][0].get('id') if item['artists'] else None,
+                        image_url=item['album']['images'][0]['url'] if item['album']['images'] else None,
+                        subtitle=f"Música de {item['artists'][0]['name']}"
+                    )
+                    for item in search_data.get('tracks', {}).get('items', [])
+                ]
+            }
+        except Exception as e:
+            # Sem Spotify, o dropdown fica com o que o catálogo local achou
+            current_app.logger.warning(f"[search] busca rápida no Spotify falhou para {query!r}: {e!r}")
+            metrics_util.increment('search.quick.spotify_error')
+            return
+
+        for search_type, items in spotify_results.items():
+            found = by_type.setdefault(search_type, [])
+            seen = {result.id for result in found}
+            for result in items:
+                if len(found) >= limit_per_type:
+                    break
+                if result.id not in seen:
+                    found.append(result)
+                    seen.add(result.id)
+
+    @staticmethod
+    def rebuild_index(batch_size: int = 1000) -> int:
+        """
+        Recalcula as colunas de busca (reviews, usuários, artistas, álbuns e faixas)
+        a partir dos nomes, em lotes. Só regrava as linhas que mudaram; retorna quantas.
+        Serve de backfill e pra quando a normalização mudar. Quem chama faz o commit.
+        """
+        updated = 0
+        for model, target, sources in _SEARCH_COLUMNS:
+            stmt = sa.select(model.id, getattr(model, target), *sources)
+            result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+            for partition in result.partitions():
+                rows = []
+                for row_id, current, *names in partition:
+                    normalized = normalize_search_text(*names)
+                    if normalized != current:
+                        rows.append({'id': row_id, target: normalized})
+                updated += bulk_update(model, rows)
+        return updated
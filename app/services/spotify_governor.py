@@ -0,0 +1,283 @@
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from spotipy import Spotify
+from spotipy.exceptions import SpotifyException
+from app.exceptions import SpotifyAPIError
+from app.utils import metrics_util
+
+# Faixas de prioridade. Requisições interativas (busca, detalhes de álbum) passam
+# na frente da sincronização em segundo plano quando as fichas estão escassas.
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+_current_lane = contextvars.ContextVar('spotify_lane', default=INTERACTIVE)
+
+@contextmanager
+def spotify_lane(lane: str):
+    """
+    Marca todas as chamadas ao Spotify feitas dentro do bloco com a faixa informada.
+    Ex: with spotify_lane(BACKGROUND): SpotifySyncService.sync_artist_discography(...)
+    """
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+def endpoint_from_url(url: str) -> str:
+    """
+    Reduz a URL chamada pelo Spotipy a um nome de endpoint estável.
+    Ex: 'artists/123/albums' -> 'artists.albums' | 'albums/?ids=1,2' -> 'albums'
+    """
+    path = url.split('?')[0]
+    if '/v1/' in path:
+        path = path.split('/v1/', 1)[1]
+
+    segments = [s for s in path.split('/') if s]
+    if not segments:
+        return 'unknown'
+    if len(segments) >= 3:
+        return f"{segments[0]}.{segments[-1]}"
+    return segments[0]
+
+def _parse_retry_after(headers) -> float:
+    try:
+        return max(float((headers or {}).get('Retry-After', 1)), 0.0)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class LocalTokenBucket:
+    """Token bucket em memória (um por worker)."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+
+    def try_acquire(self, reserve: float = 0) -> float:
+        """
+        Tenta consumir uma ficha mantendo 'reserve' fichas intocadas.
+        Retorna 0 se conseguiu, ou quantos segundos esperar antes de tentar de novo.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            if self._tokens - reserve >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 + reserve - self._tokens) / self.rate
+
+    def refund(self) -> None:
+        """Devolve uma ficha consumida por uma chamada que acabou não acontecendo."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def paused_for(self) -> float:
+        with self._lock:
+            return max(self._paused_until - time.monotonic(), 0.0)
+
+
+class RedisTokenBucket:
+    """
+    Token bucket compartilhado entre workers via Redis.
+    O refill e o consumo acontecem atomicamente num script Lua.
+    """
+
+    _SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local reserve = tonumber(ARGV[4])
+    local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+    local wait = 0
+    if tokens - reserve >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 + reserve - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+    return tostring(wait)
+    """
+
+    _REFUND_SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+    if tokens then
+        redis.call('HSET', KEYS[1], 'tokens', math.min(capacity, tokens + 1))
+    end
+    return 0
+    """
+
+    def __init__(self, redis_client, key: str, rate: float, capacity: float):
+        self.redis = redis_client
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+        self._script = redis_client.register_script(self._SCRIPT)
+        self._refund_script = redis_client.register_script(self._REFUND_SCRIPT)
+
+    def try_acquire(self, reserve: float = 0) -> float:
+        wait = self._script(keys=[self.key], args=[self.rate, self.capacity, time.time(), reserve])
+        return float(wait)
+
+    def refund(self) -> None:
+        """Devolve uma ficha consumida por uma chamada que acabou não acontecendo."""
+        self._refund_script(keys=[self.key], args=[self.capacity])
+
+    def pause(self, seconds: float) -> None:
+        self.redis.set(f"{self.key}:paused", "1", px=max(int(seconds * 1000), 1))
+
+    def paused_for(self) -> float:
+        ttl_ms = self.redis.pttl(f"{self.key}:paused")
+        return ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else 0.0
+
+
+class SpotifyGovernor:
+    """
+    Governador global de taxa para o Spotify.
+    Toda chamada passa por um bucket global e, se configurado, por um bucket do endpoint.
+    Um 429 pausa o bucket global pelo tempo do Retry-After para todo mundo (e todos os
+    workers, no modo Redis), em vez de cada requisição descobrir o limite sozinha.
+    """
+
+    def __init__(self, rate: float, burst: float, endpoint_budgets: dict = None,
+                 background_reserve: float = 0, max_wait: float = 10, max_retries: int = 3,
+                 redis_client=None, key_prefix: str = 'spotify:governor'):
+        self.background_reserve = background_reserve
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self._cond = threading.Condition()
+        self._waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+
+        def make_bucket(name, bucket_rate, capacity):
+            if redis_client is not None:
+                return RedisTokenBucket(redis_client, f"{key_prefix}:{name}", bucket_rate, capacity)
+            return LocalTokenBucket(bucket_rate, capacity)
+
+        self._global = make_bucket('global', rate, burst)
+        self._endpoints = {
+            endpoint: make_bucket(endpoint, budget['rate'], budget.get('burst', budget['rate']))
+            for endpoint, budget in (endpoint_budgets or {}).items()
+        }
+
+    def _set_queue_gauge(self, lane: str) -> None:
+        metrics_util.set_gauge(f"spotify.governor.queue_depth.{lane}", self._waiting[lane])
+
+    def _check_deadline(self, started: float, wait: float) -> None:
+        """Lança 503 se esperar mais 'wait' segundos estouraria o max_wait."""
+        if time.monotonic() - started + wait > self.max_wait:
+            metrics_util.increment('spotify.governor.timeouts')
+            raise SpotifyAPIError("O Spotify está sobrecarregado no momento. Tente novamente em instantes.", status_code=503)
+
+    def acquire(self, endpoint: str, lane: str = INTERACTIVE) -> float:
+        """
+        Bloqueia até haver ficha disponível. Retorna quantos segundos esperou.
+        Lança SpotifyAPIError (503) se a espera passar de max_wait.
+        """
+        started = time.monotonic()
+        with self._cond:
+            self._waiting[lane] += 1
+            self._set_queue_gauge(lane)
+
+        try:
+            while True:
+                wait = self._global.paused_for()
+
+                if not wait and lane == BACKGROUND:
+                    # Sincronização em segundo plano cede a vez se há alguém interativo na fila
+                    # (a espera cedida também conta pro max_wait, senão um fluxo interativo
+                    # contínuo deixaria o job esperando pra sempre)
+                    with self._cond:
+                        if self._waiting[INTERACTIVE] > 0:
+                            self._check_deadline(started, 0.05)
+                            self._cond.wait(timeout=0.05)
+                            continue
+
+                bucket = self._endpoints.get(endpoint)
+                if not wait and bucket:
+                    wait = bucket.try_acquire()
+
+                if not wait:
+                    reserve = self.background_reserve if lane == BACKGROUND else 0
+                    wait = self._global.try_acquire(reserve=reserve)
+                    if wait and bucket:
+                        # Sem ficha global a chamada não sai: a do endpoint volta pro bucket
+                        bucket.refund()
+
+                if not wait:
+                    break
+
+                self._check_deadline(started, wait)
+                time.sleep(min(wait, 0.25))
+        finally:
+            with self._cond:
+                self._waiting[lane] -= 1
+                self._set_queue_gauge(lane)
+                self._cond.notify_all()
+
+        waited = time.monotonic() - started
+        metrics_util.observe(f"spotify.governor.wait.{lane}", waited)
+        metrics_util.increment(f"spotify.governor.requests.{endpoint}")
+        return waited
+
+    def penalize(self, retry_after: float) -> None:
+        """Pausa todas as chamadas pelo tempo pedido no Retry-After."""
+        metrics_util.increment('spotify.governor.throttled')
+        self._global.pause(retry_after)
+
+    def execute(self, url: str, call):
+        """
+        Executa 'call' respeitando o governador e re-tenta 429 depois do Retry-After.
+        """
+        endpoint = endpoint_from_url(url)
+        lane = _current_lane.get()
+
+        for attempt in range(self.max_retries + 1):
+            self.acquire(endpoint, lane)
+            try:
+                return call()
+            except SpotifyException as e:
+                if e.http_status != 429 or attempt == self.max_retries:
+                    raise
+                self.penalize(_parse_retry_after(e.headers))
+
+    def stats(self) -> dict:
+        """Profundidade atual das filas e métricas de espera por faixa."""
+        with self._cond:
+            queue_depth = dict(self._waiting)
+        return {"queue_depth": queue_depth, **metrics_util.snapshot('spotify.governor')}
+
+
+class GovernedSpotify(Spotify):
+    """
+    Cliente Spotipy em que toda requisição HTTP passa pelo SpotifyGovernor.
+    """
+
+    def __init__(self, *args, governor: SpotifyGovernor = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.governor = governor
+
+    def _internal_call(self, method, url, payload, params):
+        if self.governor is None:
+            return super()._internal_call(method, url, payload, params)
+
+        # O Spotipy altera o dict de params, então cada tentativa recebe uma cópia
+        return self.governor.execute(
+            url, lambda: super(GovernedSpotify, self)._internal_call(method, url, payload, dict(params))
+        )
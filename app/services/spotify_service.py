@@ -1,8 +1,13 @@
 import time
 import os
+import hashlib
+import threading
+import requests
 from typing import List, Optional
 from collections import Counter
 from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from spotipy import Spotify
 from spotipy.oauth2 import SpotifyOAuth, SpotifyClientCredentials
 from spotipy.cache_handler import MemoryCacheHandler
@@ -10,9 +15,167 @@ from spotipy.exceptions import SpotifyException
 from app.extensions import db, cache
 from app.schemas import AlbumBase, CurrentPlaybackResponse, SuggestionResponse
 from app.exceptions import SpotifyAPIError, AuthenticationError 
+from app.utils import metrics_util
+from app.utils.lru_util import BoundedTTLCache
+from app.utils.redis_util import get_redis
+from app.utils.singleflight_util import SingleFlight
+from app.utils.cache_util import memoize
+from app.services.spotify_governor import SpotifyGovernor, GovernedSpotify
+
+class _AppClientCredentials(SpotifyClientCredentials):
+    """
+    Client Credentials compartilhado pelo processo inteiro.
+    Reaproveita o mesmo token até faltar 'refresh_margin' segundos para expirar
+    e serializa a renovação com uma trava, pra que várias threads não peçam
+    tokens novos ao mesmo tempo.
+    """
+    def __init__(self, *args, refresh_margin: int = 60, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+
+    def is_token_expired(self, token_info) -> bool:
+        return token_info['expires_at'] - int(time.time()) < self.refresh_margin
+
+    def get_access_token(self, as_dict=False, check_cache=True):
+        with self._lock:
+            token_info = self.cache_handler.get_cached_token()
+            if check_cache and token_info and not self.is_token_expired(token_info):
+                metrics_util.increment('spotify.app_token.reuse')
+                return token_info if as_dict else token_info['access_token']
+
+            metrics_util.increment('spotify.app_token.refresh')
+            return super().get_access_token(as_dict=as_dict, check_cache=False)
 
 class SpotifyService:
-    _client_cache: dict = {}
+    _client_cache: Optional[BoundedTTLCache] = None
+    _app_client: Optional[Spotify] = None
+    _app_client_lock = threading.Lock()
+    _http_session: Optional[requests.Session] = None
+    _governor: Optional[SpotifyGovernor] = None
+    _artist_genres_flight = SingleFlight('spotify.artist_genres')
+
+    @staticmethod
+    def _get_http_session() -> requests.Session:
+        """
+        Sessão HTTP única com pool de conexões (keep-alive) para todas as chamadas ao Spotify.
+        Replica a política de retry padrão do Spotipy, que só é montada quando ele cria a própria sessão,
+        exceto o 429: esse fica com o SpotifyGovernor, que respeita o Retry-After para o processo todo.
+        """
+        if SpotifyService._http_session is None:
+            with SpotifyService._app_client_lock:
+                if SpotifyService._http_session is None:
+                    pool_size = current_app.config.get('SPOTIFY_HTTP_POOL_SIZE', 20)
+                    retry = Retry(
+                        total=3,
+                        connect=None,
+                        read=False,
+                        allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+                        status=3,
+                        backoff_factor=0.3,
+                        status_forcelist=(500, 502, 503, 504)
+                    )
+                    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+                    session = requests.Session()
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    SpotifyService._http_session = session
+
+        return SpotifyService._http_session
+
+    @staticmethod
+    def _get_governor() -> SpotifyGovernor:
+        """
+        Governador de taxa único por processo. Com REDIS_URL, os buckets ficam no Redis
+        e o limite vale para todos os workers juntos.
+        """
+        if SpotifyService._governor is None:
+            with SpotifyService._app_client_lock:
+                if SpotifyService._governor is None:
+                    config = current_app.config
+                    SpotifyService._governor = SpotifyGovernor(
+                        rate=config.get('SPOTIFY_RATE_LIMIT_PER_SECOND', 8),
+                        burst=config.get('SPOTIFY_RATE_LIMIT_BURST', 16),
+                        endpoint_budgets=config.get('SPOTIFY_RATE_LIMIT_ENDPOINTS'),
+                        background_reserve=config.get('SPOTIFY_RATE_LIMIT_BACKGROUND_RESERVE', 0),
+                        max_wait=config.get('SPOTIFY_RATE_LIMIT_MAX_WAIT', 10),
+                        max_retries=config.get('SPOTIFY_RATE_LIMIT_MAX_RETRIES', 3),
+                        redis_client=get_redis()
+                    )
+        return SpotifyService._governor
+
+    @staticmethod
+    def get_governor_stats() -> dict:
+        """Fila atual por faixa, tempos de espera e 429 recebidos pelo governador."""
+        return SpotifyService._get_governor().stats()
+
+    @staticmethod
+    def _get_app_client() -> Spotify:
+        """
+        Cliente da aplicação (Client Credentials Flow), criado uma única vez por processo.
+        O token é reaproveitado até perto de expirar e a sessão HTTP é compartilhada.
+        """
+        if SpotifyService._app_client is None:
+            session = SpotifyService._get_http_session()
+            governor = SpotifyService._get_governor()
+
+            with SpotifyService._app_client_lock:
+                if SpotifyService._app_client is None:
+                    credentials = _AppClientCredentials(
+                        client_id=os.getenv("SPOTIFY_CLIENT_ID"),
+                        client_secret=os.getenv("SPOTIFY_CLIENT_SECRET"),
+                        requests_session=session,
+                        cache_handler=MemoryCacheHandler(),
+                        refresh_margin=current_app.config.get('SPOTIFY_TOKEN_REFRESH_MARGIN', 60)
+                    )
+                    SpotifyService._app_client = GovernedSpotify(
+                        client_credentials_manager=credentials,
+                        requests_session=session,
+                        requests_timeout=current_app.config.get('SPOTIFY_REQUESTS_TIMEOUT', 5),
+                        governor=governor
+                    )
+
+        return SpotifyService._app_client
+
+    @staticmethod
+    def _get_client_registry() -> BoundedTTLCache:
+        """
+        Registro limitado (LRU + TTL) dos clientes por usuário deste processo.
+        """
+        if SpotifyService._client_cache is None:
+            with SpotifyService._app_client_lock:
+                if SpotifyService._client_cache is None:
+                    SpotifyService._client_cache = BoundedTTLCache(
+                        maxsize=current_app.config.get('SPOTIFY_USER_CLIENT_CACHE_SIZE', 500),
+                        name='spotify.user_clients'
+                    )
+        return SpotifyService._client_cache
+
+    @staticmethod
+    def _client_key(user) -> tuple:
+        """
+        Chave do cliente de um usuário: spotify_id + geração do token.
+        Quando o token é renovado (aqui ou em outro worker), a geração muda e o
+        próximo get_client monta um cliente novo automaticamente.
+        """
+        generation = hashlib.sha256(user.access_token.encode()).hexdigest()[:16]
+        return (user.spotify_id, generation)
+
+    @staticmethod
+    def get_user_client_stats() -> dict:
+        """Acertos, erros, descartes e ocupação do registro de clientes por usuário."""
+        return SpotifyService._get_client_registry().stats()
+
+    @staticmethod
+    def get_app_client_stats() -> dict:
+        """
+        Contadores do token da aplicação: quantas vezes foi renovado e quantas foi reaproveitado.
+        """
+        return {
+            "token_refreshes": metrics_util.get_counter('spotify.app_token.refresh'),
+            "token_reuses": metrics_util.get_counter('spotify.app_token.reuse')
+        }
     
     @staticmethod
     def get_oauth_object(redirect_uri=None):
@@ -43,11 +206,7 @@ class SpotifyService:
         """
         # Modo Genérico (Usado pelo BlogService, buscas deslogadas, etc)
         if not user:
-            client_credentials_manager = SpotifyClientCredentials(
-                client_id=os.getenv("SPOTIFY_CLIENT_ID"),
-                client_secret=os.getenv("SPOTIFY_CLIENT_SECRET")
-            )
-            return Spotify(client_credentials_manager=client_credentials_manager)
+            return SpotifyService._get_app_client()
 
         # Modo Usuário Logado
         if not user.access_token or not user.refresh_token:
@@ -56,10 +215,22 @@ class SpotifyService:
         expires_at = user.token_expires_at or 0
         now = int(time.time())
 
-        if user.spotify_id not in SpotifyService._client_cache:
-            SpotifyService._client_cache[user.spotify_id] = Spotify(auth=user.access_token)
+        registry = SpotifyService._get_client_registry()
+        key = SpotifyService._client_key(user)
+
+        client = registry.get(key)
+        if client is None:
+            client = GovernedSpotify(
+                auth=user.access_token,
+                requests_session=SpotifyService._get_http_session(),
+                requests_timeout=current_app.config.get('SPOTIFY_REQUESTS_TIMEOUT', 5),
+                governor=SpotifyService._get_governor()
+            )
+            # O cliente vive no máximo até o token expirar. Token já vencido não entra no registro.
+            if expires_at > now:
+                registry.set(key, client, ttl=expires_at - now)
 
-        return SpotifyService._client_cache[user.spotify_id]
+        return client
     
     @staticmethod
     def _extract_album_object(track_data) -> Optional[AlbumBase]:
@@ -81,7 +252,7 @@ class SpotifyService:
         )
 
     @staticmethod
-    @cache.memoize(timeout=600)
+    @memoize(timeout=600)
     def get_now_playing(user) -> Optional[CurrentPlaybackResponse]:
         """
         Busca o álbum que está sendo tocado nesse momento pelo usuário.
@@ -107,7 +278,7 @@ class SpotifyService:
             raise SpotifyAPIError(f"Erro na API do Spotify: {e.msg}")
 
     @staticmethod
-    @cache.memoize(timeout=600)
+    @memoize(timeout=600)
     def get_suggestions(user, limit=50, threshold=3) -> List[SuggestionResponse]:
         """
         Analisa o histórico recente do usuário para sugerir álbuns que ele tem ouvido com frequência.
@@ -157,7 +328,7 @@ class SpotifyService:
             raise SpotifyAPIError(f"Não foi possível buscar histórico recente: {e.msg}")
 
     @staticmethod
-    @cache.memoize(timeout=600)
+    @memoize(timeout=600)
     def get_user_top_artists(user, limit=5, time_range='short_term'):
         """
         Retorna os artistas que o usuário mais ouviu recentemente.
@@ -168,17 +339,19 @@ class SpotifyService:
         return results['items']
 
     @staticmethod
-    @cache.memoize(timeout=172800)
-    def get_artist_genres(user, artist_id: str) -> list:
+    @memoize(timeout=172800)
+    def get_artist_genres(artist_id: str) -> list:
         """
         Busca os gêneros musicais de um artista no Spotify.
+        Dado de catálogo: usa o cliente da aplicação e o cache vale para todos os usuários.
         """
         if not artist_id:
             return []
             
-        sp = SpotifyService.get_client(user)
+        sp = SpotifyService.get_client()
         try:
-            artist_info = sp.artist(artist_id)
+            # Vários usuários abrindo o mesmo artista em alta disparam uma única busca
+            artist_info = SpotifyService._artist_genres_flight.do(artist_id, lambda: sp.artist(artist_id))
             return artist_info.get('genres', [])
         except Exception as e:
             print(f"Erro ao buscar gêneros: {e}")
@@ -251,6 +424,7 @@ class SpotifyService:
                 )
 
             try:
+                old_key = SpotifyService._client_key(user) if user.access_token else None
                 sp_oauth = SpotifyService.get_oauth_object()
                 new_token_info = sp_oauth.refresh_access_token(user.refresh_token)
 
@@ -266,7 +440,8 @@ class SpotifyService:
 
                 user.update_tokens(new_token_info)
                 db.session.commit()
-                SpotifyService._client_cache.pop(user.spotify_id, None)
+                if old_key:
+                    SpotifyService._get_client_registry().pop(old_key)
 
                 current_app.logger.info(
                     f"[spotify_refresh] token renovado com sucesso para user={user.id} | "
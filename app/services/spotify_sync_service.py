@@ -1,85 +1,147 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from spotipy.exceptions import SpotifyException
 from app.extensions import db
 from app.services.spotify_service import SpotifyService
 from app.models import Artist, Album, AlbumTrack
-from app.utils import is_canonical_album, clean_album_title
+from app.utils import is_canonical_album, clean_album_title, bulk_upsert, normalize_search_text
 from app.exceptions import SpotifyAPIError
+from app.constants import SPOTIFY_ALBUMS_BATCH_SIZE, SPOTIFY_ARTISTS_BATCH_SIZE
+from app.services.spotify_governor import spotify_lane, BACKGROUND
+from app.services.job_service import JobService
+from app.utils import metrics_util
+from app.utils.singleflight_util import SingleFlight
+from app.utils.cache_util import bump_generation, ARTIST_NAMESPACE
+
+SYNC_FRESH = 'fresh'
+SYNC_STALE = 'stale'
+SYNC_EXPIRED = 'expired'
+SYNC_MISSING = 'missing'
+
+# Os payloads do Spotify são publicados no Redis pros outros workers: o líder só
+# commita depois (junto com quem o chamou), então eles não achariam a linha no banco
+_album_flight = SingleFlight('spotify.album', share_result=True)
+_artist_flight = SingleFlight('spotify.artist', share_result=True)
+
+def _sync_error(e: Exception, message: str) -> SpotifyAPIError:
+    """
+    Traduz a falha de uma sincronização mantendo o status que importa pra quem chama:
+    404 do Spotify continua 404 e o 503 do governador continua 503; o resto vira 502.
+    """
+    if isinstance(e, SpotifyAPIError):
+        return SpotifyAPIError(message, status_code=e.status_code)
+    if isinstance(e, SpotifyException) and e.http_status == 404:
+        return SpotifyAPIError(message, status_code=404)
+    return SpotifyAPIError(message)
 
 class SpotifySyncService:
 
     @staticmethod
-    def sync_artist(spotify_artist_id: str, sp=None) -> Artist:
+    def _freshness(entity, kind: str) -> str:
+        """
+        Classifica uma linha sincronizada do Spotify pelos TTLs de SPOTIFY_SYNC_TTL[kind]:
+        fresh (até 'soft'), stale (entre 'soft' e 'hard'), expired (depois de 'hard') ou missing.
+        """
+        if entity is None:
+            return SYNC_MISSING
+
+        ttl = current_app.config['SPOTIFY_SYNC_TTL'][kind]
+        if not entity.needs_sync(days=ttl['soft']):
+            return SYNC_FRESH
+        if entity.needs_sync(days=ttl['hard']):
+            return SYNC_EXPIRED
+        return SYNC_STALE
+
+    @staticmethod
+    def _serve_or_refresh(entity, kind: str, spotify_id: str, allow_stale: bool) -> bool:
+        """
+        Decide se a linha do banco pode ser devolvida sem ir ao Spotify.
+        Linha 'stale' é servida na hora e um job de atualização é agendado
+        (stale-while-revalidate); só ausente/expirada bloqueia a requisição.
+        """
+        state = SpotifySyncService._freshness(entity, kind)
+        if state == SYNC_FRESH:
+            return True
+
+        if state == SYNC_STALE and allow_stale:
+            metrics_util.increment(f"sync.{kind}.stale_served")
+            JobService.enqueue(f"sync_{kind}", spotify_id)
+            return True
+
+        metrics_util.increment(f"sync.{kind}.blocking_refresh.{state}")
+        return False
+
+    @staticmethod
+    def sync_artist(spotify_artist_id: str, sp=None, allow_stale: bool = True) -> Artist:
         """
         Busca ou cria um Artist no banco.
-        Só vai ao Spotify se não existir ou se needs_sync() for True.
+        Só bloqueia no Spotify se não existir ou se passou do TTL 'hard'. Entre o 'soft'
+        e o 'hard', devolve o que está no banco e agenda a atualização (allow_stale).
         """
         try: 
             artist = Artist.query.filter_by(spotify_artist_id=spotify_artist_id).first()
 
-            if artist and not artist.needs_sync():
+            if SpotifySyncService._serve_or_refresh(artist, 'artist', spotify_artist_id, allow_stale):
                 return artist
 
             if not sp:
                 sp = SpotifyService.get_client()
 
-            data = sp.artist(spotify_artist_id)
+            # Requisições simultâneas pelo mesmo artista fazem uma única busca no Spotify
+            data = _artist_flight.do(spotify_artist_id, lambda: SpotifySyncService._fetch_if_not_fresh(
+                Artist.query.filter_by(spotify_artist_id=spotify_artist_id), 'artist',
+                lambda: sp.artist(spotify_artist_id)
+            ))
+            if data is None:
+                return Artist.query.filter_by(spotify_artist_id=spotify_artist_id).first()
 
-            if not artist:
-                artist = Artist(spotify_artist_id=spotify_artist_id)
-                db.session.add(artist)
-
-            artist.name = data['name']
-            artist.image_url = data['images'][0]['url'] if data['images'] else None
-            artist.genres = data.get('genres', []) or []
-            artist.genres_synced_at = datetime.now(timezone.utc)
-            artist.last_synced_at = datetime.now(timezone.utc)
+            artist = SpotifySyncService._upsert_entity(
+                Artist, lambda a: SpotifySyncService._apply_artist(a, data), spotify_artist_id=spotify_artist_id
+            )
 
             db.session.flush()
             return artist
         except Exception as e:
             db.session.rollback()
-            raise SpotifyAPIError(f"Erro ao sincronizar artista {spotify_artist_id}: {str(e)}")
+            raise _sync_error(e, f"Erro ao sincronizar artista {spotify_artist_id}: {str(e)}")
 
     @staticmethod
-    def sync_album(spotify_album_id: str, sp=None) -> Album:
+    def sync_album(spotify_album_id: str, sp=None, allow_stale: bool = True) -> Album:
         """
         Busca ou cria um Album no banco com suas tracks.
-        Só vai ao Spotify se não existir ou se needs_sync() for True.
+        Mesma regra do sync_artist: só bloqueia no Spotify se não existir ou estiver expirado.
         """
         try:
             album = Album.query.filter_by(spotify_album_id=spotify_album_id).first()
 
-            if album and not album.needs_sync():
+            if SpotifySyncService._serve_or_refresh(album, 'album', spotify_album_id, allow_stale):
                 return album
 
             if not sp:
                 sp = SpotifyService.get_client()
 
-            data = sp.album(spotify_album_id)
-            raw_name = data['name']
+            data = _album_flight.do(spotify_album_id, lambda: SpotifySyncService._fetch_if_not_fresh(
+                Album.query.filter_by(spotify_album_id=spotify_album_id), 'album',
+                lambda: sp.album(spotify_album_id)
+            ))
+            if data is None:
+                return Album.query.filter_by(spotify_album_id=spotify_album_id).first()
+
             artist_spotify_id = data['artists'][0]['id'] if data['artists'] else None
 
             # Artista precisa existir antes do Album por causa do FK
             genres = []
             if artist_spotify_id:
-                artist = SpotifySyncService.sync_artist(artist_spotify_id, sp)
+                artist = SpotifySyncService.sync_artist(artist_spotify_id, sp, allow_stale)
                 if artist and artist.genres:
                     genres = artist.genres
 
-            if not album:
-                album = Album(spotify_album_id=spotify_album_id)
-                db.session.add(album)
-
-            album.name = raw_name
-            album.clean_name = clean_album_title(raw_name)
-            album.artist_name = ", ".join([a['name'] for a in data['artists']])
-            album.artist_spotify_id = artist_spotify_id
-            album.cover_url = data['images'][0]['url'] if data['images'] else None
-            album.release_date = data['release_date']
-            album.total_tracks = data['total_tracks']
-            album.is_canonical = is_canonical_album(raw_name)
-            album.genres = genres or None
-            album.last_synced_at = datetime.now(timezone.utc)
+            album = SpotifySyncService._upsert_entity(
+                Album, lambda a: SpotifySyncService._apply_album(a, data, genres), spotify_album_id=spotify_album_id
+            )
 
             db.session.flush()
             SpotifySyncService._sync_tracks(album, data['tracks'], sp)
@@ -88,61 +150,355 @@ class SpotifySyncService:
 
         except Exception as e:
             db.session.rollback()
-            raise SpotifyAPIError(f"Erro ao sincronizar álbum {spotify_album_id}: {str(e)}")
+            raise _sync_error(e, f"Erro ao sincronizar álbum {spotify_album_id}: {str(e)}")
             
     @staticmethod
-    def _sync_tracks(album: Album, tracks_data: dict, sp) -> None:
+    def _fetch_if_not_fresh(query, kind: str, fetch):
+        """
+        Roda dentro do single-flight. Relê a linha antes de buscar: se outro worker
+        atualizou enquanto esperávamos a trava, devolve None e evita a chamada ao Spotify.
         """
-        Deleta as tracks antigas e reinsere as atuais.
+        entity = query.populate_existing().first()
+        if SpotifySyncService._freshness(entity, kind) == SYNC_FRESH:
+            return None
+        return fetch()
+
+    @staticmethod
+    def _upsert_entity(model, apply, **keys):
         """
-        AlbumTrack.query.filter_by(album_spotify_id=album.spotify_album_id).delete()
+        Cria (ou atualiza) a linha aplicando 'apply'. A inserção roda num savepoint:
+        se outro worker inseriu a mesma linha no meio do caminho (unique do spotify_id),
+        relê a linha existente e aplica os dados por cima em vez de estourar o erro.
+        """
+        entity = model.query.filter_by(**keys).first()
+        if entity is None:
+            try:
+                with db.session.begin_nested():
+                    entity = model(**keys)
+                    apply(entity)
+                    db.session.add(entity)
+                return entity
+            except IntegrityError:
+                metrics_util.increment(f"sync.{model.__tablename__}.insert_race")
+                entity = model.query.filter_by(**keys).first()
 
-        while True:
-            for track in tracks_data['items']:
-                db.session.add(AlbumTrack(
-                    spotify_track_id=track['id'],
-                    album_spotify_id=album.spotify_album_id,
-                    name=track['name'],
-                    track_number=track['track_number'],
-                    duration_ms=track['duration_ms'],
-                    preview_url=track['preview_url'],
-                    suggested_ignore=False
-                ))
+        apply(entity)
+        return entity
 
-            if not tracks_data['next']:
-                break
+    @staticmethod
+    def _apply_artist(artist: Artist, data: dict) -> None:
+        """Copia os dados do Spotify para o Artist."""
+        artist.name = data['name']
+        artist.image_url = data['images'][0]['url'] if data['images'] else None
+        artist.genres = data.get('genres', []) or []
+        artist.genres_synced_at = datetime.now(timezone.utc)
+        artist.last_synced_at = datetime.now(timezone.utc)
 
-            tracks_data = sp.next(tracks_data)
+    @staticmethod
+    def _apply_album(album: Album, data: dict, genres: list) -> None:
+        """Copia os dados do Spotify para o Album (as tracks são tratadas à parte)."""
+        raw_name = data['name']
+        album.name = raw_name
+        album.clean_name = clean_album_title(raw_name)
+        album.artist_name = ", ".join([a['name'] for a in data['artists']])
+        album.artist_spotify_id = data['artists'][0]['id'] if data['artists'] else None
+        album.cover_url = data['images'][0]['url'] if data['images'] else None
+        album.album_type = data.get('album_type')
+        album.release_date = data['release_date']
+        album.total_tracks = data['total_tracks']
+        album.is_canonical = is_canonical_album(raw_name)
+        album.genres = genres or None
+        album.last_synced_at = datetime.now(timezone.utc)
 
     @staticmethod
-    def sync_artist_discography(spotify_artist_id: str, sp=None) -> Artist:
+    def _chunks(ids: list, size: int):
+        for i in range(0, len(ids), size):
+            yield ids[i:i + size]
+
+    @staticmethod
+    def _workers() -> int:
+        return current_app.config.get('SPOTIFY_SYNC_CONCURRENCY', 4)
+
+    @staticmethod
+    def _parallel_map(fn, items: list, workers: int) -> list:
         """
-        Sincroniza artista + discografia completa de estúdio.
-        Respeita needs_sync(30 dias) — não vai ao Spotify se estiver fresco.
+        Aplica fn a cada item em paralelo (threads), preservando a ordem.
+        Só faz I/O com o Spotify: nada de sessão do banco aqui dentro.
+        Cada thread herda o contexto atual (ex: a faixa do governador).
         """
-        try:
-            artist = SpotifySyncService.sync_artist(spotify_artist_id, sp)
+        if workers <= 1 or len(items) <= 1:
+            return [fn(item) for item in items]
 
-            if not artist.needs_sync():
-                return artist
+        with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def _fetch_artist_album_items(spotify_artist_id: str, sp, workers: int = 1) -> list:
+        """
+        Lista todos os álbuns de estúdio do artista. A primeira página diz o total
+        e as demais são buscadas em paralelo pelo offset.
+        """
+        page_size = 50
+        first = sp.artist_albums(spotify_artist_id, album_type='album', limit=page_size)
+        offsets = list(range(page_size, first.get('total') or 0, page_size))
+
+        pages = SpotifySyncService._parallel_map(
+            lambda offset: sp.artist_albums(spotify_artist_id, album_type='album', limit=page_size, offset=offset),
+            offsets, workers
+        )
+
+        items = list(first['items'])
+        for page in pages:
+            items.extend(page['items'])
+        return items
+
+    @staticmethod
+    def _fetch_albums(spotify_album_ids: list, sp, workers: int = 1) -> list:
+        """
+        Busca os álbuns (lotes de 20 em paralelo) e completa as tracks de quem passa
+        da página embutida, também em paralelo. Devolve os dados com 'tracks' completos.
+        """
+        chunks = list(SpotifySyncService._chunks(spotify_album_ids, SPOTIFY_ALBUMS_BATCH_SIZE))
+        responses = SpotifySyncService._parallel_map(lambda chunk: sp.albums(chunk), chunks, workers)
+        fetched = [data for response in responses for data in response['albums'] if data]
+
+        page_size = 50
+        track_pages = []
+        for data in fetched:
+            tracks = data['tracks']
+            if tracks.get('next'):
+                start = len(tracks['items'])
+                track_pages.extend((data['id'], offset) for offset in range(start, tracks['total'], page_size))
+
+        pages = SpotifySyncService._parallel_map(
+            lambda job: sp.album_tracks(job[0], limit=page_size, offset=job[1]), track_pages, workers
+        )
+        by_id = {data['id']: data for data in fetched}
+
+        for (album_id, _), page in zip(track_pages, pages):
+            by_id[album_id]['tracks']['items'].extend(page['items'])
+
+        for data in fetched:
+            data['tracks']['next'] = None
 
+        return fetched
+
+    @staticmethod
+    def sync_artists_batch(spotify_artist_ids: list, sp=None) -> dict:
+        """
+        Versão em lote do sync_artist. Só busca no Spotify os artistas ausentes ou
+        desatualizados, usando o endpoint de vários IDs (50 por chamada).
+        Retorna {spotify_artist_id: Artist}.
+        """
+        ids = list(dict.fromkeys(i for i in spotify_artist_ids if i))
+        if not ids:
+            return {}
+
+        artists = {
+            a.spotify_artist_id: a
+            for a in Artist.query.filter(Artist.spotify_artist_id.in_(ids)).all()
+        }
+        stale_ids = [i for i in ids if SpotifySyncService._freshness(artists.get(i), 'artist') != SYNC_FRESH]
+
+        if stale_ids:
             if not sp:
                 sp = SpotifyService.get_client()
 
-            results = sp.artist_albums(spotify_artist_id, album_type='album', limit=50)
-            all_albums = results['items']
+            chunks = list(SpotifySyncService._chunks(stale_ids, SPOTIFY_ARTISTS_BATCH_SIZE))
+            responses = SpotifySyncService._parallel_map(
+                lambda chunk: sp.artists(chunk), chunks, SpotifySyncService._workers()
+            )
 
-            while results['next']:
-                results = sp.next(results)
-                all_albums.extend(results['items'])
+            for response in responses:
+                for data in response['artists']:
+                    if not data:
+                        continue
 
-            for item in all_albums:
-                if item.get('album_type') == 'compilation':
-                    continue
-                SpotifySyncService.sync_album(item['id'], sp)
+                    artist = artists.get(data['id'])
+                    if not artist:
+                        artist = Artist(spotify_artist_id=data['id'])
+                        db.session.add(artist)
+                        artists[data['id']] = artist
 
-            db.session.commit()
-            return artist
+                    SpotifySyncService._apply_artist(artist, data)
+
+            db.session.flush()
+
+        return artists
+
+    @staticmethod
+    def sync_albums_batch(spotify_album_ids: list, sp=None) -> dict:
+        """
+        Versão em lote do sync_album. Busca os álbuns ausentes ou desatualizados
+        de 20 em 20, sincroniza todos os artistas envolvidos de uma vez só e só
+        pagina as tracks quando o álbum passa da página que já vem embutida.
+        As chamadas ao Spotify rodam em paralelo (SPOTIFY_SYNC_CONCURRENCY); as
+        escritas no banco acontecem depois, todas na thread que chamou.
+        Retorna {spotify_album_id: Album}.
+        """
+        ids = list(dict.fromkeys(i for i in spotify_album_ids if i))
+        if not ids:
+            return {}
+
+        albums = {
+            a.spotify_album_id: a
+            for a in Album.query.filter(Album.spotify_album_id.in_(ids)).all()
+        }
+        stale_ids = [i for i in ids if SpotifySyncService._freshness(albums.get(i), 'album') != SYNC_FRESH]
+        if not stale_ids:
+            return albums
+
+        if not sp:
+            sp = SpotifyService.get_client()
+
+        fetched = SpotifySyncService._fetch_albums(stale_ids, sp, SpotifySyncService._workers())
+
+        # Artista precisa existir antes do Album por causa do FK
+        artists = SpotifySyncService.sync_artists_batch(
+            [data['artists'][0]['id'] for data in fetched if data['artists']], sp
+        )
+
+        for data in fetched:
+            album = albums.get(data['id'])
+            if not album:
+                album = Album(spotify_album_id=data['id'])
+                db.session.add(album)
+                albums[data['id']] = album
+
+            artist = artists.get(data['artists'][0]['id']) if data['artists'] else None
+            SpotifySyncService._apply_album(album, data, artist.genres if artist else [])
+
+        db.session.flush()
+
+        # _fetch_albums já completou todas as páginas de tracks
+        SpotifySyncService._upsert_tracks({data['id']: data['tracks']['items'] for data in fetched})
+
+        return albums
+
+    @staticmethod
+    def _sync_tracks(album: Album, tracks_data: dict, sp) -> None:
+        """
+        Junta todas as páginas de tracks do álbum e aplica o diff no banco.
+        """
+        items = list(tracks_data['items'])
+        while tracks_data['next']:
+            tracks_data = sp.next(tracks_data)
+            items.extend(tracks_data['items'])
+
+        SpotifySyncService._upsert_tracks({album.spotify_album_id: items})
+
+    @staticmethod
+    def _upsert_tracks(tracks_by_album: dict) -> None:
+        """
+        Sincroniza as tracks de vários álbuns por diff, em poucas queries:
+        remove só as faixas que sumiram do Spotify, ignora as que não mudaram
+        e faz um upsert em lote (ON CONFLICT) das novas/alteradas.
+        O suggested_ignore de faixas existentes é preservado.
+        """
+        if not tracks_by_album:
+            return
+
+        fields = ('name', 'track_number', 'duration_ms', 'preview_url')
+        existing = {
+            (t.album_spotify_id, t.spotify_track_id): t
+            for t in AlbumTrack.query.filter(AlbumTrack.album_spotify_id.in_(list(tracks_by_album))).all()
+        }
+
+        incoming = {}
+        for album_id, items in tracks_by_album.items():
+            for track in items:
+                incoming[(album_id, track['id'])] = {
+                    "album_spotify_id": album_id,
+                    "spotify_track_id": track['id'],
+                    "name": track['name'],
+                    # O upsert não passa pelo ORM: a coluna de busca vai pronta
+                    "search_name": normalize_search_text(track['name']),
+                    "track_number": track['track_number'],
+                    "duration_ms": track['duration_ms'],
+                    "preview_url": track.get('preview_url'),
+                    "suggested_ignore": False
+                }
+
+        removed_ids = [t.id for key, t in existing.items() if key not in incoming]
+        changed_rows = [
+            row for key, row in incoming.items()
+            if key not in existing or any(getattr(existing[key], f) != row[f] for f in fields)
+        ]
+
+        if removed_ids:
+            AlbumTrack.query.filter(AlbumTrack.id.in_(removed_ids)).delete(synchronize_session=False)
+
+        bulk_upsert(
+            AlbumTrack, changed_rows,
+            index_elements=['album_spotify_id', 'spotify_track_id'],
+            update_columns=list(fields) + ['search_name']
+        )
+
+        if removed_ids or changed_rows:
+            # As linhas mudaram por fora do ORM: só as faixas dos álbuns afetados precisam ser relidas
+            touched = {key[0] for key in existing if key not in incoming} | {row['album_spotify_id'] for row in changed_rows}
+            for obj in list(db.session.identity_map.values()):
+                if isinstance(obj, AlbumTrack) and obj.album_spotify_id in touched:
+                    db.session.expire(obj)
+                elif isinstance(obj, Album) and obj.spotify_album_id in touched:
+                    db.session.expire(obj, ['tracks'])
+
+    @staticmethod
+    def sync_artist_discography(spotify_artist_id: str, sp=None) -> Artist:
+        """
+        Sincroniza artista + discografia completa de estúdio.
+        Respeita needs_discography_sync(30 dias) — não vai ao Spotify se estiver fresca.
+        Normalmente roda como job ('sync_artist_discography'), fora da requisição.
+        Roda na faixa de segundo plano do governador: buscas e detalhes passam na frente.
+        """
+        try:
+            with spotify_lane(BACKGROUND):
+                return SpotifySyncService._sync_artist_discography(spotify_artist_id, sp)
         except Exception as e:
             db.session.rollback()
-            raise SpotifyAPIError(f"Erro ao sincronizar discografia {spotify_artist_id}: {str(e)}")
\ No newline at end of file
+            raise _sync_error(e, f"Erro ao sincronizar discografia {spotify_artist_id}: {str(e)}")
+
+    @staticmethod
+    def _sync_artist_discography(spotify_artist_id: str, sp=None) -> Artist:
+        artist = Artist.query.filter_by(spotify_artist_id=spotify_artist_id).first()
+        if artist and not artist.needs_discography_sync():
+            return artist
+
+        artist = SpotifySyncService.sync_artist(spotify_artist_id, sp, allow_stale=False)
+
+        if not sp:
+            sp = SpotifyService.get_client()
+
+        all_albums = SpotifySyncService._fetch_artist_album_items(
+            spotify_artist_id, sp, SpotifySyncService._workers()
+        )
+
+        SpotifySyncService.sync_albums_batch(
+            [item['id'] for item in all_albums if item.get('album_type') != 'compilation'], sp
+        )
+
+        artist.discography_synced_at = datetime.now(timezone.utc)
+        db.session.commit()
+        # Álbuns entraram ou saíram: o progresso de platina cacheado deixa de valer
+        bump_generation(ARTIST_NAMESPACE, spotify_artist_id)
+        return artist
+
+
+def _run_discography_sync(spotify_artist_id: str) -> None:
+    SpotifySyncService.sync_artist_discography(spotify_artist_id)
+
+def _run_album_refresh(spotify_album_id: str) -> None:
+    from app.services.album_service import AlbumService
+    SpotifySyncService.sync_album(spotify_album_id, allow_stale=False)
+    db.session.commit()
+    # Os detalhes cacheados (7 dias) foram montados com a linha desatualizada
+    AlbumService._get_album_details_cached.delete(spotify_album_id)
+
+def _run_artist_refresh(spotify_artist_id: str) -> None:
+    SpotifySyncService.sync_artist(spotify_artist_id, allow_stale=False)
+    db.session.commit()
+
+JobService.register('sync_artist_discography', _run_discography_sync)
+JobService.register('sync_album', _run_album_refresh)
+JobService.register('sync_artist', _run_artist_refresh)
@@ -1,48 +1,50 @@
-from app.models import User, AlbumReview
+from app.models import User, UserStats, AlbumReview
 from app.extensions import db
-from app.utils import count_user_reviews, count_user_platinums, calculate_average_score, get_tier_distribution, get_top_artists, get_user_review_dates
+from sqlalchemy import func
+from app.utils import to_local, day_range, local_date, local_today
 from app.services.spotify_service import SpotifyService
 from app.services.artist_service import ArtistService
-from datetime import date, timedelta
+from app.services.user_stats_service import UserStatsService
+from datetime import timedelta
 
 class StatsService:
 
     @staticmethod
     def get_user_stats(user_id: str, request_user_id: str = None) -> dict:
         """
-        Calcula as estatísticas de um usuário, delegando as queries pesadas 
-        para o utilitário de banco de dados (StatsUtil).
+        Estatísticas do perfil lidas do retrato pronto em user_stats (uma leitura pela
+        chave primária, com as streaks do User no mesmo SELECT). Quem não é o dono
+        recebe o retrato só das reviews públicas.
         """
         is_public_view = str(request_user_id) != str(user_id)
 
-        total_reviews = count_user_reviews(user_id, is_public_view, db.session)
-        total_plats = count_user_platinums(user_id, db.session)
-        avg_score = calculate_average_score(user_id, is_public_view, db.session)
-        tier_dict = get_tier_distribution(user_id, is_public_view, db.session)
-        top_artists = get_top_artists(user_id, is_public_view, db.session)
-
-        total_artists = db.session.query(
-            db.func.count(db.func.distinct(AlbumReview.artist_name))
-        ).filter(AlbumReview.user_id == user_id)
-
-        if is_public_view:
-            total_artists = total_artists.filter(AlbumReview.is_private == False)
-
-        total_artists_reviewed = total_artists.scalar() or 0
+        row = UserStatsService.get(user_id, is_public_view)
+        if row is None:
+            stats, current_streak, longest_streak = UserStats(), 0, 0
+        else:
+            stats, current_streak, longest_streak = row
 
-        user = db.session.get(User, user_id)
+        review_count = stats.review_count or 0
+        avg_score = round(stats.score_sum / review_count, 2) if review_count else 0.0
 
         return {
             "overview": {
-                "total_reviews": total_reviews,
-                "total_platinums": total_plats,
-                "total_artists_reviewed": total_artists_reviewed,
+                "total_reviews": review_count,
+                "total_platinums": stats.platinum_count or 0,
+                "total_artists_reviewed": stats.artist_count or 0,
                 "average_score": avg_score,
-                "current_streak": user.current_streak if user else 0,
-                "longest_streak": user.longest_streak if user else 0
+                "current_streak": current_streak or 0,
+                "longest_streak": longest_streak or 0
             },
-            "tier_distribution": tier_dict,
-            "top_artists": top_artists
+            "tier_distribution": {
+                "S": stats.tier_s_count or 0,
+                "A": stats.tier_a_count or 0,
+                "B": stats.tier_b_count or 0,
+                "C": stats.tier_c_count or 0,
+                "D": stats.tier_d_count or 0,
+                "F": stats.tier_f_count or 0
+            },
+            "top_artists": stats.top_artists or []
         }
 
     @staticmethod
@@ -65,45 +67,165 @@ class StatsService:
         return result
     
     @staticmethod
-    def calculate_and_update_streak(user_id):
+    def calculate_and_update_streak(user_id, exact_longest: bool = False):
         """
-        Calcula a streak atual e a maior streak da história do usuário.
-        Diferente de um simples contador, ele analisa o calendário de reviews.
+        Recálculo completo da streak atual e da maior streak a partir do calendário de reviews.
+        É o caminho de correção: o dia a dia usa register_review_day/unregister_review_day.
+        Por padrão a maior streak só sobe; com exact_longest=True ela é recalculada de verdade.
         """
         user = db.session.get(User, user_id)
         if not user:
             return 0
 
-        # busca datas
-        review_dates = get_user_review_dates(user_id, db.session)
+        StatsService._recompute_streak(user, exact_longest)
+        db.session.commit()
+        return user.current_streak
 
-        # se não tem datas, zera a streak
-        if not review_dates:
-            user.current_streak = 0
-            db.session.commit()
-            return 0
+    @staticmethod
+    def register_review_day(user, review) -> None:
+        """
+        Atualiza a streak na criação de uma review comparando o dia dela (no fuso do
+        usuário) com o último dia ativo (last_review_date): dia novo sai em O(1), sem reler
+        o histórico. Review retroativa num dia vazio lê só a vizinhança do dia.
+        Recalcula tudo só pra usuário ainda sem last_review_date.
+        Não faz commit: entra na transação da review.
+        """
+        day = to_local(review.created_at, user.timezone).date()
+        last = user.last_review_date
+
+        if last is None:
+            StatsService._recompute_streak(user, exact_longest=True)
+            return
+
+        if day <= last:
+            # Dia que já contava, ou review retroativa num dia que já tinha outra
+            if day == last or StatsService._has_other_review_on(user, day, review.id):
+                return
+            # Retroativa num dia vazio: pode emendar a sequência de antes com a de depois
+            before, after = StatsService._run_around(user, day)
+            run = before + 1 + after
+            user.longest_streak = max(user.longest_streak or 0, run)
+            if day + timedelta(days=after) == last and StatsService._is_alive(user, last):
+                user.current_streak = run
+            return
+
+        if day - last == timedelta(days=1):
+            # Emenda a sequência do último dia (se a streak guardada zerou, mede ela no banco)
+            user.current_streak = (user.current_streak or StatsService._run_around(user, day)[0]) + 1
+        else:
+            # Depois de um buraco, recomeça em 1
+            user.current_streak = 1
+        user.last_review_date = day
+        user.longest_streak = max(user.longest_streak or 0, user.current_streak)
 
-        today = date.today()
-        yesterday = today - timedelta(days=1)
+    @staticmethod
+    def unregister_review_day(user, review) -> None:
+        """
+        Ajusta a streak depois de apagar uma review (chamar com o delete já na sessão).
+        Se o dia ainda tem outra review, nada muda. Se o dia sumiu, lê só a vizinhança dele
+        pra refazer a sequência que ele partiu; o histórico inteiro só é relido quando essa
+        sequência era do tamanho da maior streak (aí a maior streak pode descer).
+        Não faz commit.
+        """
+        day = to_local(review.created_at, user.timezone).date()
+        if StatsService._has_other_review_on(user, day, review.id):
+            return
+
+        before, after = StatsService._run_around(user, day)
+        if before + 1 + after >= (user.longest_streak or 0):
+            StatsService._recompute_streak(user, exact_longest=True)
+            return
+
+        last = user.last_review_date
+        if day == last:
+            StatsService._set_latest_run(user, day)
+        elif last is not None and day < last and day + timedelta(days=after) == last:
+            # O dia era da sequência atual: ela agora começa no dia seguinte a ele
+            user.current_streak = after if StatsService._is_alive(user, last) else 0
 
-        # verifica se a streak ainda está viva
-        if review_dates[0] < yesterday:
-            user.current_streak = 0
-        else:
-            # Conta a streak atual
-            current_count = 1
-            for i in range(len(review_dates) - 1):
-                # Se a diferença for exatamente 1 dia, a streak continua
-                if review_dates[i] - review_dates[i+1] == timedelta(days=1):
-                    current_count += 1
-                else:
-                    # Se houver um buraco, quebrou a streak atual
-                    break
-            user.current_streak = current_count
-
-        # Atualiza a Maior Streak do user (Longest Streak)
-        if user.current_streak > user.longest_streak:
-            user.longest_streak = user.current_streak
+    @staticmethod
+    def _has_other_review_on(user, day, exclude_review_id) -> bool:
+        """Existe outra review do usuário nesse dia (do fuso dele)? Busca por faixa no idx_reviews_user_date."""
+        start, end = day_range(day, user.timezone)
+        return db.session.query(AlbumReview.id).filter(
+            AlbumReview.user_id == user.id,
+            AlbumReview.created_at >= start,
+            AlbumReview.created_at < end,
+            AlbumReview.id != exclude_review_id
+        ).first() is not None
 
-        db.session.commit()
-        return user.current_streak
\ No newline at end of file
+    @staticmethod
+    def _is_alive(user, last) -> bool:
+        """A streak atual só está viva se o último dia ativo é hoje ou ontem."""
+        return last >= local_today(user.timezone) - timedelta(days=1)
+
+    @staticmethod
+    def _review_days(user, first=None, last=None):
+        """
+        Dias distintos com review (no fuso do usuário), do mais novo pro mais antigo.
+        O agrupamento por dia é feito no banco; first/last limitam a faixa de created_at.
+        """
+        day = local_date(AlbumReview.created_at, user.timezone)
+        query = db.session.query(day).filter(AlbumReview.user_id == user.id, AlbumReview.created_at.isnot(None))
+        if first is not None:
+            query = query.filter(AlbumReview.created_at >= day_range(first, user.timezone)[0])
+        if last is not None:
+            query = query.filter(AlbumReview.created_at < day_range(last, user.timezone)[1])
+        return query.distinct().order_by(day.desc())
+
+    @staticmethod
+    def _run_around(user, day) -> tuple:
+        """
+        Quantos dias seguidos com review há logo antes e logo depois de 'day' (sem contar ele).
+        Nenhuma sequência passa da maior streak, então basta ler essa janela de cada lado.
+        """
+        reach = timedelta(days=max(user.longest_streak or 0, user.current_streak or 0) + 1)
+        days = {review_day for (review_day,) in StatsService._review_days(user, day - reach, day + reach)}
+
+        before = 0
+        while day - timedelta(days=before + 1) in days:
+            before += 1
+        after = 0
+        while day + timedelta(days=after + 1) in days:
+            after += 1
+        return before, after
+
+    @staticmethod
+    def _set_latest_run(user, removed_day) -> None:
+        """O último dia ativo sumiu: acha o anterior (uma leitura no índice) e mede a sequência dele."""
+        start, _ = day_range(removed_day, user.timezone)
+        latest = db.session.query(func.max(AlbumReview.created_at)).filter(
+            AlbumReview.user_id == user.id,
+            AlbumReview.created_at < start
+        ).scalar()
+
+        if latest is None:
+            user.last_review_date, user.current_streak = None, 0
+            return
+
+        last = to_local(latest, user.timezone).date()
+        user.last_review_date = last
+        user.current_streak = StatsService._run_around(user, last)[0] + 1 if StatsService._is_alive(user, last) else 0
+
+    @staticmethod
+    def _recompute_streak(user, exact_longest: bool) -> None:
+        """
+        Percorre os dias com review do mais novo pro mais antigo (um por dia do fuso do
+        usuário, já agrupados no banco) e mede cada sequência de dias consecutivos.
+        """
+        # Sequências [último dia, tamanho], da mais recente pra mais antiga
+        runs = []
+        previous = None
+        for (day,) in StatsService._review_days(user).yield_per(1000):
+            if previous is not None and previous - day == timedelta(days=1):
+                runs[-1][1] += 1
+            else:
+                runs.append([day, 1])
+            previous = day
+
+        last_day, last_length = runs[0] if runs else (None, 0)
+        longest = max((length for _, length in runs), default=0)
+
+        user.last_review_date = last_day
+        user.current_streak = last_length if last_day and StatsService._is_alive(user, last_day) else 0
+        user.longest_streak = longest if exact_longest else max(user.longest_streak or 0, longest)
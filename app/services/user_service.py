@@ -1,8 +1,20 @@
 from typing import List, Optional
 from app.extensions import db
-from sqlalchemy import or_
-from app.models import User, Album, AlbumReview, UserPlatinum
+from sqlalchemy import or_, func, select, update
+from app.models import User, Album, AlbumReview, UserPlatinum, BlogPost, Comment, Vote
 from app.schemas import UserPublic, UserProfile,PlatinumTrophyOutput
+from app.exceptions import BusinessRuleError
+from app.utils import is_valid_timezone, text_match, text_rank
+from app.utils.cache_util import bump_generation, USER_NAMESPACE
+
+# Contador em users -> tabela de onde ele é recontado (coluna user_id em todas)
+_COUNTER_SOURCES = {
+    'review_count': AlbumReview,
+    'platinum_count': UserPlatinum,
+    'blog_post_count': BlogPost,
+    'comment_count': Comment,
+    'vote_count': Vote
+}
 
 class UserService:
     
@@ -19,14 +31,15 @@ class UserService:
         term = query_str.strip()
         
         # Query Híbrida:
-        # 1. display_name CONTÉM o termo (case insensitive)
+        # 1. nome CONTÉM o termo (sem caixa e sem acento, pelo índice de trigramas)
         # 2. OU spotify_id É IGUAL ao termo
+        # Os mais parecidos com o termo vêm primeiro
         users = User.query.filter(
             or_(
-                User.display_name.ilike(f'%{term}%'),
+                text_match(User.search_name, term),
                 User.spotify_id == term
             )
-        ).limit(20).all()
+        ).order_by(text_rank(User.search_name, term).desc(), User.search_name).limit(20).all()
 
         return [UserPublic.model_validate(user) for user in users]
 
@@ -48,6 +61,21 @@ class UserService:
             
         return user_dto
 
+    @staticmethod
+    def set_timezone(user, tz_name: str):
+        """
+        Define o fuso IANA do usuário (ex: 'America/Sao_Paulo'). None/vazio volta pra UTC.
+        Calendário e resumos mensais mudam de recorte, então o cache do usuário é invalidado.
+        """
+        if tz_name and not is_valid_timezone(tz_name):
+            raise BusinessRuleError(f"Fuso horário '{tz_name}' desconhecido. Use um nome IANA, ex: 'America/Sao_Paulo'.")
+
+        user.timezone = tz_name or None
+        db.session.commit()
+
+        bump_generation(USER_NAMESPACE, str(user.id))
+        return user.timezone
+
     @staticmethod
     def get_user_platinums(user_id) -> list:
         """
@@ -89,4 +117,35 @@ class UserService:
             entry['percentage'] = percentage
             data.append(entry)
 
-        return data
\ No newline at end of file
+        return data
+
+    @staticmethod
+    def adjust_counters(user_id, **deltas) -> None:
+        """
+        Soma os deltas nos contadores do usuário (ex: review_count=1), direto no banco
+        (coluna = coluna + delta), na transação de quem chama. Quem chama faz o commit.
+        """
+        db.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values({name: getattr(User, name) + delta for name, delta in deltas.items()})
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def reconcile_counters() -> int:
+        """
+        Recalcula os contadores de todos os usuários a partir das tabelas de origem e
+        corrige os que divergiram. Retorna quantos usuários foram corrigidos.
+        """
+        actual = {
+            name: select(func.count(model.id)).where(model.user_id == User.id).scalar_subquery()
+            for name, model in _COUNTER_SOURCES.items()
+        }
+        drifted = or_(*[getattr(User, name) != count for name, count in actual.items()])
+
+        result = db.session.execute(
+            update(User).where(drifted).values(actual).execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
@@ -0,0 +1,256 @@
+from sqlalchemy import case, delete, func, insert, update
+from app.extensions import db
+from app.models import AlbumReview, User, UserPlatinum, UserStats
+from app.utils.bulk_util import dialect_insert
+from app.constants import USER_STATS_TOP_ARTISTS
+
+# Tiers que aparecem no gráfico do perfil e a coluna de cada um
+_TIER_COLUMNS = {tier: f'tier_{tier.lower()}_count' for tier in ('S', 'A', 'B', 'C', 'D', 'F')}
+
+# Contadores somados/subtraídos a cada escrita de review
+_COUNTERS = ('review_count', 'score_sum') + tuple(_TIER_COLUMNS.values())
+
+# Colunas comparadas pelo check-user-stats
+_CHECKED = _COUNTERS + ('platinum_count', 'artist_count', 'top_artists')
+
+# Review sem is_private preenchido conta como pública (igual ao contribution())
+_is_public = func.coalesce(AlbumReview.is_private, False) == False
+
+class UserStatsService:
+    """
+    Mantém o retrato user_stats em dia com as reviews e platinas do usuário.
+    Como no AlbumStatsService, os métodos só executam SQL na sessão atual: o commit
+    é de quem chama, então o retrato entra (ou é desfeito) junto com a escrita.
+    """
+
+    @staticmethod
+    def contribution(review) -> dict:
+        """Quanto uma review soma em cada retrato: {is_public_view: contadores}."""
+        counters = dict.fromkeys(_COUNTERS, 0)
+        counters['review_count'] = 1
+        counters['score_sum'] = review.average_score or 0.0
+        if review.tier in _TIER_COLUMNS:
+            counters[_TIER_COLUMNS[review.tier]] = 1
+
+        public = dict.fromkeys(_COUNTERS, 0) if review.is_private else dict(counters)
+        return {False: counters, True: public}
+
+    @staticmethod
+    def record_review(review) -> None:
+        UserStatsService._apply(review.user_id, UserStatsService.contribution(review), artists_changed=True)
+
+    @staticmethod
+    def update_review(review, before: dict) -> None:
+        """
+        Aplica a diferença entre a contribuição antiga ('before', pega com contribution()
+        antes de alterar a review) e a atual. Os artistas só mudam se a privacidade mudou.
+        """
+        after = UserStatsService.contribution(review)
+        deltas = {
+            scope: {key: after[scope][key] - before[scope][key] for key in _COUNTERS}
+            for scope in after
+        }
+        privacy_changed = after[True]['review_count'] != before[True]['review_count']
+        UserStatsService._apply(review.user_id, deltas, artists_changed=privacy_changed)
+
+    @staticmethod
+    def remove_review(review) -> None:
+        """Retira a review do retrato (chamar antes de apagá-la)."""
+        contribution = UserStatsService.contribution(review)
+        deltas = {scope: {key: -value for key, value in counters.items()} for scope, counters in contribution.items()}
+        UserStatsService._apply(review.user_id, deltas, artists_changed=True, exclude_review_id=review.id)
+
+    @staticmethod
+    def record_platinum(user_id, delta: int = 1) -> None:
+        """Soma (ou tira, com delta=-1) uma platina nos dois retratos do usuário."""
+        result = db.session.execute(
+            update(UserStats)
+            .where(UserStats.user_id == user_id)
+            .values(platinum_count=UserStats.platinum_count + delta)
+        )
+        if result.rowcount < 2:
+            UserStatsService.refresh(user_id)
+
+    @staticmethod
+    def _apply(user_id, deltas: dict, artists_changed: bool, exclude_review_id=None) -> None:
+        """
+        UPDATE somando o delta nos contadores (coluna = coluna + delta, no banco).
+        Usuário ainda sem retrato (anterior à tabela) é recalculado inteiro aqui mesmo,
+        em vez de nascer só com o delta.
+        """
+        for is_public_view, delta in deltas.items():
+            if not any(delta.values()):
+                continue
+            result = db.session.execute(
+                update(UserStats)
+                .where(UserStats.user_id == user_id, UserStats.is_public_view == is_public_view)
+                .values({col: getattr(UserStats, col) + delta[col] for col in _COUNTERS})
+            )
+            if result.rowcount == 0:
+                UserStatsService.refresh(user_id, exclude_review_id)
+                return
+
+        if artists_changed:
+            UserStatsService._refresh_artists(user_id, exclude_review_id)
+
+    @staticmethod
+    def _refresh_artists(user_id, exclude_review_id=None) -> None:
+        """Contagem de artistas e top artistas não somam por delta: recalcula só os do usuário."""
+        artists = _artist_rows([user_id], exclude_review_id)
+        for is_public_view in (False, True):
+            artist_count, top_artists = _artist_fields(artists, user_id, is_public_view)
+            db.session.execute(
+                update(UserStats)
+                .where(UserStats.user_id == user_id, UserStats.is_public_view == is_public_view)
+                .values(artist_count=artist_count, top_artists=top_artists)
+            )
+
+    @staticmethod
+    def refresh(user_id, exclude_review_id=None) -> int:
+        """
+        Recalcula os dois retratos de um usuário a partir das reviews e platinas (caminho
+        de fallback). Retorna quantas linhas gravou (0 se o usuário não existe).
+        """
+        snapshots = _compute([user_id], exclude_review_id)
+        for values in snapshots:
+            stmt = dialect_insert(UserStats).values(**values)
+            db.session.execute(stmt.on_conflict_do_update(
+                index_elements=['user_id', 'is_public_view'],
+                set_={col: stmt.excluded[col] for col in _CHECKED}
+            ))
+        return len(snapshots)
+
+    @staticmethod
+    def rebuild() -> int:
+        """
+        Recalcula a tabela inteira (backfill ou correção). Retorna quantos usuários
+        foram gravados. Quem chama faz o commit.
+        """
+        snapshots = _compute()
+        db.session.execute(delete(UserStats))
+        if snapshots:
+            db.session.execute(insert(UserStats), snapshots)
+        return len(snapshots) // 2
+
+    @staticmethod
+    def check(user_ids=None) -> list:
+        """
+        Compara o retrato gravado com o recalculado e devolve as divergências
+        ({'user_id', 'is_public_view', 'field', 'stored', 'expected'}). Retrato faltando aparece
+        com field=None.
+        """
+        query = UserStats.query
+        if user_ids:
+            query = query.filter(UserStats.user_id.in_(user_ids))
+        stored = {(s.user_id, s.is_public_view): s for s in query.all()}
+
+        issues = []
+        for expected in _compute(user_ids):
+            key = (expected['user_id'], expected['is_public_view'])
+            snapshot = stored.get(key)
+            if snapshot is None:
+                issues.append({'user_id': key[0], 'is_public_view': key[1], 'field': None, 'stored': None, 'expected': None})
+                continue
+            for field in _CHECKED:
+                value, wanted = getattr(snapshot, field), expected[field]
+                same = abs(value - wanted) < 1e-6 if field == 'score_sum' else value == wanted
+                if not same:
+                    issues.append({'user_id': key[0], 'is_public_view': key[1], 'field': field, 'stored': value, 'expected': wanted})
+        return issues
+
+    @staticmethod
+    def get(user_id, is_public_view: bool):
+        """
+        Retrato do perfil + streaks do usuário numa única leitura pela chave primária.
+        Sem retrato ainda, recalcula esse usuário e grava. Retorna None se o usuário não existe.
+        """
+        def _read():
+            return db.session.query(UserStats, User.current_streak, User.longest_streak)\
+                .join(User, User.id == UserStats.user_id)\
+                .filter(UserStats.user_id == user_id, UserStats.is_public_view == is_public_view)\
+                .first()
+
+        row = _read()
+        if row is None:
+            if not UserStatsService.refresh(user_id):
+                return None
+            db.session.commit()
+            row = _read()
+        return row
+
+
+def _compute(user_ids=None, exclude_review_id=None) -> list:
+    """Retratos recalculados do zero (dois por usuário), como dicionários prontos pro INSERT."""
+    users = db.session.query(User.id)
+    if user_ids:
+        users = users.filter(User.id.in_(user_ids))
+    user_ids = [user_id for (user_id,) in users.all()]
+    if not user_ids:
+        return []
+
+    platinums = dict(
+        db.session.query(UserPlatinum.user_id, func.count(UserPlatinum.id))
+        .filter(UserPlatinum.user_id.in_(user_ids))
+        .group_by(UserPlatinum.user_id).all()
+    )
+    artists = _artist_rows(user_ids, exclude_review_id)
+
+    counters = {}
+    for is_public_view in (False, True):
+        query = db.session.query(
+            AlbumReview.user_id,
+            func.count(AlbumReview.id),
+            func.sum(func.coalesce(AlbumReview.average_score, 0.0)),
+            *[func.sum(case((AlbumReview.tier == tier, 1), else_=0)) for tier in _TIER_COLUMNS]
+        ).filter(AlbumReview.user_id.in_(user_ids))
+        if exclude_review_id is not None:
+            query = query.filter(AlbumReview.id != exclude_review_id)
+        if is_public_view:
+            query = query.filter(_is_public)
+
+        for user_id, *values in query.group_by(AlbumReview.user_id).all():
+            counters[(user_id, is_public_view)] = dict(zip(_COUNTERS, values))
+
+    snapshots = []
+    for user_id in user_ids:
+        for is_public_view in (False, True):
+            values = dict.fromkeys(_COUNTERS, 0)
+            values.update(counters.get((user_id, is_public_view), {}))
+            artist_count, top_artists = _artist_fields(artists, user_id, is_public_view)
+            snapshots.append({
+                'user_id': user_id,
+                'is_public_view': is_public_view,
+                **values,
+                'score_sum': float(values['score_sum'] or 0.0),
+                'platinum_count': platinums.get(user_id, 0),
+                'artist_count': artist_count,
+                'top_artists': top_artists
+            })
+    return snapshots
+
+def _artist_rows(user_ids, exclude_review_id=None) -> dict:
+    """{user_id: [(artista, total, públicas), ...]} numa consulta agrupada."""
+    query = db.session.query(
+        AlbumReview.user_id,
+        AlbumReview.artist_name,
+        func.count(AlbumReview.id),
+        func.sum(case((_is_public, 1), else_=0))
+    ).filter(AlbumReview.user_id.in_(user_ids))
+    if exclude_review_id is not None:
+        query = query.filter(AlbumReview.id != exclude_review_id)
+
+    rows = {}
+    for user_id, artist_name, total, public in query.group_by(AlbumReview.user_id, AlbumReview.artist_name).all():
+        rows.setdefault(str(user_id), []).append((artist_name, total, public or 0))
+    return rows
+
+def _artist_fields(artists: dict, user_id, is_public_view: bool):
+    """(quantidade de artistas distintos, top artistas) de um retrato."""
+    counts = [
+        (name, public if is_public_view else total)
+        for name, total, public in artists.get(str(user_id), [])
+    ]
+    counts = [(name, count) for name, count in counts if count > 0]
+    counts.sort(key=lambda item: (-item[1], item[0]))
+    top = [{"name": name, "count": count} for name, count in counts[:USER_STATS_TOP_ARTISTS]]
+    return len(counts), top
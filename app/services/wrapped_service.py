@@ -19,7 +19,7 @@ class WrappedService:
         if not user:
             raise BusinessRuleError("Usuário não encontrado.")
 
-        stats = get_monthly_summary(user_id, month, year, db.session)
+        stats = get_monthly_summary(user_id, month, year, db.session, tz_name=user.timezone)
         
         if not stats or stats['total_reviews'] == 0:
             raise BusinessRuleError(f"Você não possui avaliações suficientes em {month}/{year} para gerar um Wrapped.")
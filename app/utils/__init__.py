@@ -1,17 +1,28 @@
-from .decorator_util import require_auth, ensure_spotify_token
-from .response_util import success_response, paginated_response, error_response, handle_exception
+from .decorator_util import require_auth, require_admin, ensure_spotify_token
+from .response_util import success_response, paginated_response, cursor_response, error_response, handle_exception
+from .pagination_util import is_cursor_request, parse_cursor_args, keyset_paginate, encode_cursor, decode_cursor
 from .text_util import clean_album_title, is_canonical_album, is_track_skippable, generate_unique_slug
 from .user_util import resolve_target_user
 from .stats_util import count_user_reviews, count_user_platinums, calculate_average_score, get_tier_distribution, get_top_artists, get_community_bubble, get_user_review_dates, get_monthly_summary
 from .title_builder import generate_monthly_title
 from .mention_util import sync_post_mentions
 from .wrapped_util import generate_monthly_post_content
+from .bulk_util import bulk_insert, bulk_update, bulk_upsert
+from .search_util import normalize_search_text, text_match, text_rank, ranked_search
+from .date_util import month_range, day_range, month_window, to_local, local_date, local_today, get_user_timezone, is_valid_timezone
 
 __all__ = [
     'require_auth', 
+    'require_admin',
     'ensure_spotify_token',
     'success_response', 
     'paginated_response', 
+    'cursor_response',
+    'is_cursor_request',
+    'parse_cursor_args',
+    'keyset_paginate',
+    'encode_cursor',
+    'decode_cursor',
     'error_response', 
     'handle_exception', 
     'clean_album_title', 
@@ -29,5 +40,20 @@ __all__ = [
     'get_user_review_dates',
     'generate_monthly_title',
     'sync_post_mentions',
-    'generate_monthly_post_content'
-]
\ No newline at end of file
+    'generate_monthly_post_content',
+    'bulk_insert',
+    'bulk_update',
+    'bulk_upsert',
+    'month_range',
+    'day_range',
+    'month_window',
+    'to_local',
+    'local_date',
+    'local_today',
+    'get_user_timezone',
+    'is_valid_timezone',
+    'normalize_search_text',
+    'text_match',
+    'text_rank',
+    'ranked_search'
+]
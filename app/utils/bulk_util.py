@@ -0,0 +1,102 @@
+from sqlalchemy import insert, select, tuple_, update, or_
+from app.extensions import db
+from app.exceptions import UnsupportedDatabaseError
+
+# Bancos com INSERT ... ON CONFLICT
+_ON_CONFLICT_DIALECTS = ('postgresql', 'sqlite')
+
+def _dialect_name() -> str:
+    return db.session.get_bind().dialect.name
+
+def bulk_insert(model, rows: list, render_nulls: bool = False) -> int:
+    """
+    Insere várias linhas num único executemany (sem criar um objeto ORM por linha).
+    Defaults do Python (ex: id=uuid4) são aplicados pelo SQLAlchemy em cada linha.
+    Com render_nulls=True, valores None viram NULL no próprio INSERT: sem isso o SQLAlchemy
+    separa as linhas com e sem None em lotes diferentes.
+    """
+    if not rows:
+        return 0
+    stmt = insert(model)
+    if render_nulls:
+        stmt = stmt.execution_options(render_nulls=True)
+    db.session.execute(stmt, rows)
+    return len(rows)
+
+def bulk_update(model, rows: list) -> int:
+    """
+    UPDATE em lote pela chave primária: cada linha traz o id e só as colunas a alterar.
+    Vai num único executemany e não mexe nos objetos já carregados na sessão.
+    """
+    if not rows:
+        return 0
+    db.session.execute(update(model), rows)
+    return len(rows)
+
+def dialect_insert(model):
+    """INSERT com suporte a ON CONFLICT do banco em uso (PostgreSQL ou SQLite)."""
+    dialect = _dialect_name()
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise UnsupportedDatabaseError(dialect)
+    return dialect_insert(model)
+
+def bulk_upsert(model, rows: list, index_elements: list, update_columns: list) -> int:
+    """
+    INSERT ... ON CONFLICT (index_elements) DO UPDATE em lote (PostgreSQL ou SQLite).
+    A linha existente só é reescrita se alguma das update_columns mudou de fato,
+    então re-sincronizar dados iguais não gera escrita nem bloat.
+    """
+    if not rows:
+        return 0
+
+    # O mesmo conflito não pode aparecer duas vezes no mesmo comando
+    unique_rows = list({tuple(r[c] for c in index_elements): r for r in rows}.values())
+
+    if _dialect_name() not in _ON_CONFLICT_DIALECTS:
+        return _select_then_write(model, unique_rows, index_elements, update_columns)
+
+    stmt = dialect_insert(model)
+    table = model.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={c: stmt.excluded[c] for c in update_columns},
+        where=or_(*[table.c[c].is_distinct_from(stmt.excluded[c]) for c in update_columns])
+    )
+    db.session.execute(stmt, unique_rows)
+    return len(unique_rows)
+
+def _select_then_write(model, rows: list, index_elements: list, update_columns: list) -> int:
+    """
+    bulk_upsert pra bancos sem ON CONFLICT: lê as linhas que já existem pela chave e
+    separa um INSERT em lote das novas e um UPDATE em lote das que mudaram.
+    Não é atômico como o ON CONFLICT: duas escritas simultâneas da mesma chave nova
+    esbarram na constraint única em vez de se fundirem.
+    """
+    table = model.__table__
+    primary_key = [c.name for c in table.primary_key.columns]
+    key_columns = [table.c[c] for c in index_elements]
+    columns = dict.fromkeys(index_elements + primary_key + update_columns)
+
+    existing = {}
+    found = db.session.execute(
+        select(*[table.c[c] for c in columns])
+        .where(tuple_(*key_columns).in_([tuple(r[c] for c in index_elements) for r in rows]))
+    ).mappings()
+    for row in found:
+        existing[tuple(row[c] for c in index_elements)] = row
+
+    new_rows, changed_rows = [], []
+    for row in rows:
+        current = existing.get(tuple(row[c] for c in index_elements))
+        if current is None:
+            new_rows.append(row)
+        elif any(current[c] != row[c] for c in update_columns):
+            changed_rows.append({**{c: current[c] for c in primary_key}, **{c: row[c] for c in update_columns}})
+
+    bulk_insert(model, new_rows, render_nulls=True)
+    bulk_update(model, changed_rows)
+    return len(rows)
@@ -0,0 +1,336 @@
+import math
+import time
+import uuid
+import random
+import hashlib
+import inspect
+import functools
+import threading
+from collections import namedtuple
+from flask import current_app
+from spotipy import Spotify
+from app.extensions import cache
+from app.utils import metrics_util
+from app.utils.lru_util import BoundedTTLCache
+from app.utils.redis_util import get_redis
+from app.utils.singleflight_util import SingleFlight
+
+# O cache devolve None tanto pra "não existe" quanto pra "guardei None".
+# Guardamos este marcador no lugar de None pra conseguir cachear resultados vazios.
+_NONE = '__escutas_cache_none__'
+
+# Namespace com todos os dados derivados das reviews de um usuário
+# (histórico, calendário, estatísticas e progresso de platina).
+USER_NAMESPACE = 'user'
+# Namespace da discografia de um artista: curadoria e sync mudam o progresso de platina de todos
+ARTIST_NAMESPACE = 'artist'
+
+# Canal do Redis usado pra avisar os outros workers que uma chave mudou
+L1_INVALIDATION_CHANNEL = 'cache:l1:invalidate'
+_L1_CLEAR_ALL = '*'
+_MISS = object()
+
+# Envelope das entradas com early_refresh: quanto custou calcular e quando vence
+_Entry = namedtuple('_Entry', ['value', 'delta', 'expires_at'])
+# Peso da antecipação no XFetch: > 1 renova mais cedo, < 1 mais perto do vencimento
+EARLY_REFRESH_BETA = 1.0
+REFRESH_LOCK_TTL = 30
+
+_l1 = None
+_l1_lock = threading.Lock()
+_listener = None
+
+def _get_l1():
+    """
+    L1: LRU em memória do processo, na frente do cache compartilhado (L2, Redis).
+    Com Redis, sobe junto uma thread que escuta as invalidações publicadas pelos outros workers.
+    Retorna None se CACHE_L1_ENABLED estiver desligado.
+    """
+    global _l1
+    if not current_app.config.get('CACHE_L1_ENABLED', True):
+        return None
+
+    if _l1 is None:
+        with _l1_lock:
+            if _l1 is None:
+                _l1 = BoundedTTLCache(maxsize=current_app.config.get('CACHE_L1_MAXSIZE', 1000), name='cache.l1')
+                _start_listener()
+    return _l1
+
+def _start_listener() -> None:
+    global _listener
+    redis_client = get_redis()
+    if redis_client is None or _listener is not None:
+        return
+
+    _listener = threading.Thread(target=_listen, args=(redis_client,), daemon=True, name='escutas-cache-l1')
+    _listener.start()
+
+def _listen(redis_client) -> None:
+    while True:
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(L1_INVALIDATION_CHANNEL)
+            # Mensagens podem ter se perdido enquanto estávamos desconectados
+            _l1.clear()
+            for message in pubsub.listen():
+                key = message['data'].decode()
+                if key == _L1_CLEAR_ALL:
+                    _l1.clear()
+                else:
+                    _l1.pop(key)
+                metrics_util.increment('cache.l1.remote_invalidations')
+        except Exception:
+            metrics_util.increment('cache.l1.listener_errors')
+            time.sleep(1)
+
+def _invalidate_l1(key: str) -> None:
+    """Remove a chave do L1 deste processo e avisa os outros workers."""
+    if _l1 is not None:
+        if key == _L1_CLEAR_ALL:
+            _l1.clear()
+        else:
+            _l1.pop(key)
+
+    redis_client = get_redis()
+    if redis_client is not None:
+        redis_client.publish(L1_INVALIDATION_CHANNEL, key)
+
+def clear_l1() -> None:
+    """Esvazia o L1 de todos os workers (ex: depois de um cache.clear())."""
+    _invalidate_l1(_L1_CLEAR_ALL)
+
+def stats() -> dict:
+    """Acertos, erros e taxa de acerto de cada camada (L1 em memória, L2 compartilhado)."""
+    counters = metrics_util.snapshot('cache.l')['counters']
+    tiers = {}
+    for tier in ('l1', 'l2'):
+        hits = counters.get(f"cache.{tier}.hits", 0)
+        misses = counters.get(f"cache.{tier}.misses", 0)
+        tiers[tier] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0
+        }
+    tiers['l1']['size'] = len(_l1) if _l1 is not None else 0
+    tiers['l1']['remote_invalidations'] = counters.get('cache.l1.remote_invalidations', 0)
+    return tiers
+
+def _stable_part(value) -> str:
+    """
+    Converte um argumento em texto estável entre workers e instâncias.
+    Objetos do banco viram '<tabela>:<pk>' (o repr padrão muda a cada instância).
+    Clientes do Spotify são recusados: o cliente deve ser resolvido dentro da função.
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return repr(value)
+    if isinstance(value, uuid.UUID):
+        return repr(str(value))
+    if isinstance(value, Spotify):
+        raise TypeError("Clientes do Spotify não podem fazer parte da chave de cache.")
+    if hasattr(value, '__table__'):
+        pk = [str(getattr(value, col.key)) for col in value.__table__.primary_key.columns]
+        return f"{value.__table__.name}:{','.join(pk)}"
+    if isinstance(value, (list, tuple)):
+        return f"[{','.join(_stable_part(v) for v in value)}]"
+    if isinstance(value, dict):
+        return f"{{{','.join(f'{_stable_part(k)}={_stable_part(v)}' for k, v in sorted(value.items()))}}}"
+    raise TypeError(f"Argumento sem chave de cache estável: {type(value).__name__}")
+
+def make_key(func_name: str, args: tuple, kwargs: dict) -> str:
+    """Chave determinística: nome qualificado da função + hash dos argumentos estáveis."""
+    raw = "|".join([_stable_part(a) for a in args] + [f"{k}={_stable_part(v)}" for k, v in sorted(kwargs.items())])
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f"memo:{func_name}:{digest}"
+
+def _generation_key(namespace: str, owner_id) -> str:
+    return f"gen:{namespace}:{owner_id}"
+
+def _seed() -> int:
+    # Semente em microssegundos: se o contador sumir (expirou ou foi despejado),
+    # o novo valor nunca coincide com uma geração antiga, então nada velho volta a valer.
+    return time.time_ns() // 1000
+
+def get_generation(namespace: str, owner_id) -> int:
+    """Geração atual do namespace de um dono (ex: usuário). Cria o contador se não existir."""
+    key = _generation_key(namespace, owner_id)
+
+    redis_client = get_redis()
+    if redis_client is not None:
+        # Inteiro cru no Redis, fora do serializer do cachelib (que grava b"!" + pickle
+        # e faria o INCR do bump_generation falhar com "value is not an integer")
+        generation = redis_client.get(key)
+        if generation is None:
+            redis_client.set(key, _seed(), nx=True)
+            generation = redis_client.get(key)
+        return int(generation)
+
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _seed(), timeout=0)
+        generation = cache.get(key)
+    return int(generation)
+
+def bump_generation(namespace: str, owner_id) -> None:
+    """
+    Invalida de uma vez tudo que foi cacheado no namespace do dono, não importa quantas
+    combinações de página/filtro existam. As entradas antigas ficam órfãs e expiram
+    sozinhas pelo TTL. Com Redis é um SET NX (semente, se o contador não existe) + INCR
+    numa única ida; sem Redis, o cache em memória do processo faz o mesmo.
+    """
+    key = _generation_key(namespace, owner_id)
+
+    redis_client = get_redis()
+    if redis_client is not None:
+        pipe = redis_client.pipeline()
+        pipe.set(key, _seed(), nx=True)
+        pipe.incr(key)
+        pipe.execute()
+    else:
+        cache.add(key, _seed(), timeout=0)
+        cache.cache.inc(key)
+    metrics_util.increment(f"cache.generation.{namespace}.bumps")
+
+def _should_refresh(entry: _Entry) -> bool:
+    """
+    XFetch (expiração antecipada probabilística): quanto mais perto do vencimento e
+    quanto mais caro o cálculo, maior a chance de esta leitura disparar a renovação.
+    Assim um único acesso renova antes de a chave vencer, em vez de todos ao mesmo tempo.
+    """
+    return time.time() - entry.delta * EARLY_REFRESH_BETA * math.log(1.0 - random.random()) >= entry.expires_at
+
+def _unwrap(stored):
+    if isinstance(stored, _Entry):
+        stored = stored.value
+    return None if stored == _NONE else stored
+
+def memoize(timeout: int, cache_none: bool = False, namespace: str = None, l1_ttl: float = None,
+            early_refresh: bool = False):
+    """
+    Substituto do cache.memoize para a camada de serviços.
+    A chave depende só de identificadores estáveis (ids, strings, números), então
+    o mesmo resultado é reaproveitado entre requisições, instâncias e workers.
+    Com cache_none=True, resultados None também são guardados.
+    Com namespace, o primeiro argumento é o dono (ex: user_id) e a geração atual dele
+    entra na chave; bump_generation(namespace, dono) invalida todas as entradas.
+    Com l1_ttl, o resultado também fica no L1 em memória por até l1_ttl segundos
+    (só pra dados quentes e quase estáticos: o objeto é compartilhado, não modifique).
+    Com early_refresh, protege contra estouro de recálculo (stampede): a entrada é
+    renovada um pouco antes de vencer por uma única requisição (trava de renovação),
+    enquanto as outras seguem recebendo o valor anterior; o valor continua no L2 por
+    mais 'timeout' segundos como reserva. Com a chave vazia, só um worker calcula.
+    Expõe .cache_key(*args), .delete(*args) e .uncached(*args) na função decorada.
+    """
+    def decorator(func):
+        func_name = f"{func.__module__}.{func.__qualname__}"
+        signature = inspect.signature(func)
+        # timeout=0 no Flask-Caching é "sem expiração"; aí vale só o l1_ttl
+        local_ttl = min(l1_ttl, timeout) if l1_ttl and timeout else l1_ttl
+        flight = SingleFlight(f"cache.{func_name}") if early_refresh else None
+
+        def cache_key(*args, **kwargs):
+            # Normaliza posicional/nomeado/padrão: f(1, x=2) e f(1, 2) caem na mesma chave
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            values = tuple(bound.arguments.values())
+            key = make_key(func_name, values, {})
+            if namespace is None:
+                return key
+            return f"{key}:g{get_generation(namespace, str(values[0]))}"
+
+        def _read_l2(key, l1):
+            cached = cache.get(key)
+            if cached is None:
+                metrics_util.increment('cache.l2.misses')
+                return _MISS
+            metrics_util.increment('cache.l2.hits')
+            if l1 is not None:
+                l1.set(key, cached, ttl=local_ttl)
+            return cached
+
+        def _read(key, l1):
+            if l1 is not None:
+                cached = l1.get(key, _MISS)
+                if cached is not _MISS:
+                    return cached
+            return _read_l2(key, l1)
+
+        def _compute(key, l1, args, kwargs):
+            started = time.monotonic()
+            result = func(*args, **kwargs)
+            if result is not None or cache_none:
+                stored = _NONE if result is None else result
+                l2_timeout = timeout
+                if early_refresh:
+                    stored = _Entry(stored, time.monotonic() - started, time.time() + timeout)
+                    l2_timeout = timeout * 2
+                cache.set(key, stored, timeout=l2_timeout)
+                if l1 is not None:
+                    l1.set(key, stored, ttl=local_ttl)
+            return result
+
+        def _compute_once(key, l1, args, kwargs):
+            # Quem esperava a trava de outro worker relê o cache antes de calcular
+            cached = cache.get(key)
+            if cached is not None:
+                if l1 is not None:
+                    l1.set(key, cached, ttl=local_ttl)
+                return _unwrap(cached)
+            return _compute(key, l1, args, kwargs)
+
+        def _refresh_if_due(key, l1, cached, args, kwargs):
+            if not isinstance(cached, _Entry) or not _should_refresh(cached):
+                return cached, False
+
+            if l1 is not None:
+                # A cópia do L1 pode estar atrasada: outro worker talvez já tenha renovado
+                latest = _read_l2(key, l1)
+                if isinstance(latest, _Entry) and latest.expires_at > cached.expires_at:
+                    cached = latest
+                    if not _should_refresh(cached):
+                        return cached, False
+
+            lock_key = f"{key}:refresh"
+            if not cache.add(lock_key, 1, timeout=REFRESH_LOCK_TTL):
+                # Alguém já está renovando: serve o valor anterior
+                if time.time() >= cached.expires_at:
+                    metrics_util.increment(f"cache.{func_name}.stale_served")
+                return cached, False
+
+            try:
+                metrics_util.increment(f"cache.{func_name}.early_refreshes")
+                return _compute(key, l1, args, kwargs), True
+            finally:
+                cache.delete(lock_key)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = cache_key(*args, **kwargs)
+            l1 = _get_l1() if l1_ttl else None
+
+            cached = _read(key, l1)
+            if cached is _MISS:
+                metrics_util.increment(f"cache.{func_name}.misses")
+                if early_refresh:
+                    return flight.do(key, lambda: _compute_once(key, l1, args, kwargs))
+                return _compute(key, l1, args, kwargs)
+
+            metrics_util.increment(f"cache.{func_name}.hits")
+            if early_refresh:
+                cached, computed = _refresh_if_due(key, l1, cached, args, kwargs)
+                if computed:
+                    return cached
+            return _unwrap(cached)
+
+        def delete(*args, **kwargs):
+            key = cache_key(*args, **kwargs)
+            cache.delete(key)
+            if l1_ttl:
+                _invalidate_l1(key)
+
+        wrapper.cache_key = cache_key
+        wrapper.delete = delete
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
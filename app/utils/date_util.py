@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import Date, and_, func
+from app.extensions import db
+
+def resolve_timezone(tz_name: str = None):
+    """Fuso IANA do usuário (ex: 'America/Sao_Paulo'). Sem fuso ou fuso desconhecido vira UTC."""
+    if not tz_name:
+        return timezone.utc
+    try:
+        return ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        return timezone.utc
+
+def is_valid_timezone(tz_name: str) -> bool:
+    try:
+        ZoneInfo(tz_name)
+        return True
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        return False
+
+def month_range(month: int, year: int, tz_name: str = None):
+    """
+    Converte mês/ano no intervalo semiaberto [início, fim) em UTC sem fuso,
+    o mesmo formato em que created_at é gravado.
+    O mês é o do fuso do usuário: em 'America/Sao_Paulo', março começa às 03:00 UTC do dia 1.
+    """
+    tz = resolve_timezone(tz_name)
+    start = datetime(year, month, 1, tzinfo=tz)
+    end = datetime(year + 1, 1, 1, tzinfo=tz) if month == 12 else datetime(year, month + 1, 1, tzinfo=tz)
+    return (
+        start.astimezone(timezone.utc).replace(tzinfo=None),
+        end.astimezone(timezone.utc).replace(tzinfo=None)
+    )
+
+def day_range(day, tz_name: str = None):
+    """Mesmo que month_range, para um dia do calendário do usuário: [00:00, 00:00 do dia seguinte)."""
+    tz = resolve_timezone(tz_name)
+    start = datetime(day.year, day.month, day.day, tzinfo=tz)
+    end = start + timedelta(days=1)
+    return (
+        start.astimezone(timezone.utc).replace(tzinfo=None),
+        end.astimezone(timezone.utc).replace(tzinfo=None)
+    )
+
+def month_window(column, month: int, year: int, tz_name: str = None):
+    """
+    Filtro do mês como faixa na própria coluna (column >= início AND column < fim).
+    Diferente de extract('month', ...) == m, a faixa aproveita o índice (user_id, created_at):
+    o banco lê só as linhas do mês em vez de varrer todas as reviews do usuário.
+    """
+    start, end = month_range(month, year, tz_name)
+    return and_(column >= start, column < end)
+
+def to_local(moment: datetime, tz_name: str = None) -> datetime:
+    """Horário gravado (UTC sem fuso) convertido pro fuso do usuário."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(resolve_timezone(tz_name))
+
+def local_date(column, tz_name: str = None):
+    """
+    Dia do calendário do usuário de uma coluna em UTC sem fuso, calculado no banco
+    (pra agrupar ou fazer DISTINCT sem trazer cada linha pro Python).
+    No PostgreSQL usa o fuso IANA de verdade; no SQLite (testes) aplica o deslocamento
+    atual do fuso, sem considerar mudanças de horário de verão.
+    """
+    tz = resolve_timezone(tz_name)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return func.date(func.timezone(getattr(tz, 'key', 'UTC'), func.timezone('UTC', column)), type_=Date)
+    offset = datetime.now(tz).utcoffset().total_seconds() / 60
+    return func.date(column, f"{offset:+.0f} minutes", type_=Date)
+
+def local_today(tz_name: str = None):
+    """Data de hoje no fuso do usuário."""
+    return datetime.now(resolve_timezone(tz_name)).date()
+
+def get_user_timezone(user_id, db_session) -> str:
+    """Fuso cadastrado do usuário (None = UTC). Lê só a coluna, sem carregar o User."""
+    from app.models import User
+    return db_session.query(User.timezone).filter(User.id == user_id).scalar()
@@ -1,8 +1,9 @@
 from app.extensions import db
 from functools import wraps
+from flask import current_app
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
 from app.models import User
-from app.exceptions import ResourceNotFoundError, AuthenticationError
+from app.exceptions import ResourceNotFoundError, AuthenticationError, AuthorizationError
 
 def require_auth(f):
     """
@@ -25,6 +26,19 @@ def require_auth(f):
         return f(current_user, *args, **kwargs)
     return decorated
 
+def require_admin(f):
+    """
+    Decorator para rotas internas (métricas, diagnóstico).
+    Além do token válido, o usuário precisa estar em ADMIN_SPOTIFY_IDS.
+    """
+    @require_auth
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        if current_user.spotify_id not in current_app.config.get('ADMIN_SPOTIFY_IDS', []):
+            raise AuthorizationError()
+        return f(current_user, *args, **kwargs)
+    return decorated
+
 def ensure_spotify_token(f):
     """
     Decorator para proteger rotas.
@@ -0,0 +1,75 @@
+import time
+import threading
+from collections import OrderedDict
+from app.utils import metrics_util
+
+class BoundedTTLCache:
+    """
+    Cache em memória com limite de entradas (LRU) e tempo de vida por entrada.
+    Thread-safe, pensado pra registros locais do processo (clientes, L1 de cache...).
+    Quando 'name' é informado, os contadores também vão para o metrics_util.
+    """
+
+    def __init__(self, maxsize: int, default_ttl: float = None, name: str = None):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def _count(self, stat: str) -> None:
+        self._stats[stat] += 1
+        if self.name:
+            metrics_util.increment(f"{self.name}.{stat}")
+
+    def get(self, key, default=None):
+        """Devolve o valor e marca a entrada como usada recentemente."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._count("misses")
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self._count("expirations")
+                self._count("misses")
+                return default
+
+            self._data.move_to_end(key)
+            self._count("hits")
+            return value
+
+    def set(self, key, value, ttl: float = None) -> None:
+        """Guarda o valor. Se passar do limite, descarta o menos usado recentemente."""
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._count("evictions")
+
+    def pop(self, key, default=None):
+        """Remove a entrada (se existir) e devolve o valor."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[0] if entry else default
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> dict:
+        """Contadores de acerto/erro/descarte e ocupação atual."""
+        with self._lock:
+            return {**self._stats, "size": len(self._data), "maxsize": self.maxsize}
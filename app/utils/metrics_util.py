@@ -0,0 +1,62 @@
+import threading
+from collections import defaultdict
+
+# Registro de métricas em memória do processo (por worker). Serve pra gente
+# enxergar contadores de cache, Spotify, filas etc. sem depender de um sistema
+# externo de observabilidade. Cada worker do gunicorn tem o seu próprio registro.
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_gauges = {}
+_timings = {}
+
+def increment(name: str, value: int = 1) -> None:
+    """Soma 'value' ao contador 'name'."""
+    with _lock:
+        _counters[name] += value
+
+def set_gauge(name: str, value) -> None:
+    """Registra o valor atual de uma medida instantânea (ex: tamanho de fila)."""
+    with _lock:
+        _gauges[name] = value
+
+def observe(name: str, value: float) -> None:
+    """
+    Registra uma amostra de duração/tamanho.
+    Guarda apenas contagem, soma e máximo pra não crescer em memória.
+    """
+    with _lock:
+        timing = _timings.setdefault(name, {"count": 0, "sum": 0.0, "max": 0.0})
+        timing["count"] += 1
+        timing["sum"] += value
+        timing["max"] = max(timing["max"], value)
+
+def get_counter(name: str) -> int:
+    """Lê o valor atual de um contador."""
+    with _lock:
+        return _counters.get(name, 0)
+
+def snapshot(prefix: str = None) -> dict:
+    """
+    Retorna uma cópia de todas as métricas, opcionalmente filtradas pelo prefixo.
+    """
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        timings = {
+            name: {**data, "avg": round(data["sum"] / data["count"], 6) if data["count"] else 0.0}
+            for name, data in _timings.items()
+        }
+
+    if prefix:
+        counters = {k: v for k, v in counters.items() if k.startswith(prefix)}
+        gauges = {k: v for k, v in gauges.items() if k.startswith(prefix)}
+        timings = {k: v for k, v in timings.items() if k.startswith(prefix)}
+
+    return {"counters": counters, "gauges": gauges, "timings": timings}
+
+def reset() -> None:
+    """Zera todas as métricas (usado nos testes)."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _timings.clear()
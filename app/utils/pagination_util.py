@@ -0,0 +1,68 @@
+import json
+import uuid
+import base64
+from datetime import datetime, timezone
+from pydantic import ValidationError
+from sqlalchemy import and_, or_
+from app.exceptions import BusinessRuleError
+
+def is_cursor_request(args) -> bool:
+    """
+    A paginação por cursor é escolhida quando a requisição manda 'cursor' ou 'limit'.
+    Sem eles, as rotas seguem com page/per_page (compatibilidade).
+    """
+    return 'cursor' in args or 'limit' in args
+
+def parse_cursor_args(args):
+    """Valida cursor/limit/include_total da query string (CursorQuery)."""
+    from app.schemas.pagination import CursorQuery
+    try:
+        return CursorQuery.model_validate(args.to_dict())
+    except ValidationError:
+        raise BusinessRuleError("Parâmetros de paginação inválidos. 'limit' deve estar entre 1 e 100.")
+
+def encode_cursor(created_at: datetime, item_id) -> str:
+    """Cursor opaco com a posição (created_at, id) do último item entregue."""
+    if created_at.tzinfo is not None:
+        # As colunas são gravadas em UTC sem fuso; o cursor segue o mesmo formato
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    raw = json.dumps([created_at.isoformat(), str(item_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str):
+    """Devolve (created_at, id) do cursor. Cursor adulterado ou truncado vira erro 400."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), uuid.UUID(item_id)
+    except (ValueError, TypeError):
+        raise BusinessRuleError("Cursor de paginação inválido.")
+
+def keyset_paginate(query, model, cursor: str = None, limit: int = 20, include_total: bool = False) -> dict:
+    """
+    Paginação por keyset em (created_at, id), do mais novo pro mais antigo.
+    Em vez de OFFSET (que lê e descarta as linhas anteriores), filtra a partir da
+    posição do cursor, então a página 100 custa o mesmo que a primeira.
+    O COUNT(*) só roda se include_total=True.
+    Retorna {'items', 'next_cursor', 'has_next', 'limit', 'total'} com os objetos do banco em 'items'.
+    """
+    page_query = query
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        page_query = page_query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < item_id)
+        ))
+
+    # Um item a mais só pra saber se existe próxima página
+    rows = page_query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    has_next = len(rows) > limit
+    items = rows[:limit]
+
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(items[-1].created_at, items[-1].id) if has_next else None,
+        "has_next": has_next,
+        "limit": limit,
+        "total": query.order_by(None).count() if include_total else None
+    }
@@ -0,0 +1,24 @@
+import threading
+from flask import current_app
+
+_client = None
+_lock = threading.Lock()
+
+def get_redis():
+    """
+    Retorna um cliente Redis compartilhado pelo processo, ou None se REDIS_URL
+    não estiver configurado (modo dev/testes, tudo fica em memória).
+    """
+    global _client
+
+    url = current_app.config.get('REDIS_URL')
+    if not url:
+        return None
+
+    if _client is None:
+        with _lock:
+            if _client is None:
+                import redis
+                _client = redis.Redis.from_url(url)
+
+    return _client
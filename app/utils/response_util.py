@@ -43,6 +43,26 @@ def paginated_response(pagination, message="Success"):
         "meta": meta
     }), 200
 
+def cursor_response(page: dict, message="Success"):
+    """
+    Envelope das listagens paginadas por cursor (ver pagination_util.keyset_paginate).
+    'total_items' só aparece quando o total foi pedido (include_total).
+    """
+    meta = {
+        "next_cursor": page["next_cursor"],
+        "has_next": page["has_next"],
+        "limit": page["limit"]
+    }
+    if page.get("total") is not None:
+        meta["total_items"] = page["total"]
+
+    return jsonify({
+        "status": "success",
+        "message": message,
+        "data": page["items"],
+        "meta": meta
+    }), 200
+
 def error_response(message, status_code=400, payload=None):
     """
     Padroniza erros da API gerados manualmente.
@@ -0,0 +1,47 @@
+import unicodedata
+from sqlalchemy import case, func, literal, or_
+from app.extensions import db
+
+def normalize_search_text(*parts) -> str:
+    """
+    Texto de busca: minúsculo, sem acento e com espaços simples.
+    Ex: ("Construção", "Chico Buarque") -> "construcao chico buarque"
+    """
+    text = ' '.join(part for part in parts if part)
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.split())
+
+def _is_postgres() -> bool:
+    return db.session.get_bind().dialect.name == 'postgresql'
+
+def text_match(column, term: str):
+    """
+    Filtro de busca numa coluna já normalizada (normalize_search_text).
+    No PostgreSQL, o LIKE '%termo%' e o <% (word_similarity, tolera erro de digitação)
+    usam o índice GIN gin_trgm_ops da coluna em vez de varrer a tabela.
+    No SQLite (testes) fica só o LIKE, que já ignora caixa e acento pela normalização.
+    """
+    term = normalize_search_text(term)
+    contains = column.contains(term, autoescape=True)
+    if _is_postgres():
+        return or_(contains, literal(term).op('<%')(column))
+    return contains
+
+def text_rank(column, term: str):
+    """
+    Relevância do resultado (maior = melhor). No PostgreSQL é o word_similarity do
+    pg_trgm; no SQLite, começo do texto > começo de palavra > qualquer posição.
+    """
+    term = normalize_search_text(term)
+    if _is_postgres():
+        return func.word_similarity(term, column)
+    return case(
+        (column.startswith(term, autoescape=True), 2),
+        (column.contains(f' {term}', autoescape=True), 1),
+        else_=0
+    )
+
+def ranked_search(query, column, term: str):
+    """Aplica filtro e ordenação por relevância de uma vez (desempate pelo texto)."""
+    return query.filter(text_match(column, term)).order_by(text_rank(column, term).desc(), column)
@@ -0,0 +1,123 @@
+import json
+import time
+import uuid
+import threading
+from app.utils import metrics_util
+from app.utils.redis_util import get_redis
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Garante uma única execução simultânea por chave (ex: um ID do Spotify).
+    Dentro do processo, quem chega enquanto a chave está em andamento espera e
+    recebe o mesmo resultado. Com Redis, uma trava distribuída segura os outros
+    workers até o líder terminar.
+    Com share_result, o líder publica o resultado (JSON) no Redis antes de soltar a
+    trava e os outros workers o usam direto, sem executar 'fn': o líder ainda não
+    commitou o que gravou, então reler o banco não bastaria pra evitar outra ida ao Spotify.
+    Sem share_result, eles executam 'fn' por conta própria, que deve reler o banco.
+    Contadores em metrics_util: singleflight.<name>.{leaders,coalesced,remote_waits,remote_shared,timeouts}.
+    """
+
+    def __init__(self, name: str, lock_ttl: float = 30, wait_timeout: float = 30, use_redis: bool = True,
+                 share_result: bool = False):
+        self.name = name
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.use_redis = use_redis
+        self.share_result = share_result
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _count(self, stat: str) -> None:
+        metrics_util.increment(f"singleflight.{self.name}.{stat}")
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not is_leader:
+            self._count('coalesced')
+            if not call.event.wait(self.wait_timeout):
+                self._count('timeouts')
+                return fn()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_leader(key, fn)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def _shared_result(self, redis_client, result_key: str):
+        """Resultado publicado por outro worker (None se não há ou se share_result está desligado)."""
+        if not self.share_result:
+            return None
+        raw = redis_client.get(result_key)
+        if raw is None:
+            return None
+        self._count('remote_shared')
+        return json.loads(raw)
+
+    def _run_leader(self, key: str, fn):
+        self._count('leaders')
+        redis_client = get_redis() if self.use_redis else None
+        if redis_client is None:
+            return fn()
+
+        lock_key = f"singleflight:{self.name}:{key}"
+        result_key = f"{lock_key}:result"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+        acquired = redis_client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+
+        if not acquired:
+            # Outro worker está buscando a mesma chave: espera ele terminar (ou publicar o resultado)
+            self._count('remote_waits')
+            while not acquired and time.monotonic() < deadline:
+                time.sleep(0.05)
+                shared = self._shared_result(redis_client, result_key)
+                if shared is not None:
+                    return shared
+                acquired = redis_client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+            if not acquired:
+                self._count('timeouts')
+
+        try:
+            # O líder anterior pode ter publicado e soltado a trava entre duas olhadas
+            shared = self._shared_result(redis_client, result_key)
+            if shared is not None:
+                return shared
+
+            result = fn()
+            if self.share_result and result is not None:
+                # Publicado antes de soltar a trava: quem estava esperando lê daqui
+                redis_client.set(result_key, json.dumps(result), px=int(self.lock_ttl * 1000))
+            return result
+        finally:
+            if acquired:
+                redis_client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
@@ -1,6 +1,7 @@
-from sqlalchemy import extract, func, desc
-from app.models import AlbumReview, UserPlatinum
+from sqlalchemy import func, desc
+from app.models import AlbumReview, AlbumStats, UserPlatinum
 from app.extensions import db
+from app.utils.date_util import month_window
 
 #  - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 #  - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -91,54 +92,52 @@ def get_user_review_dates(user_id: str, db_session) -> list:
 #  - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 #  - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-def get_monthly_summary(user_id, month: int, year: int, db_session) -> dict:
+def get_monthly_summary(user_id, month: int, year: int, db_session, tz_name: str = None) -> dict:
     """
     Varre o mês do usuário e devolve um dicionário com estatísticas brutas.
+    Tudo sai de uma consulta só: as funções de janela (OVER) calculam total e média
+    sobre o mês inteiro, e só voltam as linhas que interessam (a melhor review e as
+    de nota >= 4.0), com as colunas necessárias em vez do AlbumReview inteiro.
+    'tz_name' é o fuso do usuário (User.timezone); None recorta o mês em UTC.
     """
     # Tudo que o usuário fez no mês e ano específicos
-    base_query = db_session.query(AlbumReview).filter(
+    # Desempate da melhor nota: se houver dois álbuns com nota 5, pega o mais recente
+    month_reviews = db_session.query(
+        AlbumReview.spotify_album_id,
+        AlbumReview.average_score,
+        func.count().over().label('total_reviews'),
+        func.avg(AlbumReview.average_score).over().label('avg_rating'),
+        func.row_number().over(
+            order_by=(AlbumReview.average_score.desc().nulls_last(), AlbumReview.created_at.desc())
+        ).label('rank')
+    ).filter(
         AlbumReview.user_id == user_id,
-        extract('month', AlbumReview.created_at) == month,
-        extract('year', AlbumReview.created_at) == year
-    )
+        month_window(AlbumReview.created_at, month, year, tz_name)
+    ).subquery()
 
-    # Quantos álbuns ouviu?
-    total_reviews = base_query.count()
+    # O que vai tocar? Os álbuns com nota maior ou igual a 4.0 (e a melhor, pro destaque)
+    rows = db_session.query(month_reviews).filter(
+        (month_reviews.c.rank == 1) | (month_reviews.c.average_score >= 4.0)
+    ).order_by(month_reviews.c.rank).all()
 
     # Se o usuário não escreveu nenhuma review no mês, abortamos cedo!
-    if total_reviews == 0:
+    if not rows:
         return None
 
-    # Média Geral
-    # O func.avg pede pro próprio PostgreSQL calcular a média, poupando a memória do servidor Python
-    avg_rating_query = db_session.query(func.avg(AlbumReview.average_score)).filter(
-        AlbumReview.user_id == user_id,
-        extract('month', AlbumReview.created_at) == month,
-        extract('year', AlbumReview.created_at) == year
-    ).scalar()
-    
-    avg_rating = round(avg_rating_query, 2) if avg_rating_query else 0.0
-
-    # A maior nota do mês
-    # Desempate: Se houver dois álbuns com nota 5, pega o mais recente
-    best_review = base_query.order_by(
-        AlbumReview.average_score.desc(), 
-        AlbumReview.created_at.desc()
-    ).first()
-
-    # O que vai tocar?
-    # Pegamos todos os álbuns que receberam nota maior ou igual a 4.0
-    top_reviews = base_query.filter(AlbumReview.average_score >= 4.0).all()
-    top_album_ids = [review.spotify_album_id for review in top_reviews]
+    best_review = rows[0]
+    avg_rating = round(best_review.avg_rating, 2) if best_review.avg_rating else 0.0
 
     return {
         "month": month,
         "year": year,
-        "total_reviews": total_reviews,
+        "total_reviews": best_review.total_reviews,
         "average_rating": avg_rating,
-        "best_album_id": best_review.spotify_album_id if best_review else None,
-        "best_rating": best_review.average_score if best_review else None, # AQUI
-        "top_album_ids": top_album_ids
+        "best_album_id": best_review.spotify_album_id,
+        "best_rating": best_review.average_score,
+        "top_album_ids": [
+            row.spotify_album_id for row in rows
+            if row.average_score is not None and row.average_score >= 4.0
+        ]
     }
 
 # para o explore/bubble
@@ -146,28 +145,23 @@ def get_community_bubble(user_id: str, db_session, limit: int = 5):
     """
     Retorna os álbuns mais aclamados pela comunidade (Tier S) 
     que o usuário ainda NÃO avaliou.
+    Lê do album_stats (contador de reviews públicas Tier S por álbum).
     """
     # Subquery: IDs dos álbuns que o utilizador JÁ avaliou
     reviewed_ids = db_session.query(AlbumReview.spotify_album_id).filter(
         AlbumReview.user_id == user_id
     ).subquery()
 
-    # Busca álbuns Tier S na comunidade que não estão na subquery
+    # Álbuns com votos Tier S na comunidade que não estão na subquery
     bubble_query = db_session.query(
-        AlbumReview.spotify_album_id,
-        AlbumReview.album_name,
-        AlbumReview.artist_name,
-        AlbumReview.cover_url,
-        func.count(AlbumReview.id).label('total_votes')
+        AlbumStats.spotify_album_id,
+        AlbumStats.album_name,
+        AlbumStats.artist_name,
+        AlbumStats.cover_url,
+        AlbumStats.public_tier_s_count.label('total_votes')
     ).filter(
-        AlbumReview.tier == 'S',
-        AlbumReview.is_private == False,
-        AlbumReview.spotify_album_id.not_in(reviewed_ids)
-    ).group_by(
-        AlbumReview.spotify_album_id, 
-        AlbumReview.album_name, 
-        AlbumReview.artist_name, 
-        AlbumReview.cover_url
-    ).order_by(desc('total_votes')).limit(limit).all()
+        AlbumStats.public_tier_s_count > 0,
+        AlbumStats.spotify_album_id.not_in(reviewed_ids)
+    ).order_by(desc(AlbumStats.public_tier_s_count)).limit(limit).all()
 
     return bubble_query
@@ -22,9 +22,57 @@ class Config:
         'playlist-modify-public'
     )
 
+    # Cliente HTTP do Spotify (compartilhado pelo processo)
+    SPOTIFY_HTTP_POOL_SIZE = int(os.getenv('SPOTIFY_HTTP_POOL_SIZE', 20))
+    SPOTIFY_REQUESTS_TIMEOUT = int(os.getenv('SPOTIFY_REQUESTS_TIMEOUT', 5))
+    # Segundos antes da expiração em que o token da aplicação é renovado
+    SPOTIFY_TOKEN_REFRESH_MARGIN = 60
+    # Máximo de clientes por usuário mantidos em memória em cada worker
+    SPOTIFY_USER_CLIENT_CACHE_SIZE = int(os.getenv('SPOTIFY_USER_CLIENT_CACHE_SIZE', 500))
+
+    # Governador de taxa do Spotify (compartilhado via Redis quando REDIS_URL existe)
+    SPOTIFY_RATE_LIMIT_PER_SECOND = float(os.getenv('SPOTIFY_RATE_LIMIT_PER_SECOND', 8))
+    SPOTIFY_RATE_LIMIT_BURST = int(os.getenv('SPOTIFY_RATE_LIMIT_BURST', 16))
+    # Fichas que a sincronização em segundo plano nunca consome (ficam pro tráfego interativo)
+    SPOTIFY_RATE_LIMIT_BACKGROUND_RESERVE = 4
+    # Orçamentos por endpoint: {'endpoint': {'rate': fichas/s, 'burst': máximo acumulado}}
+    SPOTIFY_RATE_LIMIT_ENDPOINTS = {
+        'search': {'rate': 4, 'burst': 8},
+        'artists.albums': {'rate': 2, 'burst': 4},
+    }
+    # Tempo máximo (s) que uma chamada espera na fila antes de desistir com 503
+    SPOTIFY_RATE_LIMIT_MAX_WAIT = 10
+    SPOTIFY_RATE_LIMIT_MAX_RETRIES = 3
+    # Validade (dias) dos dados do Spotify salvos no banco. Até 'soft' são frescos; entre
+    # 'soft' e 'hard' são servidos na hora enquanto um job atualiza; depois de 'hard' bloqueiam.
+    SPOTIFY_SYNC_TTL = {
+        'album': {'soft': 30, 'hard': 180},
+        'artist': {'soft': 30, 'hard': 90},
+    }
+    # Chamadas simultâneas ao Spotify durante a sincronização de uma discografia
+    SPOTIFY_SYNC_CONCURRENCY = int(os.getenv('SPOTIFY_SYNC_CONCURRENCY', 4))
+
+    REDIS_URL = os.getenv('REDIS_URL')
+
+    # Spotify IDs (separados por vírgula) com acesso às rotas internas, como /api/metrics
+    ADMIN_SPOTIFY_IDS = [i.strip() for i in os.getenv('ADMIN_SPOTIFY_IDS', '').split(',') if i.strip()]
+
+    # Fila de jobs em segundo plano (Redis quando REDIS_URL existe, threads do processo caso contrário)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+    JOB_MAX_ATTEMPTS = 3
+    # Espera base (s) antes de tentar de novo um job que falhou; dobra a cada tentativa
+    JOB_RETRY_BACKOFF = 5
+    JOB_STATUS_TTL = 86400
+    # Se True, o job roda na hora dentro do enqueue (usado nos testes)
+    JOB_QUEUE_EAGER = False
+
     # Cache configuration
     CACHE_TYPE = 'RedisCache' if os.getenv('REDIS_URL') else 'SimpleCache'
 
+    # L1: cache em memória de cada worker na frente do Redis (só pras funções com l1_ttl)
+    CACHE_L1_ENABLED = True
+    CACHE_L1_MAXSIZE = int(os.getenv('CACHE_L1_MAXSIZE', 1000))
+
     if os.getenv('REDIS_URL'):
         CACHE_REDIS_URL = os.getenv('REDIS_URL')
         CACHE_DEFAULT_TIMEOUT = 300
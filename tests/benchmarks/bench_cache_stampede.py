@@ -0,0 +1,115 @@
+"""
+Benchmark de estouro de recálculo (stampede) nos agregados do explore.
+
+Várias threads consultam o 'em alta' sem parar enquanto a chave do cache vence a
+cada segundo. Conta quantas vezes a consulta do 'em alta' chega no banco por
+vencimento, com o memoize simples (antes) e com early_refresh (depois).
+Cria só as tabelas que o 'em alta' usa num SQLite temporário.
+
+Uso:
+    python -m tests.benchmarks.bench_cache_stampede [--threads 32] [--reviews 20000] [--seconds 5]
+"""
+import os
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db, cache
+from app.models import User, AlbumReview, AlbumStats, AlbumDailyActivity
+from app.services.album_stats_service import AlbumStatsService
+from app.services.explore_service import ExploreService
+from app.utils import cache_util
+
+TIMEOUT = 1
+
+def _seed(review_count):
+    users = [{'id': uuid.uuid4(), 'spotify_id': f'bench{n}', 'display_name': f'Bench {n}'} for n in range(200)]
+    db.session.execute(User.__table__.insert(), users)
+
+    now = datetime.now(timezone.utc)
+    reviews = [
+        {
+            'id': uuid.uuid4(),
+            'user_id': random.choice(users)['id'],
+            'spotify_album_id': f'album{random.randint(1, 2000)}',
+            'album_name': 'Álbum', 'artist_name': 'Artista',
+            'is_private': False,
+            'average_score': random.uniform(0, 10),
+            'created_at': now - timedelta(days=random.randint(0, 6))
+        }
+        for _ in range(review_count)
+    ]
+    db.session.execute(AlbumReview.__table__.insert(), reviews)
+
+    # Agregados que o 'em alta' lê (o ReviewService os mantém a cada escrita)
+    AlbumStatsService.rebuild()
+    buckets = {}
+    for r in reviews:
+        bucket = buckets.setdefault((r['spotify_album_id'], r['created_at'].date()), [0, 0.0])
+        bucket[0] += 1
+        bucket[1] += r['average_score']
+    db.session.execute(AlbumDailyActivity.__table__.insert(), [
+        {'spotify_album_id': a, 'day': d, 'public_review_count': c, 'public_score_sum': s}
+        for (a, d), (c, s) in buckets.items()
+    ])
+    db.session.commit()
+
+def _run(app, cached_fn, threads, seconds):
+    queries = {'count': 0}
+
+    def _count(conn, cursor, statement, *args):
+        if 'album_daily_activity' in statement:
+            queries['count'] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', _count)
+    cache.clear()
+    stop = time.monotonic() + seconds
+
+    def _client():
+        with app.app_context():
+            while time.monotonic() < stop:
+                cached_fn()
+            db.session.remove()
+
+    workers = [threading.Thread(target=_client) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    event.remove(db.engine, 'before_cursor_execute', _count)
+    return queries['count']
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--reviews', type=int, default=20000)
+    parser.add_argument('--seconds', type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app()
+    app.config.update(SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}', CACHE_L1_ENABLED=False)
+
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[User.__table__, AlbumReview.__table__, AlbumStats.__table__, AlbumDailyActivity.__table__])
+        _seed(args.reviews)
+
+        raw = ExploreService.get_trending_albums.uncached
+        before = cache_util.memoize(timeout=TIMEOUT)(raw)
+        after = cache_util.memoize(timeout=TIMEOUT, early_refresh=True)(raw)
+
+        expiries = args.seconds / TIMEOUT
+        print(f"threads: {args.threads} | reviews: {args.reviews} | chave vence a cada {TIMEOUT}s por {args.seconds}s")
+        print(f"{'modo':>14} {'queries':>8} {'por vencimento':>15}")
+        for label, fn in (('memoize', before), ('early_refresh', after)):
+            count = _run(app, fn, args.threads, args.seconds)
+            print(f"{label:>14} {count:>8} {count / expiries:>15.1f}")
+
+if __name__ == '__main__':
+    main()
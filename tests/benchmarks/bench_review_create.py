@@ -0,0 +1,126 @@
+"""
+Benchmark da criação de review com muitas faixas.
+
+Cria reviews de 10, 30 e 100 faixas e mede, por review, quantos comandos SQL chegam
+no banco e quanto tempo leva do create até a resposta serializada (ReviewFull).
+Compara o caminho antigo (um TrackReview por faixa na sessão, média relida do banco e
+review recarregada depois do commit) com o ReviewService.create_review atual.
+Cria só as tabelas que a criação de review usa num SQLite temporário.
+
+Uso:
+    python -m tests.benchmarks.bench_review_create [--rounds 50] [--sizes 10 30 100]
+"""
+import os
+import time
+import uuid
+import argparse
+import tempfile
+from sqlalchemy import event
+
+# O config lê DATABASE_URL na importação: o SQLite temporário tem que vir antes do app
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+
+from app import create_app
+from app.extensions import db
+from app.models import (
+    User, AlbumReview, TrackReview, AlbumStats, AlbumDailyActivity,
+    UserDailyActivity, UserPlatinum, UserStats
+)
+from app.schemas import ReviewCreate, ReviewFull
+from app.services.review_service import ReviewService
+from app.services.stats_service import StatsService
+from app.services.album_stats_service import AlbumStatsService
+from app.services.activity_service import ActivityService
+from app.services.user_stats_service import UserStatsService
+from app.services.user_service import UserService
+from app.utils.cache_util import bump_generation, USER_NAMESPACE
+
+TABLES = [User, AlbumReview, TrackReview, AlbumStats, AlbumDailyActivity, UserDailyActivity, UserPlatinum, UserStats]
+
+def _payload(track_count):
+    return ReviewCreate.model_validate({
+        "album": {"name": "Álbum", "artist": "Artista", "id": f"album{uuid.uuid4().hex[:8]}"},
+        "tracks": [
+            {"id": f"track{n}", "name": f"Faixa {n}", "track_number": n, "userScore": float(n % 11)}
+            for n in range(1, track_count + 1)
+        ]
+    }).model_dump()
+
+def _create_legacy(user, payload):
+    """O create_review de antes: faixa por faixa no ORM e média lida de volta do banco."""
+    album_data = payload['album']
+    review = AlbumReview(
+        user_id=user.id,
+        spotify_album_id=album_data['id'],
+        album_name=album_data['name'],
+        artist_name=album_data['artist'],
+        created_at=payload['listened_date'],
+        is_private=payload['is_private'],
+        artist_genres=[]
+    )
+    db.session.add(review)
+    db.session.flush()
+
+    for track in payload['tracks']:
+        db.session.add(TrackReview(
+            album_review_id=review.id,
+            spotify_track_id=track.get('id'),
+            track_name=track.get('name'),
+            track_number=track.get('track_number'),
+            score=track.get('userScore'),
+            is_ignored=track.get('is_ignored', False)
+        ))
+
+    review.update_stats()
+    AlbumStatsService.record_review(review)
+    ActivityService.record_review(review)
+    UserStatsService.record_review(review)
+    UserService.adjust_counters(user.id, review_count=1)
+    StatsService.register_review_day(user, review)
+    db.session.commit()
+    bump_generation(USER_NAMESPACE, str(user.id))
+    return review
+
+def _run(create, user_id, track_count, rounds):
+    statements = {'count': 0}
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements['count'] += 1
+
+    payloads = [_payload(track_count) for _ in range(rounds)]
+    event.listen(db.engine, 'before_cursor_execute', _count)
+    started = time.perf_counter()
+    for payload in payloads:
+        user = db.session.get(User, user_id)
+        review = create(user, payload)
+        ReviewFull.model_validate(review).model_dump()
+    elapsed = time.perf_counter() - started
+    event.remove(db.engine, 'before_cursor_execute', _count)
+    db.session.remove()
+    return statements['count'] / rounds, elapsed * 1000 / rounds
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 30, 100])
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config.update(CACHE_L1_ENABLED=False)
+
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[model.__table__ for model in TABLES])
+        user_id = uuid.uuid4()
+        db.session.execute(User.__table__.insert(), [{'id': user_id, 'spotify_id': 'bench', 'display_name': 'Bench'}])
+        db.session.commit()
+
+        print(f"rounds: {args.rounds} por tamanho")
+        print(f"{'faixas':>7} {'modo':>8} {'comandos/review':>16} {'ms/review':>10}")
+        for track_count in args.sizes:
+            for label, create in (('antes', _create_legacy), ('depois', ReviewService.create_review)):
+                statements, ms = _run(create, user_id, track_count, args.rounds)
+                print(f"{track_count:>7} {label:>8} {statements:>16.1f} {ms:>10.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark da fase de busca da sincronização de discografia (sequencial x paralela).
+
+Sobe um servidor local que imita a API do Spotify com latência artificial e mede
+o tempo de parede para artistas com 10, 50 e 200 álbuns. Não usa banco: mede só
+as chamadas HTTP, que é a parte que roda em paralelo.
+
+Uso:
+    python -m tests.benchmarks.bench_sync_concurrency [--latency 0.05] [--workers 8]
+"""
+import json
+import time
+import argparse
+import threading
+import requests
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from spotipy import Spotify
+from app.services.spotify_sync_service import SpotifySyncService
+
+TRACKS_PER_ALBUM = 60
+
+def _track(album_id, n):
+    return {
+        'id': f'{album_id}t{n}', 'name': f'Faixa {n}', 'track_number': n,
+        'duration_ms': 180000, 'preview_url': None
+    }
+
+def _album(album_id):
+    return {
+        'id': album_id,
+        'name': f'Álbum {album_id}',
+        'album_type': 'album',
+        'artists': [{'id': 'artistbench', 'name': 'Artista'}],
+        'images': [],
+        'release_date': '2000-01-01',
+        'total_tracks': TRACKS_PER_ALBUM,
+        'tracks': {
+            'items': [_track(album_id, n) for n in range(1, 51)],
+            'limit': 50, 'offset': 0, 'total': TRACKS_PER_ALBUM,
+            'next': f'albums/{album_id}/tracks?offset=50&limit=50'
+        }
+    }
+
+class FakeSpotifyHandler(BaseHTTPRequestHandler):
+    latency = 0.05
+    album_count = 10
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [p for p in url.path.split('/') if p][1:]  # remove 'v1'
+        offset = int(query.get('offset', ['0'])[0])
+        limit = int(query.get('limit', ['20'])[0])
+
+        if parts[0] == 'artists' and len(parts) == 3:
+            ids = [f'album{n}' for n in range(self.album_count)][offset:offset + limit]
+            body = {'items': [{'id': i, 'album_type': 'album'} for i in ids], 'total': self.album_count}
+        elif parts[0] == 'albums' and len(parts) == 3:
+            body = {'items': [_track(parts[1], n) for n in range(offset + 1, TRACKS_PER_ALBUM + 1)][:limit]}
+        elif parts[0] == 'albums':
+            body = {'albums': [_album(i) for i in query['ids'][0].split(',')]}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+def _client(port, pool_size):
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    sp = Spotify(auth='bench', requests_session=session)
+    sp.prefix = f'http://127.0.0.1:{port}/v1/'
+    return sp
+
+def _run(sp, workers):
+    started = time.perf_counter()
+    items = SpotifySyncService._fetch_artist_album_items('artistbench', sp, workers)
+    albums = SpotifySyncService._fetch_albums([i['id'] for i in items], sp, workers)
+    assert all(len(a['tracks']['items']) == TRACKS_PER_ALBUM for a in albums)
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    FakeSpotifyHandler.latency = args.latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeSpotifyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    sp = _client(server.server_address[1], args.workers)
+
+    print(f"latência simulada: {args.latency * 1000:.0f}ms | workers: {args.workers}")
+    print(f"{'álbuns':>7} {'sequencial':>11} {'paralelo':>10} {'ganho':>7}")
+    try:
+        for count in (10, 50, 200):
+            FakeSpotifyHandler.album_count = count
+            sequential = _run(sp, 1)
+            parallel = _run(sp, args.workers)
+            print(f"{count:>7} {sequential:>10.2f}s {parallel:>9.2f}s {sequential / parallel:>6.1f}x")
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
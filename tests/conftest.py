@@ -13,7 +13,8 @@ def app():
         "TESTING": True,
         "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
         "SQLALCHEMY_TRACK_MODIFICATIONS": False,
-        "SECRET_KEY": "test-key-muito-secreta"
+        "SECRET_KEY": "test-key-muito-secreta",
+        "JOB_QUEUE_EAGER": True
     })
 
     with app.app_context():
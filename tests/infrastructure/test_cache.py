@@ -1,6 +1,15 @@
 import pytest
+import threading
 import time
-from app.extensions import cache
+from unittest.mock import MagicMock, patch
+import fakeredis
+from cachelib import RedisCache
+from spotipy import Spotify
+from app.extensions import cache, db
+from app.models import AlbumReview
+from app.models.user import User
+from app.services.review_service import ReviewService
+from app.utils import cache_util, metrics_util
 
 def test_cache_leitura_e_escrita_basica(app):
     """
@@ -50,4 +59,225 @@ def test_cache_memoize_evita_reprocessamento(app):
         # 3ª Chamada com um parâmetro DIFERENTE (Deve executar a função de novo)
         resultado_3 = funcao_pesada_simulada("B")
         assert resultado_3 == "processado_B"
-        assert controle['execucoes'] == 2  # Agora sim subiu para 2!
\ No newline at end of file
+        assert controle['execucoes'] == 2  # Agora sim subiu para 2!
+
+def test_memoize_estavel_reaproveita_entre_instancias(app, user_mock):
+    """
+    O cache_util.memoize gera a chave pelo id do usuário, não pela instância.
+    Uma nova instância do mesmo usuário (outra requisição, outro worker) acerta o cache.
+    """
+    with app.app_context():
+        cache.clear()
+        controle = {'execucoes': 0}
+
+        @cache_util.memoize(timeout=50)
+        def perfil_pesado(user, limite=5):
+            controle['execucoes'] += 1
+            return f"perfil_{user.spotify_id}_{limite}"
+
+        perfil_pesado(user_mock)
+
+        # Instância nova, carregada do zero, representando a mesma linha do banco
+        db.session.expunge_all()
+        outra_instancia = db.session.get(User, user_mock.id)
+        assert outra_instancia is not user_mock
+
+        assert perfil_pesado(outra_instancia) == "perfil_tracie_test_5"
+        assert controle['execucoes'] == 1
+
+        # Parâmetros diferentes continuam gerando chaves diferentes
+        perfil_pesado(outra_instancia, limite=10)
+        assert controle['execucoes'] == 2
+
+        nome = f"{perfil_pesado.__module__}.{perfil_pesado.__qualname__}"
+        contadores = metrics_util.snapshot('cache')['counters']
+        assert contadores[f"cache.{nome}.hits"] >= 1
+
+
+def test_memoize_estavel_recusa_cliente_spotify(app):
+    """O cliente do Spotify não pode entrar na chave: deve ser resolvido dentro da função."""
+    with app.app_context():
+        @cache_util.memoize(timeout=50)
+        def busca(sp, query):
+            return query
+
+        with pytest.raises(TypeError):
+            busca(Spotify(auth="token"), "radiohead")
+
+
+def test_memoize_estavel_cache_none_e_delete(app):
+    """Com cache_none=True o resultado vazio também é guardado; .delete invalida a chave."""
+    with app.app_context():
+        cache.clear()
+        controle = {'execucoes': 0}
+
+        @cache_util.memoize(timeout=50, cache_none=True)
+        def nada_tocando(user_id):
+            controle['execucoes'] += 1
+            return None
+
+        assert nada_tocando("abc") is None
+        assert nada_tocando("abc") is None
+        assert controle['execucoes'] == 1
+
+        nada_tocando.delete("abc")
+        nada_tocando("abc")
+        assert controle['execucoes'] == 2
+
+
+def test_geracao_por_usuario_invalida_todas_as_paginas(app, user_mock):
+    """
+    Uma escrita de review incrementa a geração do usuário: todas as páginas/filtros
+    do histórico deixam de valer, sem precisar conhecer cada chave.
+    """
+    with app.app_context():
+        cache.clear()
+        user_id = str(user_mock.id)
+        for album_id, nome in [("alb1", "Kid A"), ("alb2", "Kid B")]:
+            db.session.add(AlbumReview(user_id=user_mock.id, spotify_album_id=album_id, album_name=nome, artist_name="Radiohead"))
+        db.session.commit()
+
+        # Visitante anônimo, duas combinações diferentes de página/filtro
+        assert ReviewService.get_reviews(user_id, page=1, per_page=10)["total"] == 2
+        assert ReviewService.get_reviews(user_id, page=1, per_page=5, filters={"search": "kid"})["total"] == 2
+
+        review = AlbumReview.query.filter_by(spotify_album_id="alb1").first()
+        ReviewService.update_review(user_mock, review.id, {"is_private": True})
+
+        assert ReviewService.get_reviews(user_id, page=1, per_page=10)["total"] == 1
+        pagina_filtrada = ReviewService.get_reviews(user_id, page=1, per_page=5, filters={"search": "kid"})
+        assert [r["album_name"] for r in pagina_filtrada["items"]] == ["Kid B"]
+
+
+def test_l1_em_memoria_na_frente_do_cache_compartilhado(app):
+    """
+    Com l1_ttl, a segunda leitura nem chega no L2: mesmo com o L2 limpo, o L1 responde.
+    O .delete limpa as duas camadas e publica a invalidação para os outros workers.
+    """
+    with app.app_context():
+        cache.clear()
+        cache_util.clear_l1()
+        controle = {'execucoes': 0}
+
+        @cache_util.memoize(timeout=50, l1_ttl=30)
+        def hall_da_fama(limite=10):
+            controle['execucoes'] += 1
+            return [f"album_{i}" for i in range(limite)]
+
+        hall_da_fama()
+        cache.clear()  # L2 vazio: só o L1 pode responder
+        assert hall_da_fama() == [f"album_{i}" for i in range(10)]
+        assert controle['execucoes'] == 1
+
+        redis_falso = MagicMock()
+        with patch.object(cache_util, 'get_redis', return_value=redis_falso):
+            hall_da_fama.delete()
+
+        redis_falso.publish.assert_called_once_with(cache_util.L1_INVALIDATION_CHANNEL, hall_da_fama.cache_key())
+        hall_da_fama()
+        assert controle['execucoes'] == 2
+
+        stats = cache_util.stats()
+        assert stats['l1']['hits'] >= 1
+        assert stats['l2']['misses'] >= 2
+
+
+def test_early_refresh_serve_valor_anterior_enquanto_outro_renova(app):
+    """
+    Com early_refresh, uma chave vencida é renovada por quem pegar a trava;
+    quem chega enquanto a trava existe recebe o valor anterior, sem recalcular.
+    """
+    with app.app_context():
+        cache.clear()
+        controle = {'execucoes': 0}
+
+        @cache_util.memoize(timeout=50, early_refresh=True)
+        def em_alta(limite=10):
+            controle['execucoes'] += 1
+            return controle['execucoes']
+
+        assert em_alta() == 1
+
+        # Um minuto no futuro: a entrada venceu, mas ainda está no L2 como reserva
+        agora = cache_util.time.time() + 60
+        with patch.object(cache_util.time, 'time', return_value=agora):
+            chave = em_alta.cache_key()
+            cache.add(f"{chave}:refresh", 1)  # outro worker está renovando
+            assert em_alta() == 1
+            assert controle['execucoes'] == 1
+
+            cache.delete(f"{chave}:refresh")
+            assert em_alta() == 2  # este pega a trava e renova
+
+        assert em_alta() == 2
+        assert controle['execucoes'] == 2
+
+
+def test_early_refresh_chave_vazia_calcula_uma_vez_so(app):
+    """Com a chave vazia e várias threads ao mesmo tempo, só uma executa a função."""
+    with app.app_context():
+        cache.clear()
+        controle = {'execucoes': 0}
+        liberar = threading.Event()
+
+        @cache_util.memoize(timeout=50, early_refresh=True)
+        def hall_da_fama():
+            controle['execucoes'] += 1
+            liberar.wait(1)
+            return ["album"]
+
+        resultados = []
+
+        def chamar():
+            with app.app_context():
+                resultados.append(hall_da_fama())
+
+        threads = [threading.Thread(target=chamar) for _ in range(8)]
+        for t in threads:
+            t.start()
+        cache_util.time.sleep(0.1)
+        liberar.set()
+        for t in threads:
+            t.join()
+
+        assert controle['execucoes'] == 1
+        assert resultados == [["album"]] * 8
+
+
+def test_geracao_com_redis_de_verdade_usa_inteiro_cru(app):
+    """
+    Com RedisCache o cachelib serializa os valores (b"!" + pickle) e o INCR falharia.
+    O contador de geração fica cru no Redis: o bump funciona e invalida o memoize.
+    """
+    redis_falso = fakeredis.FakeRedis()
+    redis_cache = RedisCache(host=redis_falso, key_prefix='flask_cache_')
+
+    with app.app_context():
+        cache_original = app.extensions['cache'][cache]
+        app.extensions['cache'][cache] = redis_cache
+        # Só o L2 (Redis) nesta conta; sem L1 também não sobe o listener de invalidação
+        app.config['CACHE_L1_ENABLED'] = False
+        try:
+            with patch.object(cache_util, 'get_redis', return_value=redis_falso):
+                controle = {'execucoes': 0}
+
+                @cache_util.memoize(timeout=50, namespace=cache_util.USER_NAMESPACE)
+                def historico(user_id):
+                    controle['execucoes'] += 1
+                    return controle['execucoes']
+
+                assert historico("u1") == 1
+                assert historico("u1") == 1
+
+                geracao = cache_util.get_generation(cache_util.USER_NAMESPACE, "u1")
+                cache_util.bump_generation(cache_util.USER_NAMESPACE, "u1")
+                # Sem contador ainda: o bump semeia e incrementa na mesma ida
+                cache_util.bump_generation(cache_util.USER_NAMESPACE, "u2")
+
+                assert cache_util.get_generation(cache_util.USER_NAMESPACE, "u1") == geracao + 1
+                assert int(redis_falso.get(cache_util._generation_key(cache_util.USER_NAMESPACE, "u1"))) == geracao + 1
+                assert cache_util.get_generation(cache_util.USER_NAMESPACE, "u2") > 0
+                assert historico("u1") == 2
+        finally:
+            app.extensions['cache'][cache] = cache_original
+            app.config['CACHE_L1_ENABLED'] = True
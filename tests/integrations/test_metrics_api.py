@@ -0,0 +1,15 @@
+def test_metricas_exigem_admin(auth_client, monkeypatch, app):
+    """Estar logado não basta: as métricas internas são só pra ADMIN_SPOTIFY_IDS."""
+    monkeypatch.setitem(app.config, 'ADMIN_SPOTIFY_IDS', [])
+
+    for rota in ('/api/metrics', '/api/metrics/spotify', '/api/metrics/cache'):
+        response = auth_client.get(rota)
+        assert response.status_code == 403
+
+def test_admin_ve_as_metricas(auth_client, monkeypatch, app, user_mock):
+    monkeypatch.setitem(app.config, 'ADMIN_SPOTIFY_IDS', [user_mock.spotify_id])
+
+    response = auth_client.get('/api/metrics')
+
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'success'
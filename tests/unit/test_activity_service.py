@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from app.models import AlbumReview, AlbumDailyActivity, User
+from app.services.album_stats_service import AlbumStatsService
+from app.services.activity_service import ActivityService
+from app.services.explore_service import ExploreService
+
+def _review(test_db, user, album_id, days_ago=0, is_private=False, now=None):
+    """Cria a review e atualiza os agregados como o ReviewService faz."""
+    review = AlbumReview(
+        user_id=user.id, spotify_album_id=album_id, album_name=f"Álbum {album_id}",
+        artist_name="Artista", is_private=is_private, average_score=8.0, tier='A',
+        created_at=(now or datetime.now(timezone.utc)) - timedelta(days=days_ago)
+    )
+    test_db.session.add(review)
+    test_db.session.flush()
+    AlbumStatsService.record_review(review)
+    ActivityService.record_review(review)
+    test_db.session.commit()
+    return review
+
+def test_em_alta_e_top_avaliadores_respeitam_a_janela(app, test_db, user_mock):
+    """24h não alcança reviews de 3 dias atrás; 30d soma os baldes do mês inteiro."""
+    with app.app_context():
+        outro = User(spotify_id="outro", display_name="Outro")
+        test_db.session.add(outro)
+        test_db.session.commit()
+
+        _review(test_db, user_mock, "hoje")
+        for dias in (3, 10, 20):
+            _review(test_db, outro, "antigo", days_ago=dias)
+        _review(test_db, outro, "privado", is_private=True)
+
+        assert [a["album_id"] for a in ExploreService.get_trending_albums.uncached(window='24h')] == ["hoje"]
+
+        semana = ExploreService.get_trending_albums.uncached(window='7d')
+        assert {a["album_id"]: a["review_count"] for a in semana} == {"hoje": 1, "antigo": 1}
+
+        mes = ExploreService.get_trending_albums.uncached(window='30d')
+        assert mes[0]["album_id"] == "antigo"
+        assert mes[0]["review_count"] == 3
+        assert mes[0]["average_score"] == 8.0
+
+        top = ExploreService.get_top_reviewers.uncached(window='30d')
+        assert [(u["display_name"], u["review_count"]) for u in top] == [("Outro", 3), ("Tracie Tester", 1)]
+
+def test_remover_review_desconta_do_balde_e_prune_limpa(app, test_db, user_mock):
+    """Apagar a review zera o balde; o prune tira baldes zerados e os antigos demais."""
+    with app.app_context():
+        recente = _review(test_db, user_mock, "alb1")
+        _review(test_db, user_mock, "alb2", days_ago=60)
+
+        ActivityService.remove_review(recente)
+        test_db.session.delete(recente)
+        test_db.session.commit()
+
+        assert ExploreService.get_trending_albums.uncached(window='24h') == []
+
+        # Balde zerado do alb1 + balde de 60 dias atrás (álbum e usuário)
+        assert ActivityService.prune(keep_days=35) == 4
+        test_db.session.commit()
+        assert AlbumDailyActivity.query.count() == 0
+
+def test_24h_e_movel_e_pesa_o_balde_de_ontem(app, test_db, user_mock):
+    """Às 06:00 UTC, 75% do balde de ontem ainda está nas últimas 24h; o de anteontem não."""
+    agora = datetime.now(timezone.utc).replace(hour=6, minute=0, second=0, microsecond=0)
+
+    class _Relogio(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return agora
+
+    with app.app_context(), patch('app.services.activity_service.datetime', _Relogio):
+        _review(test_db, user_mock, "hoje", now=agora)
+        for _ in range(4):
+            _review(test_db, user_mock, "ontem", days_ago=1, now=agora)
+        _review(test_db, user_mock, "anteontem", days_ago=2, now=agora)
+
+        em_alta = ExploreService.get_trending_albums.uncached(window='24h')
+        assert [(a["album_id"], a["review_count"]) for a in em_alta] == [("ontem", 3), ("hoje", 1)]
+        assert em_alta[0]["average_score"] == 8.0
+
+        top = ExploreService.get_top_reviewers.uncached(window='24h')
+        assert top[0]["review_count"] == 4
+
+def test_janela_invalida_e_recusada(client):
+    response = client.get('/api/explore/trending?window=1ano')
+    assert response.status_code == 400
@@ -0,0 +1,139 @@
+import pytest
+from datetime import datetime, timedelta
+from app.extensions import cache
+from app.models import AlbumReview, AlbumStats, User
+from app.services.album_stats_service import AlbumStatsService
+from app.services.explore_service import ExploreService
+from app.services.review_service import ReviewService
+
+def _review(test_db, user, album_id, score, is_private=False, created_at=None):
+    """Cria uma review já com nota/tier e registra no agregado, como o ReviewService faz."""
+    review = AlbumReview(
+        user_id=user.id, spotify_album_id=album_id, album_name=f"Álbum {album_id}",
+        artist_name="Artista", is_private=is_private, average_score=score,
+        tier='S' if score is not None and score >= 9.5 else 'B', created_at=created_at
+    )
+    test_db.session.add(review)
+    test_db.session.flush()
+    if score is None:
+        # O default da coluna (0.0) entra no INSERT; reviews antigas podem estar com NULL
+        review.average_score = None
+        test_db.session.flush()
+    AlbumStatsService.record_review(review)
+    test_db.session.commit()
+    return review
+
+def _outros_usuarios(test_db, quantidade):
+    users = [User(spotify_id=f"outro_{i}", display_name=f"Outro {i}") for i in range(quantidade)]
+    test_db.session.add_all(users)
+    test_db.session.commit()
+    return users
+
+def _colunas(stats):
+    return {
+        c: getattr(stats, c) for c in (
+            'review_count', 'score_sum', 'tier_s_count', 'public_review_count',
+            'public_score_sum', 'public_tier_s_count', 'public_scored_count',
+            'public_average_score', 'last_review_at', 'last_public_review_at'
+        )
+    }
+
+def test_agregado_acompanha_criacao_edicao_e_remocao(app, test_db, user_mock):
+    """Contadores públicos e totais mudam junto com as reviews, sem recalcular tudo."""
+    with app.app_context():
+        outro = _outros_usuarios(test_db, 1)[0]
+        _review(test_db, user_mock, "alb1", 10.0)
+        privada = _review(test_db, outro, "alb1", 6.0, is_private=True)
+
+        stats = test_db.session.get(AlbumStats, "alb1")
+        assert stats.review_count == 2
+        assert stats.public_review_count == 1
+        assert stats.public_tier_s_count == 1
+        assert stats.public_average_score == pytest.approx(10.0)
+
+        # Tornar pública soma só a diferença
+        ReviewService.update_review(outro, privada.id, {"is_private": False})
+        test_db.session.refresh(stats)
+        assert stats.public_review_count == 2
+        assert stats.public_average_score == pytest.approx(8.0)
+
+        AlbumStatsService.remove_review(privada)
+        test_db.session.delete(privada)
+        test_db.session.commit()
+        test_db.session.refresh(stats)
+        assert stats.review_count == 1
+        assert stats.public_average_score == pytest.approx(10.0)
+
+def test_rebuild_bate_com_o_incremental(app, test_db, user_mock):
+    """O backfill da CLI chega nos mesmos números que a manutenção incremental."""
+    with app.app_context():
+        outros = _outros_usuarios(test_db, 2)
+        _review(test_db, user_mock, "alb1", 9.8)
+        _review(test_db, outros[0], "alb1", 7.0)
+        _review(test_db, outros[1], "alb1", 9.6, is_private=True)
+        _review(test_db, user_mock, "alb2", 5.0)
+        _review(test_db, outros[0], "alb2", None)
+
+        incremental = {s.spotify_album_id: _colunas(s) for s in AlbumStats.query.all()}
+
+        assert AlbumStatsService.rebuild() == 2
+        test_db.session.commit()
+        test_db.session.expire_all()
+
+        recalculado = {s.spotify_album_id: _colunas(s) for s in AlbumStats.query.all()}
+        assert recalculado.keys() == incremental.keys()
+        for album_id, colunas in incremental.items():
+            assert recalculado[album_id] == pytest.approx(colunas)
+
+def test_hall_da_fama_e_bolha_leem_do_agregado(app, test_db, user_mock):
+    """Hall da fama respeita o mínimo de reviews públicas; a bolha ignora o que o usuário já ouviu."""
+    with app.app_context():
+        cache.clear()
+        outros = _outros_usuarios(test_db, 3)
+        for user in outros:
+            _review(test_db, user, "classico", 9.7)
+            _review(test_db, user, "mediano", 6.0)
+        _review(test_db, outros[0], "unico", 10.0)
+        _review(test_db, user_mock, "ja_ouvi", 9.9)
+        _review(test_db, outros[1], "ja_ouvi", 9.9)
+
+        hall = ExploreService.get_hall_of_fame.uncached(limit=10)
+        assert [a["album_id"] for a in hall] == ["classico", "mediano"]
+        assert hall[0]["review_count"] == 3
+
+        bolha = ExploreService.get_community_bubble(user_mock.id)
+        assert [a["id"] for a in bolha] == ["classico", "unico"]
+
+def test_review_sem_nota_nao_puxa_a_media(app, test_db, user_mock):
+    """Como no AVG(): review pública sem nota conta como review, mas fica fora da média."""
+    with app.app_context():
+        outro = _outros_usuarios(test_db, 1)[0]
+        _review(test_db, user_mock, "alb1", 8.0)
+        _review(test_db, outro, "alb1", None)
+
+        stats = test_db.session.get(AlbumStats, "alb1")
+        assert stats.public_review_count == 2
+        assert stats.public_average_score == pytest.approx(8.0)
+
+def test_ultima_review_volta_ao_apagar_ou_esconder(app, test_db, user_mock):
+    """last_review_at/last_public_review_at voltam pra review anterior, como no rebuild."""
+    with app.app_context():
+        outros = _outros_usuarios(test_db, 2)
+        antiga = datetime(2026, 1, 1, 12, 0)
+        _review(test_db, user_mock, "alb1", 8.0, created_at=antiga)
+        media = _review(test_db, outros[0], "alb1", 7.0, created_at=antiga + timedelta(days=1))
+        nova = _review(test_db, outros[1], "alb1", 9.0, created_at=antiga + timedelta(days=2))
+
+        ReviewService.update_review(outros[1], nova.id, {"is_private": True})
+        stats = test_db.session.get(AlbumStats, "alb1")
+        test_db.session.refresh(stats)
+        assert stats.last_review_at == antiga + timedelta(days=2)
+        assert stats.last_public_review_at == antiga + timedelta(days=1)
+
+        ReviewService.delete_review(outros[1], nova.id)
+        test_db.session.refresh(stats)
+        assert stats.last_review_at == antiga + timedelta(days=1)
+
+        ReviewService.delete_review(outros[0], media.id)
+        test_db.session.refresh(stats)
+        assert stats.last_review_at == stats.last_public_review_at == antiga
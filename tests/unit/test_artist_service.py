@@ -1,4 +1,5 @@
 import pytest
+from datetime import datetime, timezone
 from unittest.mock import patch
 from app.services.artist_service import ArtistService
 from app.models.review import AlbumReview
@@ -7,6 +8,8 @@ from app.models.user import User
 from app.models.album import Album
 from app.models.artist import Artist
 from app.services.spotify_sync_service import SpotifySyncService
+from app.services.curation_service import CurationService
+from app.exceptions import ResourceNotFoundError, SpotifyAPIError
 
 def _seed_discography(test_db, user_mock):
     """Popula banco com artista e 3 álbuns canônicos."""
@@ -76,4 +79,60 @@ def test_platinar_artista_com_sucesso(mock_sync, app, test_db, user_mock):
 
         medalha = test_db.session.query(UserPlatinum).filter_by(user_id=fresh_user.id).first()
         assert medalha is not None
-        assert medalha.artist_name == "Banda Teste"
\ No newline at end of file
+        assert medalha.artist_name == "Banda Teste"
+
+def test_voto_de_curadoria_atualiza_progresso_cacheado(app, test_db, user_mock):
+    """Tirar um álbum da platina pela curadoria invalida o progresso já cacheado."""
+    with app.app_context():
+        fresh_user = test_db.session.get(User, user_mock.id)
+        _seed_discography(test_db, fresh_user)
+        Artist.query.filter_by(spotify_artist_id="id_da_banda").first().discography_synced_at = datetime.now(timezone.utc)
+
+        for i in (1, 2):
+            test_db.session.add(AlbumReview(user_id=fresh_user.id, spotify_album_id=f"album_{i}", album_name=f"Estúdio {i}", artist_name="Banda Teste"))
+        test_db.session.commit()
+
+        antes = ArtistService.get_platinum_progress(fresh_user, "id_da_banda")
+        assert antes['stats']['total_required'] == 3
+        assert antes['stats']['is_platinum'] is False
+
+        CurationService.register_vote(user_id=fresh_user.id, spotify_album_id="album_3", is_canonical=False)
+
+        depois = ArtistService.get_platinum_progress(fresh_user, "id_da_banda")
+        assert depois['stats']['total_required'] == 2
+        assert depois['stats']['is_platinum'] is True
+        assert test_db.session.query(UserPlatinum).filter_by(user_id=fresh_user.id).first() is not None
+
+@patch('app.services.artist_service.SpotifySyncService.sync_artist_discography')
+def test_progresso_com_sync_incompleto_nao_concede_platina(mock_sync, app, test_db, user_mock):
+    """Se o job de sincronização falha, a página sai com o que há no banco e sem medalha."""
+    with app.app_context():
+        fresh_user = test_db.session.get(User, user_mock.id)
+        _seed_discography(test_db, fresh_user)
+        mock_sync.side_effect = Exception("Spotify caiu")
+
+        for i in range(1, 4):
+            test_db.session.add(AlbumReview(user_id=fresh_user.id, spotify_album_id=f"album_{i}", album_name=f"Estúdio {i}", artist_name="Banda Teste"))
+        test_db.session.commit()
+
+        resultado = ArtistService.get_platinum_progress(fresh_user, "id_da_banda")
+
+        assert resultado['sync_status'] == 'failed'
+        assert resultado['sync_job_id'] == 'sync_artist_discography:id_da_banda'
+        assert resultado['stats']['total_required'] == 3
+        assert test_db.session.query(UserPlatinum).filter_by(user_id=fresh_user.id).first() is None
+
+@patch('app.services.artist_service.SpotifySyncService.sync_artist')
+def test_artista_inexistente_so_com_404_do_spotify(mock_sync_artist, app, test_db, user_mock):
+    """404 do Spotify vira 'não encontrado'; instabilidade (502/503) sobe como está."""
+    with app.app_context():
+        fresh_user = test_db.session.get(User, user_mock.id)
+
+        mock_sync_artist.side_effect = SpotifyAPIError("não existe", status_code=404)
+        with pytest.raises(ResourceNotFoundError):
+            ArtistService.get_platinum_progress(fresh_user, "id_inexistente")
+
+        mock_sync_artist.side_effect = SpotifyAPIError("sobrecarregado", status_code=503)
+        with pytest.raises(SpotifyAPIError) as erro:
+            ArtistService.get_platinum_progress(fresh_user, "id_inexistente")
+        assert erro.value.status_code == 503
@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import patch
+from app.services.job_service import JobService, _MemoryBackend, JOB_QUEUED, JOB_DONE, JOB_FAILED, JOB_ERROR_MESSAGE
+from app.exceptions import ResourceNotFoundError
+from app.utils import metrics_util
+
+@pytest.fixture
+def fila_em_memoria(app):
+    """Backend em memória sem threads consumindo, com o modo eager desligado."""
+    backend = _MemoryBackend(app, status_ttl=60, workers=0)
+    app.config['JOB_QUEUE_EAGER'] = False
+
+    with patch.object(JobService, '_backend', backend):
+        yield backend
+
+    app.config['JOB_QUEUE_EAGER'] = True
+
+def test_enqueue_deduplica_job_pendente(app, fila_em_memoria):
+    """Dois pedidos do mesmo job enquanto ele está na fila viram um só."""
+    metrics_util.reset()
+    JobService.register('job_teste', lambda valor: None)
+
+    with app.app_context():
+        first = JobService.enqueue('job_teste', 'abc')
+        second = JobService.enqueue('job_teste', 'abc')
+
+    assert first['id'] == second['id'] == 'job_teste:abc'
+    assert second['status'] == JOB_QUEUED
+    assert fila_em_memoria.depth() == 1
+    assert metrics_util.get_counter('jobs.deduplicated') == 1
+
+def test_job_com_erro_e_reagendado_com_backoff(app, fila_em_memoria):
+    """Falha antes do limite de tentativas volta pra fila com espera exponencial."""
+    chamadas = []
+
+    def handler(valor):
+        chamadas.append(valor)
+        raise RuntimeError("falhou")
+
+    JobService.register('job_falho', handler)
+
+    with app.app_context(), patch.object(fila_em_memoria, 'push') as mock_push:
+        fila_em_memoria.statuses.set('job_falho:x', {
+            "id": 'job_falho:x', "name": 'job_falho', "args": ['x'], "status": JOB_QUEUED,
+            "attempts": 1, "error": None, "enqueued_at": None, "updated_at": None
+        })
+        JobService.run_job('job_falho:x')
+        assert JobService.get_status('job_falho:x')['status'] == JOB_QUEUED
+        mock_push.assert_called_once_with('job_falho:x', delay=app.config['JOB_RETRY_BACKOFF'] * 2)
+
+        JobService.run_job('job_falho:x')
+        status = JobService.get_status('job_falho:x')
+
+    assert status['status'] == JOB_FAILED
+    assert status['attempts'] == 3
+    assert status['error'] == JOB_ERROR_MESSAGE
+    assert chamadas == ['x', 'x']
+
+def test_worker_em_burst_processa_a_fila(app, fila_em_memoria):
+    processados = []
+    JobService.register('job_ok', processados.append)
+
+    with app.app_context():
+        JobService.enqueue('job_ok', 1)
+        JobService.enqueue('job_ok', 2)
+        assert JobService.run_worker(burst=True, poll_timeout=0.01) == 2
+        assert JobService.get_status('job_ok:1')['status'] == JOB_DONE
+
+    assert processados == [1, 2]
+
+def test_status_de_job_inexistente(app, fila_em_memoria):
+    with app.app_context(), pytest.raises(ResourceNotFoundError):
+        JobService.get_status('nao_existe')
+
+def test_worker_dedicado_recusa_fila_em_memoria(app):
+    """Sem Redis não há fila compartilhada: o 'flask jobs worker' não deve ficar rodando à toa."""
+    with patch('app.commands.get_redis', return_value=None):
+        result = app.test_cli_runner().invoke(args=['jobs', 'worker', '--burst'])
+
+    assert result.exit_code != 0
+    assert 'REDIS_URL' in result.output
@@ -0,0 +1,86 @@
+import os
+import uuid
+import pytest
+from datetime import datetime
+from sqlalchemy import select, create_engine
+from app.models import AlbumReview, User
+from app.services.review_service import ReviewService
+from app.utils import month_range, month_window
+
+def test_faixa_do_mes_e_semiaberta_e_vira_o_ano():
+    assert month_range(2, 2024) == (datetime(2024, 2, 1), datetime(2024, 3, 1))
+    assert month_range(12, 2025) == (datetime(2025, 12, 1), datetime(2026, 1, 1))
+
+def test_faixa_do_mes_respeita_o_fuso():
+    """Em São Paulo (UTC-3) o mês começa e termina 3 horas depois em UTC."""
+    assert month_range(3, 2026, 'America/Sao_Paulo') == (datetime(2026, 3, 1, 3), datetime(2026, 4, 1, 3))
+    # Fuso inválido cai em UTC em vez de quebrar a leitura
+    assert month_range(3, 2026, 'Marte/Olympus') == (datetime(2026, 3, 1), datetime(2026, 4, 1))
+
+def test_calendario_recorta_o_mes_no_fuso_do_usuario(app, test_db, user_mock):
+    """Uma review de 01:00 UTC do dia 1º ainda é fevereiro pra quem está em São Paulo."""
+    with app.app_context():
+        review = AlbumReview(
+            user_id=user_mock.id, spotify_album_id="alb1", album_name="Álbum",
+            artist_name="Artista", created_at=datetime(2026, 3, 1, 1, 0)
+        )
+        test_db.session.add(review)
+        test_db.session.commit()
+        user_id = str(user_mock.id)
+
+        assert list(ReviewService.get_calendar_data.uncached(user_id, 3, 2026, user_id)) == ["1"]
+        assert ReviewService.get_calendar_data.uncached(user_id, 2, 2026, user_id) == {}
+
+        test_db.session.get(User, user_mock.id).timezone = 'America/Sao_Paulo'
+        test_db.session.commit()
+
+        assert ReviewService.get_calendar_data.uncached(user_id, 3, 2026, user_id) == {}
+        assert list(ReviewService.get_calendar_data.uncached(user_id, 2, 2026, user_id)) == ["28"]
+
+def test_fuso_invalido_e_recusado(auth_client):
+    response = auth_client.put('/api/me/timezone', json={"timezone": "Marte/Olympus"})
+    assert response.status_code == 400
+
+    response = auth_client.put('/api/me/timezone', json={"timezone": "America/Sao_Paulo"})
+    assert response.status_code == 200
+    assert response.get_json()["data"]["timezone"] == "America/Sao_Paulo"
+
+def _month_query(user_id):
+    return select(AlbumReview.id).where(
+        AlbumReview.user_id == user_id,
+        month_window(AlbumReview.created_at, 3, 2026)
+    )
+
+def test_plano_usa_o_indice_no_sqlite(app, test_db):
+    """A faixa em created_at entra na busca pelo índice (user_id, created_at), não só no user_id."""
+    with app.app_context():
+        compiled = _month_query(str(uuid.uuid4())).compile(test_db.engine)
+        params = tuple(str(compiled.params[name]) for name in compiled.positiontup)
+
+        with test_db.engine.connect() as conn:
+            plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params))
+
+        assert "idx_reviews_user_date" in plan
+        assert "created_at>" in plan and "created_at<" in plan
+
+@pytest.mark.skipif(not os.getenv('TEST_POSTGRES_URL'), reason="Defina TEST_POSTGRES_URL pra checar o plano no PostgreSQL.")
+def test_plano_usa_o_indice_no_postgres():
+    """No PostgreSQL, as duas pontas do mês aparecem no Index Cond do idx_reviews_user_date."""
+    engine = create_engine(os.environ['TEST_POSTGRES_URL'])
+    tables = [User.__table__, AlbumReview.__table__]
+    User.metadata.create_all(engine, tables=tables)
+    try:
+        compiled = _month_query(uuid.uuid4()).compile(engine)
+        params = {k: str(v) if isinstance(v, uuid.UUID) else v for k, v in compiled.params.items()}
+
+        with engine.connect() as conn:
+            # Tabela vazia: sem isso o planner prefere seq scan e o teste não diria nada
+            conn.exec_driver_sql("SET enable_seqscan = off")
+            plan = "\n".join(row[0] for row in conn.exec_driver_sql(f"EXPLAIN {compiled}", params))
+
+        assert "idx_reviews_user_date" in plan
+        index_cond = next(line for line in plan.splitlines() if "Index Cond" in line)
+        assert "created_at >=" in index_cond and "created_at <" in index_cond
+    finally:
+        User.metadata.drop_all(engine, tables=list(reversed(tables)))
+        engine.dispose()
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from app.models import AlbumReview
+from app.services.review_service import ReviewService
+from app.services.explore_service import ExploreService
+from app.utils import encode_cursor, decode_cursor
+
+def _reviews(test_db, user, quantidade, is_private=False):
+    """Cria reviews com horários distintos, e duas com o mesmo horário pra testar o desempate por id."""
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    reviews = [
+        AlbumReview(
+            user_id=user.id, spotify_album_id=f"alb{i}", album_name=f"Álbum {i}",
+            artist_name="Artista", is_private=is_private,
+            created_at=base + timedelta(minutes=i if i % 5 else i - 1)
+        )
+        for i in range(quantidade)
+    ]
+    test_db.session.add_all(reviews)
+    test_db.session.commit()
+    return reviews
+
+def test_cursor_ida_e_volta():
+    moment = datetime(2026, 3, 4, 5, 6, 7, 891011)
+    cursor = encode_cursor(moment, "6f1c1d1e-5a4b-4c3d-9e2f-0a1b2c3d4e5f")
+    created_at, item_id = decode_cursor(cursor)
+    assert created_at == moment
+    assert str(item_id) == "6f1c1d1e-5a4b-4c3d-9e2f-0a1b2c3d4e5f"
+
+def test_historico_por_cursor_sem_repetir_nem_pular(app, test_db, user_mock):
+    """Percorre o histórico inteiro página por página, do mais novo pro mais antigo, sem buracos."""
+    with app.app_context():
+        _reviews(test_db, user_mock, 23)
+        user_id = str(user_mock.id)
+
+        vistos, datas, cursor = [], [], None
+        while True:
+            page = ReviewService.get_reviews_cursor(user_id, cursor=cursor, limit=5, request_user_id=user_id)
+            vistos += [r["id"] for r in page["items"]]
+            datas += [r["created_at"] for r in page["items"]]
+            if not page["has_next"]:
+                break
+            cursor = page["next_cursor"]
+
+        assert page["total"] is None
+        com_total = ReviewService.get_reviews_cursor(user_id, limit=5, request_user_id=user_id, include_total=True)
+        assert com_total["total"] == 23
+        assert len(vistos) == len(set(vistos)) == 23
+        assert datas == sorted(datas, reverse=True)
+
+        completo = ReviewService.get_reviews(user_id, page=1, per_page=50, request_user_id=user_id)
+        assert set(vistos) == {r["id"] for r in completo["items"]}
+
+def test_feed_por_cursor_ignora_privadas_e_conta_sob_demanda(client, app, test_db, user_mock):
+    with app.app_context():
+        _reviews(test_db, user_mock, 3)
+        _reviews(test_db, user_mock, 2, is_private=True)
+        ExploreService.get_global_feed_page.delete(None, 2)
+
+    response = client.get('/api/explore/feed?limit=2')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body["data"]) == 2
+    assert body["meta"]["has_next"] is True
+    assert "total_items" not in body["meta"]
+
+    response = client.get(f'/api/explore/feed?limit=2&cursor={body["meta"]["next_cursor"]}')
+    body = response.get_json()
+    assert len(body["data"]) == 1
+    assert body["meta"]["has_next"] is False
+    assert body["meta"]["next_cursor"] is None
+
+    response = client.get('/api/explore/feed?limit=2&include_total=true')
+    assert response.get_json()["meta"]["total_items"] == 3
+
+def test_cursor_invalido_e_limite_fora_da_faixa(client):
+    assert client.get('/api/explore/feed?cursor=naoeumcursor').status_code == 400
+    assert client.get('/api/explore/feed?limit=500').status_code == 400
@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import event
+from app.exceptions import BusinessRuleError
+from app.models import TrackReview, User
+from app.schemas import ReviewCreate, ReviewFull
+from app.services.review_service import ReviewService
+
+def _payload(total_faixas):
+    return ReviewCreate.model_validate({
+        "album": {"name": "Deluxe", "artist": "Banda", "id": "alb_deluxe"},
+        "tracks": [
+            {"name": f"Faixa {n}", "track_number": n, "userScore": 9.0 if n % 2 else 10.0}
+            for n in range(1, total_faixas)
+        ] + [{"name": "Bônus", "track_number": total_faixas, "is_ignored": True}]
+    }).model_dump()
+
+def test_faixas_entram_num_insert_e_a_review_volta_sem_recarregar(app, test_db, user_mock):
+    """30 faixas: um único INSERT em track_reviews, e serializar a resposta não vai ao banco."""
+    with app.app_context():
+        user = test_db.session.get(User, user_mock.id)
+
+        consultas = []
+        contar = lambda conn, cursor, statement, *args: consultas.append(statement)
+        event.listen(test_db.engine, 'before_cursor_execute', contar)
+        try:
+            review = ReviewService.create_review(user, _payload(30))
+            depois_do_commit = len(consultas)
+            resposta = ReviewFull.model_validate(review).model_dump()
+        finally:
+            event.remove(test_db.engine, 'before_cursor_execute', contar)
+
+        assert len([c for c in consultas if 'track_reviews' in c]) == 1
+        assert len(consultas) == depois_do_commit
+
+        # Média só das 29 faixas avaliadas (15 notas 9 e 14 notas 10)
+        assert resposta["average_score"] == 9.5
+        assert resposta["tier"] == "S"
+        assert len(resposta["tracks"]) == 30
+        assert TrackReview.query.filter_by(album_review_id=review.id).count() == 30
+
+def test_editar_album_longo_le_e_grava_as_faixas_uma_vez_so(app, test_db, user_mock):
+    """Mudando 40 faixas: um SELECT e um UPDATE em lote em track_reviews, não um por faixa."""
+    with app.app_context():
+        user = test_db.session.get(User, user_mock.id)
+        payload = _payload(41)
+        for n, track in enumerate(payload["tracks"], start=1):
+            track["id"] = f"faixa{n}"
+        review_id = ReviewService.create_review(user, payload).id
+        test_db.session.remove()
+
+        user = test_db.session.get(User, user_mock.id)
+        edicao = {"tracks": [{"id": f"faixa{n}", "userScore": 5.0} for n in range(1, 41)]}
+
+        consultas = []
+        contar = lambda conn, cursor, statement, *args: consultas.append(statement)
+        event.listen(test_db.engine, 'before_cursor_execute', contar)
+        try:
+            review = ReviewService.update_review(user, review_id, edicao)
+        finally:
+            event.remove(test_db.engine, 'before_cursor_execute', contar)
+
+        nas_faixas = [c for c in consultas if 'track_reviews' in c]
+        assert len(nas_faixas) == 2
+        assert nas_faixas[0].startswith('SELECT') and nas_faixas[1].startswith('UPDATE')
+
+        assert review.average_score == 5.0
+        assert TrackReview.query.filter_by(album_review_id=review_id, score=5.0).count() == 40
+
+def test_ignorar_todas_as_faixas_na_edicao_e_recusado(app, test_db, user_mock):
+    with app.app_context():
+        user = test_db.session.get(User, user_mock.id)
+        payload = _payload(3)
+        for n, track in enumerate(payload["tracks"], start=1):
+            track["id"] = f"faixa{n}"
+        review_id = ReviewService.create_review(user, payload).id
+
+        with pytest.raises(BusinessRuleError):
+            ReviewService.update_review(user, review_id, {"tracks": [{"id": "faixa1", "is_ignored": True}, {"id": "faixa2", "is_ignored": True}]})
+
+        # Nada foi gravado: as faixas 1 e 2 continuam avaliadas
+        assert TrackReview.query.filter_by(album_review_id=review_id, is_ignored=False).count() == 2
+
+def test_voltar_a_avaliar_faixa_sem_nota_e_recusado(app, test_db, user_mock):
+    """Tirar o 'ignorar' de uma faixa sem mandar userScore deixaria a média com um None."""
+    with app.app_context():
+        user = test_db.session.get(User, user_mock.id)
+        payload = _payload(3)
+        for n, track in enumerate(payload["tracks"], start=1):
+            track["id"] = f"faixa{n}"
+        review_id = ReviewService.create_review(user, payload).id
+
+        with pytest.raises(BusinessRuleError):
+            ReviewService.update_review(user, review_id, {"tracks": [{"id": "faixa3", "is_ignored": False}]})
+        assert TrackReview.query.filter_by(album_review_id=review_id, is_ignored=True).count() == 1
+
+        review = ReviewService.update_review(user, review_id, {"tracks": [{"id": "faixa3", "is_ignored": False, "userScore": 7.0}]})
+        assert review.average_score == 8.7
@@ -0,0 +1,146 @@
+import sqlalchemy as sa
+from app.models import Album, AlbumReview, AlbumTrack, Artist, User
+from app.services.album_service import AlbumService
+from app.services.review_service import ReviewService
+from app.services.search_service import SearchService
+from app.services.user_service import UserService
+from app.utils import normalize_search_text, metrics_util
+
+def test_normalizacao_tira_caixa_acento_e_espacos():
+    assert normalize_search_text("Construção ", None, "Chico  Buarque") == "construcao chico buarque"
+
+def test_busca_de_usuarios_ignora_acento_e_traz_o_mais_parecido_primeiro(app, test_db, user_mock):
+    with app.app_context():
+        test_db.session.add_all([
+            User(spotify_id="u1", display_name="Maria José"),
+            User(spotify_id="u2", display_name="José Augusto"),
+            User(spotify_id="u3", display_name="Joana")
+        ])
+        test_db.session.commit()
+
+        nomes = [u.display_name for u in UserService.search_users("jose")]
+        assert nomes == ["José Augusto", "Maria José"]
+
+        # Spotify ID exato continua valendo
+        assert [u.display_name for u in UserService.search_users("u3")] == ["Joana"]
+
+def test_historico_busca_album_ou_artista_sem_acento(app, test_db, user_mock):
+    with app.app_context():
+        test_db.session.add_all([
+            AlbumReview(user_id=user_mock.id, spotify_album_id="a1", album_name="Construção", artist_name="Chico Buarque"),
+            AlbumReview(user_id=user_mock.id, spotify_album_id="a2", album_name="Clube da Esquina", artist_name="Milton Nascimento")
+        ])
+        test_db.session.commit()
+        user_id = str(user_mock.id)
+
+        page = ReviewService._get_reviews_cached.uncached(user_id, 1, 10, (('search', 'CONSTRUCAO'),), user_id)
+        assert [item["album_name"] for item in page["items"]] == ["Construção"]
+
+        page = ReviewService._get_reviews_cached.uncached(user_id, 1, 10, (('search', 'milton'),), user_id)
+        assert [item["album_name"] for item in page["items"]] == ["Clube da Esquina"]
+
+def test_rebuild_preenche_linhas_antigas(app, test_db, user_mock):
+    """Linhas anteriores à coluna (search_text vazio) entram na busca depois do rebuild."""
+    with app.app_context():
+        review = AlbumReview(user_id=user_mock.id, spotify_album_id="a1", album_name="Açúcar", artist_name="Banda")
+        test_db.session.add(review)
+        test_db.session.commit()
+        test_db.session.execute(sa.update(AlbumReview).values(search_text=None))
+        test_db.session.execute(sa.update(User).values(search_name=None))
+        test_db.session.commit()
+
+        assert SearchService.rebuild_index() == 2
+        test_db.session.commit()
+        assert SearchService.rebuild_index() == 0
+
+        assert test_db.session.scalar(sa.select(AlbumReview.search_text)) == "acucar banda"
+        assert [u.display_name for u in UserService.search_users("tracie")] == ["Tracie Tester"]
+
+def _catalogo(test_db):
+    artista = Artist(spotify_artist_id="chico_id", name="Chico Buarque")
+    album = Album(
+        spotify_album_id="construcao_id", name="Construção (Remastered)", clean_name="Construção",
+        artist_name="Chico Buarque", artist_spotify_id="chico_id"
+    )
+    test_db.session.add_all([artista, album])
+    test_db.session.flush()
+    # Mesma faixa em duas edições do álbum: aparece uma vez só
+    deluxe = Album(spotify_album_id="construcao_deluxe", name="Construção (Deluxe)", clean_name="Construção", artist_name="Chico Buarque")
+    test_db.session.add(deluxe)
+    test_db.session.flush()
+    test_db.session.add_all([
+        AlbumTrack(spotify_track_id="faixa_id", album_spotify_id="construcao_id", name="Construção", track_number=1),
+        AlbumTrack(spotify_track_id="faixa_id", album_spotify_id="construcao_deluxe", name="Construção", track_number=1)
+    ])
+    test_db.session.commit()
+
+def test_busca_rapida_responde_pelo_catalogo_sem_chamar_o_spotify(app, test_db, mock_spotify):
+    with app.app_context():
+        _catalogo(test_db)
+        test_db.session.add(Artist(spotify_artist_id="banda_id", name="Construção Sonora"))
+        test_db.session.commit()
+
+        resultados = SearchService.quick_search.uncached("construcao", 1)
+
+        assert mock_spotify.return_value.search.call_count == 0
+        por_tipo = {r.type: r for r in resultados}
+        assert por_tipo["ARTIST"].name == "Construção Sonora"
+        assert por_tipo["ALBUM"].id in ("construcao_id", "construcao_deluxe")
+        assert por_tipo["TRACK"].id == "faixa_id"
+        assert [r.type for r in resultados].count("TRACK") == 1
+
+def test_busca_rapida_completa_com_o_spotify_sem_repetir(app, test_db, mock_spotify):
+    """Faltou resultado local: o Spotify completa, e o que já veio do catálogo não se repete."""
+    with app.app_context():
+        _catalogo(test_db)
+        mock_spotify.return_value.search.return_value = {
+            "artists": {"items": [
+                {"id": "chico_id", "name": "Chico Buarque", "images": []},
+                {"id": "chico_science_id", "name": "Chico Science", "images": []}
+            ]},
+            "albums": {"items": []},
+            "tracks": {"items": []}
+        }
+
+        resultados = SearchService.quick_search.uncached("chico", 2)
+
+        assert mock_spotify.return_value.search.call_count == 1
+        artistas = [r.id for r in resultados if r.type == "ARTIST"]
+        assert artistas == ["chico_id", "chico_science_id"]
+
+def test_busca_de_albuns_local_nao_chama_o_spotify(app, test_db, mock_spotify):
+    with app.app_context():
+        _catalogo(test_db)
+
+        albums = AlbumService._search_albums_cached.uncached("construção", 2)
+
+        assert mock_spotify.return_value.search.call_count == 0
+        assert sorted(a.id for a in albums) == ["construcao_deluxe", "construcao_id"]
+        assert all(a.artist == "Chico Buarque" for a in albums)
+
+def test_busca_de_albuns_local_ignora_coletaneas(app, test_db, mock_spotify):
+    """Como no /search do Spotify, coletâneas do catálogo local ficam de fora."""
+    with app.app_context():
+        _catalogo(test_db)
+        test_db.session.add(Album(
+            spotify_album_id="coletanea_id", name="Construção: Grandes Sucessos",
+            artist_name="Vários Artistas", album_type="compilation"
+        ))
+        test_db.session.commit()
+        mock_spotify.return_value.search.return_value = {"albums": {"items": []}}
+
+        albums = AlbumService._search_albums_cached.uncached("construção", 3)
+
+        assert "coletanea_id" not in [a.id for a in albums]
+
+def test_busca_rapida_registra_falha_do_spotify(app, test_db, mock_spotify):
+    """Spotify fora: a busca responde com o catálogo local, loga e conta o erro."""
+    with app.app_context():
+        metrics_util.reset()
+        _catalogo(test_db)
+        mock_spotify.return_value.search.side_effect = Exception("Spotify caiu")
+
+        resultados = SearchService.quick_search.uncached("chico", 2)
+
+        assert [r.id for r in resultados if r.type == "ARTIST"] == ["chico_id"]
+        assert metrics_util.get_counter('search.quick.spotify_error') == 1
@@ -0,0 +1,128 @@
+import pytest
+import threading
+import fakeredis
+from unittest.mock import patch
+from spotipy.exceptions import SpotifyException
+from app.exceptions import SpotifyAPIError
+from app.services.spotify_governor import (
+    SpotifyGovernor, RedisTokenBucket, endpoint_from_url, spotify_lane, INTERACTIVE, BACKGROUND
+)
+from app.utils import metrics_util
+
+def test_endpoint_from_url_normaliza_caminhos():
+    assert endpoint_from_url('search') == 'search'
+    assert endpoint_from_url('albums/?ids=1,2,3') == 'albums'
+    assert endpoint_from_url('artists/123/albums') == 'artists.albums'
+    assert endpoint_from_url('https://api.spotify.com/v1/albums/abc/tracks?offset=50') == 'albums.tracks'
+
+def test_governor_respeita_retry_after_e_tenta_de_novo():
+    """Um 429 deve pausar o governador pelo Retry-After e a chamada deve ser refeita."""
+    metrics_util.reset()
+    governor = SpotifyGovernor(rate=100, burst=10)
+    responses = [SpotifyException(429, -1, 'rate limited', headers={'Retry-After': '2'}), {'ok': True}]
+
+    def call():
+        result = responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    with patch('app.services.spotify_governor.time.sleep') as mock_sleep, \
+         patch.object(governor._global, 'paused_for', side_effect=[0.0, 2.0, 0.0]):
+        assert governor.execute('albums/abc', call) == {'ok': True}
+
+    mock_sleep.assert_called()
+    assert metrics_util.get_counter('spotify.governor.throttled') == 1
+    assert metrics_util.get_counter('spotify.governor.requests.albums') == 2
+
+def test_governor_nao_tenta_de_novo_outros_erros():
+    governor = SpotifyGovernor(rate=100, burst=10)
+
+    def call():
+        raise SpotifyException(404, -1, 'not found')
+
+    with pytest.raises(SpotifyException):
+        governor.execute('albums/abc', call)
+
+def test_segundo_plano_nao_consome_reserva_interativa():
+    """Com o bucket na reserva, o tráfego de fundo espera (e desiste) enquanto o interativo passa."""
+    metrics_util.reset()
+    governor = SpotifyGovernor(rate=0.01, burst=2, background_reserve=1, max_wait=0.5)
+
+    governor.acquire('albums', INTERACTIVE)
+
+    with pytest.raises(SpotifyAPIError):
+        governor.acquire('albums', BACKGROUND)
+
+    governor.acquire('albums', INTERACTIVE)
+    assert metrics_util.get_counter('spotify.governor.timeouts') == 1
+    assert governor.stats()['queue_depth'] == {INTERACTIVE: 0, BACKGROUND: 0}
+
+def test_segundo_plano_cedendo_a_vez_respeita_max_wait():
+    """Com um interativo sempre na fila, o job de fundo desiste em max_wait em vez de esperar pra sempre."""
+    metrics_util.reset()
+    governor = SpotifyGovernor(rate=100, burst=10, max_wait=0.2)
+    governor._waiting[INTERACTIVE] = 1
+    erros = []
+
+    def fundo():
+        try:
+            governor.acquire('albums', BACKGROUND)
+        except SpotifyAPIError as e:
+            erros.append(e)
+
+    worker = threading.Thread(target=fundo, daemon=True)
+    worker.start()
+    worker.join(timeout=2)
+
+    assert not worker.is_alive()
+    assert erros[0].status_code == 503
+    assert metrics_util.get_counter('spotify.governor.timeouts') == 1
+
+def test_orcamento_por_endpoint_limita_so_aquele_endpoint():
+    governor = SpotifyGovernor(
+        rate=100, burst=100, max_wait=0.2,
+        endpoint_budgets={'search': {'rate': 0.01, 'burst': 1}}
+    )
+
+    governor.acquire('search')
+    with pytest.raises(SpotifyAPIError):
+        governor.acquire('search')
+
+    governor.acquire('albums')
+
+def test_spotify_lane_marca_chamadas_de_fundo():
+    governor = SpotifyGovernor(rate=100, burst=10)
+
+    with patch.object(governor, 'acquire') as mock_acquire:
+        with spotify_lane(BACKGROUND):
+            governor.execute('artists/1/albums', lambda: None)
+        governor.execute('search', lambda: None)
+
+    assert mock_acquire.call_args_list[0].args == ('artists.albums', BACKGROUND)
+    assert mock_acquire.call_args_list[1].args == ('search', INTERACTIVE)
+
+def test_espera_global_devolve_a_ficha_do_endpoint():
+    """Se o bucket global não tem ficha, a ficha já tirada do endpoint não pode se perder."""
+    metrics_util.reset()
+    governor = SpotifyGovernor(
+        rate=0.01, burst=1, max_wait=0.2,
+        endpoint_budgets={'search': {'rate': 0.01, 'burst': 2}}
+    )
+
+    governor.acquire('albums')
+    with pytest.raises(SpotifyAPIError):
+        governor.acquire('search')
+
+    # As duas fichas de 'search' continuam lá pra quando o global voltar
+    assert governor._endpoints['search'].try_acquire() == 0
+    assert governor._endpoints['search'].try_acquire() == 0
+
+def test_bucket_redis_devolve_ficha():
+    redis_falso = fakeredis.FakeRedis()
+    bucket = RedisTokenBucket(redis_falso, 'teste:bucket', rate=0.01, capacity=1)
+
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() > 0
+    bucket.refund()
+    assert bucket.try_acquire() == 0
@@ -0,0 +1,111 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+from spotipy.cache_handler import MemoryCacheHandler
+from app.services.spotify_service import SpotifyService, _AppClientCredentials
+from app.utils import metrics_util
+from app.utils.lru_util import BoundedTTLCache
+
+# O conftest troca o get_client por um mock em todos os testes; guardamos o original aqui
+_real_get_client = SpotifyService.get_client
+
+def _fake_token(expires_in=3600):
+    return {
+        'access_token': 'token_da_app',
+        'token_type': 'Bearer',
+        'expires_in': expires_in,
+        'expires_at': int(time.time()) + expires_in
+    }
+
+def test_app_credentials_reaproveita_token_valido():
+    """O token da aplicação só deve ser pedido ao Spotify uma vez enquanto estiver válido."""
+    metrics_util.reset()
+    credentials = _AppClientCredentials(
+        client_id='id', client_secret='secret', cache_handler=MemoryCacheHandler()
+    )
+
+    with patch.object(credentials, '_request_access_token', return_value=_fake_token()) as mock_request:
+        for _ in range(5):
+            assert credentials.get_access_token() == 'token_da_app'
+
+    assert mock_request.call_count == 1
+    assert metrics_util.get_counter('spotify.app_token.refresh') == 1
+    assert metrics_util.get_counter('spotify.app_token.reuse') == 4
+
+def test_app_credentials_renova_perto_de_expirar():
+    """Se o token está dentro da margem de renovação, um novo deve ser pedido."""
+    metrics_util.reset()
+    credentials = _AppClientCredentials(
+        client_id='id', client_secret='secret', cache_handler=MemoryCacheHandler(), refresh_margin=120
+    )
+
+    with patch.object(credentials, '_request_access_token', side_effect=[_fake_token(60), _fake_token()]) as mock_request:
+        credentials.get_access_token()
+        credentials.get_access_token()
+
+    assert mock_request.call_count == 2
+    assert metrics_util.get_counter('spotify.app_token.refresh') == 2
+
+def test_app_client_e_compartilhado_pelo_processo(app, monkeypatch):
+    """Chamadas sucessivas devem devolver o mesmo cliente e a mesma sessão HTTP."""
+    monkeypatch.setenv('SPOTIFY_CLIENT_ID', 'id')
+    monkeypatch.setenv('SPOTIFY_CLIENT_SECRET', 'secret')
+
+    with app.app_context():
+        SpotifyService._app_client = None
+        SpotifyService._http_session = None
+
+        first = SpotifyService._get_app_client()
+        second = SpotifyService._get_app_client()
+
+        assert first is second
+        assert first._session is SpotifyService._get_http_session()
+
+        SpotifyService._app_client = None
+        SpotifyService._http_session = None
+
+def _fake_user(spotify_id, access_token):
+    return SimpleNamespace(
+        spotify_id=spotify_id,
+        access_token=access_token,
+        refresh_token='refresh',
+        token_expires_at=int(time.time()) + 3600
+    )
+
+def test_registro_de_clientes_reaproveita_mesmo_token(app):
+    """Duas requisições com o mesmo token devem receber o mesmo cliente."""
+    with app.app_context():
+        SpotifyService._client_cache = None
+
+        first = _real_get_client(_fake_user('tracie', 'token_1'))
+        second = _real_get_client(_fake_user('tracie', 'token_1'))
+
+        assert first is second
+        assert SpotifyService.get_user_client_stats()['hits'] == 1
+
+def test_registro_de_clientes_troca_cliente_quando_token_renova(app):
+    """Um token renovado (nova geração) deve gerar um cliente novo, sem servir o antigo."""
+    with app.app_context():
+        SpotifyService._client_cache = None
+
+        old_client = _real_get_client(_fake_user('tracie', 'token_1'))
+        new_client = _real_get_client(_fake_user('tracie', 'token_2'))
+
+        assert old_client is not new_client
+        assert new_client._auth == 'token_2'
+
+def test_lru_descarta_menos_usado_e_respeita_ttl():
+    """O cache limitado descarta o item menos usado e expira itens vencidos."""
+    lru = BoundedTTLCache(maxsize=2)
+    lru.set('a', 1)
+    lru.set('b', 2)
+    lru.get('a')
+    lru.set('c', 3)
+
+    assert lru.get('b') is None
+    assert lru.get('a') == 1
+    assert lru.stats()['evictions'] == 1
+
+    lru.set('d', 4, ttl=-1)
+    assert lru.get('d') is None
+    assert lru.stats()['expirations'] == 1
@@ -1,9 +1,16 @@
 import pytest
+from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
+from spotipy.exceptions import SpotifyException
+from app.extensions import cache
+from app.services.album_service import AlbumService
+from app.services.job_service import JobService
 from app.services.spotify_sync_service import SpotifySyncService
 from app.models.artist import Artist
 from app.models.album import Album
+from app.models.album_track import AlbumTrack
 from app.exceptions import SpotifyAPIError
+from app.utils import metrics_util
 
 def _fake_artist_data():
     return {
@@ -75,4 +82,205 @@ def test_sync_artist_erro_spotify_faz_rollback(app, test_db):
         sp.artist.side_effect = Exception("Spotify caiu")
 
         with pytest.raises(SpotifyAPIError):
-            SpotifySyncService.sync_artist('artist_erro', sp)
\ No newline at end of file
+            SpotifySyncService.sync_artist('artist_erro', sp)
+
+def _fake_album_data_n(n):
+    data = _fake_album_data()
+    data['id'] = f'album_{n}'
+    data['name'] = f'Álbum {n}'
+    data['tracks'] = {
+        'items': [{**track, 'id': f'album_{n}_{track["id"]}'} for track in data['tracks']['items']],
+        'next': None
+    }
+    return data
+
+def test_sync_discografia_usa_endpoints_em_lote(app, test_db):
+    """40 álbuns devem virar 2 chamadas de álbuns e 1 de artistas, sem sp.album por álbum."""
+    with app.app_context():
+        sp = MagicMock()
+        sp.artist.return_value = _fake_artist_data()
+        sp.artist_albums.return_value = {
+            'items': [{'id': f'album_{n}', 'album_type': 'album'} for n in range(40)],
+            'next': None
+        }
+        sp.albums.side_effect = lambda ids: {'albums': [_fake_album_data_n(i.split('_')[1]) for i in ids]}
+        sp.artists.return_value = {'artists': [_fake_artist_data()]}
+
+        SpotifySyncService.sync_artist_discography('artist_123', sp)
+
+        assert sp.albums.call_count == 2
+        assert sp.album.call_count == 0
+        # O artista já foi sincronizado no começo, o lote não precisa buscá-lo de novo
+        assert sp.artists.call_count == 0
+        assert sp.next.call_count == 0
+        assert Album.query.count() == 40
+
+def test_sync_albums_batch_deduplica_artistas(app, test_db):
+    """Vários álbuns do mesmo artista geram uma única busca de artistas."""
+    with app.app_context():
+        sp = MagicMock()
+        sp.albums.return_value = {'albums': [_fake_album_data_n(1), _fake_album_data_n(2)]}
+        sp.artists.return_value = {'artists': [_fake_artist_data()]}
+
+        albums = SpotifySyncService.sync_albums_batch(['album_1', 'album_2', 'album_1'], sp)
+
+        assert set(albums) == {'album_1', 'album_2'}
+        sp.albums.assert_called_once_with(['album_1', 'album_2'])
+        sp.artists.assert_called_once_with(['artist_123'])
+        assert albums['album_1'].genres == ['rock', 'progressive rock']
+
+def test_fetch_albums_completa_tracks_em_paralelo():
+    """Álbuns com mais tracks que a página embutida recebem o resto via album_tracks."""
+    data = _fake_album_data_n(1)
+    data['tracks'].update({'total': 4, 'next': 'albums/album_1/tracks?offset=2'})
+
+    sp = MagicMock()
+    sp.albums.return_value = {'albums': [data]}
+    sp.album_tracks.side_effect = lambda album_id, limit, offset: {
+        'items': [{'id': f'extra_{offset}', 'name': 'Extra', 'track_number': 3, 'duration_ms': 1, 'preview_url': None},
+                  {'id': f'extra_{offset + 1}', 'name': 'Extra', 'track_number': 4, 'duration_ms': 1, 'preview_url': None}]
+    }
+
+    fetched = SpotifySyncService._fetch_albums(['album_1'], sp, workers=4)
+
+    sp.album_tracks.assert_called_once_with('album_1', limit=50, offset=2)
+    assert len(fetched[0]['tracks']['items']) == 4
+    assert fetched[0]['tracks']['next'] is None
+
+def test_resync_de_tracks_aplica_apenas_o_diff(app, test_db):
+    """Re-sincronizar mantém as faixas iguais, atualiza as alteradas e remove as que sumiram."""
+    with app.app_context():
+        sp = MagicMock()
+        sp.album.return_value = _fake_album_data()
+        sp.artist.return_value = _fake_artist_data()
+        SpotifySyncService.sync_album('album_123', sp)
+        test_db.session.commit()
+
+        faixa_1 = AlbumTrack.query.filter_by(spotify_track_id='track_1').first()
+        faixa_1.suggested_ignore = True
+        id_original = faixa_1.id
+        test_db.session.commit()
+
+        novo = _fake_album_data()
+        novo['tracks']['items'] = [
+            novo['tracks']['items'][0],
+            {'id': 'track_3', 'name': 'Faixa 3 (nova)', 'track_number': 2, 'duration_ms': 150000, 'preview_url': None},
+        ]
+        SpotifySyncService._sync_tracks(Album.query.first(), novo['tracks'], sp)
+        test_db.session.commit()
+
+        faixas = {t.spotify_track_id: t for t in AlbumTrack.query.all()}
+        assert set(faixas) == {'track_1', 'track_3'}
+        assert faixas['track_1'].id == id_original
+        assert faixas['track_1'].suggested_ignore is True
+
+def _envelhecer(entity, days):
+    entity.last_synced_at = datetime.now(timezone.utc) - timedelta(days=days)
+
+def test_artista_desatualizado_e_servido_e_atualizado_em_segundo_plano(app, test_db):
+    """Entre o TTL soft e o hard, a linha volta na hora e a atualização vai pra fila."""
+    metrics_util.reset()
+
+    with app.app_context():
+        sp = MagicMock()
+        sp.artist.return_value = _fake_artist_data()
+        artist = SpotifySyncService.sync_artist('artist_123', sp)
+        _envelhecer(artist, 45)
+        test_db.session.commit()
+
+        with patch('app.services.spotify_sync_service.JobService.enqueue') as mock_enqueue:
+            servido = SpotifySyncService.sync_artist('artist_123', sp)
+
+        assert servido.name == 'Artista Teste'
+        assert sp.artist.call_count == 1
+        mock_enqueue.assert_called_once_with('sync_artist', 'artist_123')
+        assert metrics_util.get_counter('sync.artist.stale_served') == 1
+
+def test_album_desatualizado_sai_do_cache_quando_o_job_termina(app, test_db):
+    """O payload montado com a linha velha não sobrevive à atualização em segundo plano."""
+    with app.app_context():
+        cache.clear()
+        sp = MagicMock()
+        sp.album.return_value = _fake_album_data()
+        sp.artist.return_value = _fake_artist_data()
+        album = SpotifySyncService.sync_album('album_123', sp)
+        _envelhecer(album, 45)
+        test_db.session.commit()
+
+        assert AlbumService.get_album_details(None, 'album_123').name == 'Álbum Teste'
+
+        sp.album.return_value = {**_fake_album_data(), 'name': 'Álbum Teste (Remaster)'}
+        with patch('app.services.spotify_sync_service.SpotifyService.get_client', return_value=sp):
+            JobService.run_job(JobService.job_id('sync_album', 'album_123'))
+
+        assert AlbumService.get_album_details(None, 'album_123').name == 'Álbum Teste (Remaster)'
+
+def test_artista_expirado_bloqueia_no_spotify(app, test_db):
+    """Depois do TTL hard, a requisição espera a atualização."""
+    metrics_util.reset()
+
+    with app.app_context():
+        sp = MagicMock()
+        sp.artist.return_value = _fake_artist_data()
+        artist = SpotifySyncService.sync_artist('artist_123', sp)
+        _envelhecer(artist, 400)
+        test_db.session.commit()
+
+        SpotifySyncService.sync_artist('artist_123', sp)
+
+        assert sp.artist.call_count == 2
+        assert metrics_util.get_counter('sync.artist.blocking_refresh.missing') == 1
+        assert metrics_util.get_counter('sync.artist.blocking_refresh.expired') == 1
+
+def test_insercao_concorrente_do_mesmo_artista_nao_estoura_unique(app, test_db):
+    """Se outro worker inseriu o artista no meio do caminho, a linha existente é reaproveitada."""
+    with app.app_context():
+        existente = Artist(spotify_artist_id='artist_123', name='Antigo')
+        test_db.session.add(existente)
+        test_db.session.commit()
+
+        with patch.object(Artist, 'query') as mock_query:
+            # A primeira leitura não vê a linha (ainda não commitada pelo outro worker)
+            mock_query.filter_by.return_value.first.side_effect = [None, existente]
+            artist = SpotifySyncService._upsert_entity(
+                Artist, lambda a: SpotifySyncService._apply_artist(a, _fake_artist_data()),
+                spotify_artist_id='artist_123'
+            )
+
+        test_db.session.commit()
+        assert artist is existente
+        assert Artist.query.count() == 1
+        assert Artist.query.first().name == 'Artista Teste'
+
+def test_sync_artist_mantem_o_404_do_spotify(app, test_db):
+    """Artista inexistente sai com 404; outras falhas do Spotify continuam 502."""
+    with app.app_context():
+        sp = MagicMock()
+        sp.artist.side_effect = SpotifyException(404, -1, 'non existing id')
+        with pytest.raises(SpotifyAPIError) as erro:
+            SpotifySyncService.sync_artist('artist_404', sp)
+        assert erro.value.status_code == 404
+
+        sp.artist.side_effect = SpotifyException(500, -1, 'server error')
+        with pytest.raises(SpotifyAPIError) as erro:
+            SpotifySyncService.sync_artist('artist_500', sp)
+        assert erro.value.status_code == 502
+
+def test_resync_de_tracks_so_expira_o_album_afetado(app, test_db):
+    """Depois do upsert, album.tracks é relido, mas o resto da sessão (ex: o artista) continua carregado."""
+    with app.app_context():
+        sp = MagicMock()
+        sp.album.return_value = _fake_album_data()
+        sp.artist.return_value = _fake_artist_data()
+        album = SpotifySyncService.sync_album('album_123', sp)
+        test_db.session.commit()
+        artista = Artist.query.first()
+        assert len(album.tracks) == 2
+
+        novo = _fake_album_data()
+        novo['tracks']['items'] = novo['tracks']['items'][:1]
+        SpotifySyncService._sync_tracks(album, novo['tracks'], sp)
+
+        assert 'name' in artista.__dict__
+        assert 'tracks' not in album.__dict__
+        assert [t.spotify_track_id for t in album.tracks] == ['track_1']
@@ -1,8 +1,12 @@
 import pytest
 from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from sqlalchemy import event
 from app.services.stats_service import StatsService
+from app.services.review_service import ReviewService
 from app.models.review import AlbumReview
 from app.models.user import User
+from app.utils import get_monthly_summary
 
 def test_streak_zero_sem_reviews(app, user_mock):
     """Se o usuário não tem nenhuma review no banco, a streak deve ser 0."""
@@ -54,4 +58,136 @@ def test_streak_quebrada_por_esquecimento(app, test_db, user_mock):
         
         assert streak == 0
         assert updated_user.current_streak == 0
-        assert updated_user.longest_streak == 5
\ No newline at end of file
+        assert updated_user.longest_streak == 5
+
+def test_resumo_mensal_em_uma_consulta(app, test_db, user_mock):
+    """Total, média, melhor álbum e lista da playlist saem de uma única ida ao banco."""
+    with app.app_context():
+        notas = [("alb_bom", 4.5, 5), ("alb_top", 9.0, 10), ("alb_empate", 9.0, 2), ("alb_fraco", 2.0, 20)]
+        test_db.session.add_all([
+            AlbumReview(user_id=user_mock.id, spotify_album_id=album, album_name=album, artist_name="A",
+                        average_score=nota, created_at=datetime(2026, 4, dia))
+            for album, nota, dia in notas
+        ])
+        # Fora do mês: não entra em nada
+        test_db.session.add(AlbumReview(user_id=user_mock.id, spotify_album_id="alb_maio", album_name="M",
+                                        artist_name="A", average_score=10.0, created_at=datetime(2026, 5, 1)))
+        test_db.session.commit()
+
+        consultas = []
+        contar = lambda conn, cursor, statement, *args: consultas.append(statement)
+        event.listen(test_db.engine, 'before_cursor_execute', contar)
+        try:
+            resumo = get_monthly_summary(str(user_mock.id), 4, 2026, test_db.session)
+        finally:
+            event.remove(test_db.engine, 'before_cursor_execute', contar)
+
+        assert len(consultas) == 1
+        assert resumo["total_reviews"] == 4
+        assert resumo["average_rating"] == 6.12
+        # Empate em 9.0: vence a review mais recente
+        assert resumo["best_album_id"] == "alb_top"
+        assert resumo["best_rating"] == 9.0
+        assert sorted(resumo["top_album_ids"]) == ["alb_bom", "alb_empate", "alb_top"]
+
+        assert get_monthly_summary(str(user_mock.id), 6, 2026, test_db.session) is None
+
+def _review_no_dia(test_db, user, dia, album_id):
+    """Cria a review e registra o dia na streak como o ReviewService faz."""
+    review = AlbumReview(user_id=user.id, spotify_album_id=album_id, album_name="A", artist_name="A", created_at=dia)
+    test_db.session.add(review)
+    test_db.session.flush()
+    StatsService.register_review_day(user, review)
+    test_db.session.commit()
+    return review
+
+def test_streak_incremental_nao_rele_o_historico(app, test_db, user_mock):
+    """Com o último dia ativo conhecido, emendar um dia novo não consulta as reviews antigas."""
+    with app.app_context():
+        user = test_db.session.get(User, user_mock.id)
+        hoje = datetime.now(timezone.utc)
+        for dias_atras in (3, 2, 1):
+            _review_no_dia(test_db, user, hoje - timedelta(days=dias_atras), f"id{dias_atras}")
+        assert (user.current_streak, user.longest_streak) == (3, 3)
+
+        review = AlbumReview(user_id=user.id, spotify_album_id="hoje", album_name="A", artist_name="A", created_at=hoje)
+        test_db.session.add(review)
+        test_db.session.flush()
+
+        consultas = []
+        contar = lambda conn, cursor, statement, *args: consultas.append(statement)
+        event.listen(test_db.engine, 'before_cursor_execute', contar)
+        try:
+            StatsService.register_review_day(user, review)
+        finally:
+            event.remove(test_db.engine, 'before_cursor_execute', contar)
+        test_db.session.commit()
+
+        assert consultas == []
+        assert (user.current_streak, user.longest_streak) == (4, 4)
+
+def test_apagar_dia_do_meio_corrige_a_maior_streak(app, test_db, user_mock):
+    """Apagar a única review de um dia quebra a sequência, e a maior streak desce junto."""
+    with app.app_context():
+        user = test_db.session.get(User, user_mock.id)
+        # Meio-dia fixo: a review 'extra' (1h antes de ontem) nunca cai em anteontem
+        hoje = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+        reviews = {dias_atras: _review_no_dia(test_db, user, hoje - timedelta(days=dias_atras), f"id{dias_atras}") for dias_atras in (4, 3, 2, 1, 0)}
+        # Um dia com duas reviews: apagar uma delas não muda nada
+        _review_no_dia(test_db, user, hoje - timedelta(days=1, hours=1), "extra")
+        assert (user.current_streak, user.longest_streak) == (5, 5)
+
+        ReviewService.delete_review(user, reviews[1].id)
+        assert (user.current_streak, user.longest_streak) == (5, 5)
+
+        ReviewService.delete_review(user, reviews[2].id)
+        assert (user.current_streak, user.longest_streak) == (2, 2)
+
+def test_streak_conta_os_dias_no_fuso_do_usuario(app, test_db, user_mock):
+    """01:00 UTC ainda é o dia anterior em São Paulo: duas reviews viram dois dias seguidos."""
+    with app.app_context():
+        user = test_db.session.get(User, user_mock.id)
+        user.timezone = 'America/Sao_Paulo'
+        hoje = datetime.now(timezone.utc).replace(hour=15, minute=0, second=0, microsecond=0)
+
+        _review_no_dia(test_db, user, hoje - timedelta(hours=14), "madrugada_utc")
+        _review_no_dia(test_db, user, hoje, "tarde")
+
+        assert user.current_streak == 2
+
+def test_review_retroativa_emenda_sequencias_sem_reler_o_historico(app, test_db, user_mock):
+    """Preencher o buraco entre duas sequências soma as duas lendo só a vizinhança do dia."""
+    with app.app_context():
+        user = test_db.session.get(User, user_mock.id)
+        hoje = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+        for dias_atras in (5, 4, 2, 1, 0):
+            _review_no_dia(test_db, user, hoje - timedelta(days=dias_atras), f"id{dias_atras}")
+        assert (user.current_streak, user.longest_streak) == (3, 3)
+
+        with patch.object(StatsService, '_recompute_streak') as mock_recompute:
+            _review_no_dia(test_db, user, hoje - timedelta(days=3), "buraco")
+
+        mock_recompute.assert_not_called()
+        assert (user.current_streak, user.longest_streak) == (6, 6)
+
+def test_apagar_ultimo_dia_fora_da_maior_streak_nao_rele_o_historico(app, test_db, user_mock):
+    """Fora da maior sequência, apagar o último dia ativo só recua a streak atual."""
+    with app.app_context():
+        user = test_db.session.get(User, user_mock.id)
+        hoje = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+        for dias_atras in (10, 9, 8, 7, 6):
+            _review_no_dia(test_db, user, hoje - timedelta(days=dias_atras), f"id{dias_atras}")
+        ontem = _review_no_dia(test_db, user, hoje - timedelta(days=1), "ontem")
+        de_hoje = _review_no_dia(test_db, user, hoje, "hoje")
+        assert (user.current_streak, user.longest_streak) == (2, 5)
+
+        with patch.object(StatsService, '_recompute_streak') as mock_recompute:
+            ReviewService.delete_review(user, de_hoje.id)
+            assert (user.current_streak, user.longest_streak) == (1, 5)
+            assert user.last_review_date == (hoje - timedelta(days=1)).date()
+
+            ReviewService.delete_review(user, ontem.id)
+            assert (user.current_streak, user.longest_streak) == (0, 5)
+            assert user.last_review_date == (hoje - timedelta(days=6)).date()
+
+        mock_recompute.assert_not_called()
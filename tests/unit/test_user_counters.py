@@ -0,0 +1,64 @@
+from sqlalchemy import event
+from app.models import AlbumReview, User
+from app.schemas import UserProfile, PostCreate
+from app.services.blog_service import BlogService
+from app.services.interaction_service import InteractionService
+from app.services.user_service import UserService
+
+def test_contadores_acompanham_as_escritas(app, test_db, user_mock):
+    """Post, comentário e voto mexem nos contadores do autor, e desfazer desconta."""
+    with app.app_context():
+        autor = User(spotify_id="autor", display_name="Autor")
+        test_db.session.add(autor)
+        review = AlbumReview(user_id=user_mock.id, spotify_album_id="alb1", album_name="Álbum", artist_name="Artista")
+        test_db.session.add(review)
+        test_db.session.commit()
+        autor_id, review_id = str(autor.id), str(review.id)
+
+        BlogService.create_post(autor, PostCreate(title="Meu primeiro post", content="Texto do post"))
+        comentario = InteractionService.add_comment(autor_id, review_id, "review", "Boa escolha!")
+        InteractionService.toggle_vote(autor_id, review_id, "review", 1)
+        # Trocar o voto não cria outro
+        InteractionService.toggle_vote(autor_id, review_id, "review", -1)
+
+        autor = test_db.session.get(User, autor.id)
+        assert (autor.blog_post_count, autor.comment_count, autor.vote_count) == (1, 1, 1)
+
+        InteractionService.delete_comment(autor_id, str(comentario.id))
+        InteractionService.toggle_vote(autor_id, review_id, "review", -1)
+        test_db.session.refresh(autor)
+        assert (autor.comment_count, autor.vote_count) == (0, 0)
+
+def test_perfil_com_ranks_nao_consulta_o_banco(app, test_db, user_mock):
+    """Serializar o perfil (contadores + ranks) só lê o que já veio na linha do usuário."""
+    with app.app_context():
+        user = test_db.session.get(User, user_mock.id)
+        user.review_count = 120
+        test_db.session.commit()
+        test_db.session.refresh(user)
+
+        consultas = []
+        contar = lambda conn, cursor, statement, *args: consultas.append(statement)
+        event.listen(test_db.engine, 'before_cursor_execute', contar)
+        try:
+            perfil = UserProfile.model_validate(user)
+        finally:
+            event.remove(test_db.engine, 'before_cursor_execute', contar)
+
+        assert consultas == []
+        assert perfil.review_count == 120
+        assert 'review' in perfil.ranks
+
+def test_reconciliacao_corrige_contadores_divergentes(app, test_db, user_mock):
+    with app.app_context():
+        test_db.session.add(AlbumReview(user_id=user_mock.id, spotify_album_id="alb1", album_name="Álbum", artist_name="Artista"))
+        user = test_db.session.get(User, user_mock.id)
+        user.vote_count = 9
+        test_db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=['maintenance', 'reconcile-user-counters'])
+        assert "1 usuário(s) corrigido(s)" in result.output
+
+        test_db.session.refresh(user)
+        assert (user.review_count, user.vote_count) == (1, 0)
+        assert UserService.reconcile_counters() == 0
@@ -0,0 +1,95 @@
+from sqlalchemy import event
+from app.models import AlbumReview, UserPlatinum, UserStats
+from app.services.review_service import ReviewService
+from app.services.stats_service import StatsService
+from app.services.user_stats_service import UserStatsService
+
+def _review(test_db, user, album_id, artist, score, tier, is_private=False):
+    """Cria a review e atualiza o retrato como o ReviewService faz."""
+    review = AlbumReview(
+        user_id=user.id, spotify_album_id=album_id, album_name=f"Álbum {album_id}",
+        artist_name=artist, is_private=is_private, average_score=score, tier=tier
+    )
+    test_db.session.add(review)
+    test_db.session.flush()
+    UserStatsService.record_review(review)
+    test_db.session.commit()
+    return review
+
+def test_retrato_acompanha_reviews_e_platinas(app, test_db, user_mock):
+    """Dono e visitante veem retratos diferentes, e o incremental bate com o recalculado."""
+    with app.app_context():
+        user_id = str(user_mock.id)
+        _review(test_db, user_mock, "alb1", "Radiohead", 9.8, "S")
+        _review(test_db, user_mock, "alb2", "Radiohead", 8.0, "A")
+        secreta = _review(test_db, user_mock, "alb3", "Segredo", 2.0, "F", is_private=True)
+        test_db.session.add(UserPlatinum(user_id=user_mock.id, spotify_artist_id="radiohead", artist_name="Radiohead"))
+        UserStatsService.record_platinum(user_mock.id, 1)
+        test_db.session.commit()
+
+        dono = StatsService.get_user_stats(user_id, request_user_id=user_id)
+        assert dono["overview"]["total_reviews"] == 3
+        assert dono["overview"]["total_artists_reviewed"] == 2
+        assert dono["overview"]["total_platinums"] == 1
+        assert dono["overview"]["average_score"] == 6.6
+        assert dono["tier_distribution"]["F"] == 1
+        assert dono["top_artists"][0] == {"name": "Radiohead", "count": 2}
+
+        visitante = StatsService.get_user_stats(user_id, request_user_id=None)
+        assert visitante["overview"]["total_reviews"] == 2
+        assert visitante["overview"]["total_artists_reviewed"] == 1
+        assert visitante["tier_distribution"]["F"] == 0
+
+        # Tornar pública mexe nos contadores e nos artistas do retrato público
+        ReviewService.update_review(user_mock, secreta.id, {"is_private": False})
+        visitante = StatsService.get_user_stats(user_id, request_user_id=None)
+        assert visitante["overview"]["total_reviews"] == 3
+        assert visitante["overview"]["total_artists_reviewed"] == 2
+
+        assert UserStatsService.check() == []
+
+def test_perfil_e_uma_leitura_so(app, test_db, user_mock):
+    """Com o retrato pronto, as estatísticas do perfil saem de um único SELECT."""
+    with app.app_context():
+        _review(test_db, user_mock, "alb1", "Radiohead", 9.8, "S")
+        user_id = str(user_mock.id)
+
+        consultas = []
+        contar = lambda conn, cursor, statement, *args: consultas.append(statement)
+        event.listen(test_db.engine, 'before_cursor_execute', contar)
+        try:
+            StatsService.get_user_stats(user_id, request_user_id=user_id)
+        finally:
+            event.remove(test_db.engine, 'before_cursor_execute', contar)
+
+        assert len(consultas) == 1
+        assert "user_stats" in consultas[0]
+
+def test_usuario_sem_retrato_e_recalculado_na_leitura(app, test_db, user_mock):
+    """Reviews anteriores à tabela: a primeira visita ao perfil monta o retrato."""
+    with app.app_context():
+        test_db.session.add(AlbumReview(
+            user_id=user_mock.id, spotify_album_id="antigo", album_name="Antigo",
+            artist_name="Artista", average_score=7.0, tier="B"
+        ))
+        test_db.session.commit()
+
+        stats = StatsService.get_user_stats(str(user_mock.id), request_user_id=None)
+        assert stats["overview"]["total_reviews"] == 1
+        assert UserStats.query.filter_by(user_id=user_mock.id).count() == 2
+
+def test_cli_de_consistencia_detecta_e_corrige(app, test_db, user_mock):
+    with app.app_context():
+        _review(test_db, user_mock, "alb1", "Radiohead", 9.8, "S")
+        retrato = test_db.session.get(UserStats, (user_mock.id, False))
+        retrato.review_count = 42
+        test_db.session.commit()
+
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=['maintenance', 'check-user-stats'])
+        assert result.exit_code == 1
+        assert "review_count = 42, esperado 1" in result.output
+
+        result = runner.invoke(args=['maintenance', 'check-user-stats', '--fix'])
+        assert result.exit_code == 0
+        assert UserStatsService.check() == []
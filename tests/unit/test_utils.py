@@ -1,3 +1,12 @@
+import threading
+import pytest
+import fakeredis
+from unittest.mock import patch
+from app.exceptions import UnsupportedDatabaseError
+from app.models import Artist
+from app.utils import bulk_upsert, metrics_util, singleflight_util
+from app.utils.bulk_util import dialect_insert
+from app.utils.singleflight_util import SingleFlight
 from app.utils.title_builder import generate_monthly_title
 
 def test_generate_title_vazio_ou_nulo():
@@ -27,4 +36,92 @@ def test_generate_title_ignora_espacos_e_lixo():
     genres = ['  hip hop  ', 'HIP HOP', 'jazz']
     title = generate_monthly_title(genres)
     
-    assert "Hip Hop" in title
\ No newline at end of file
+    assert "Hip Hop" in title
+
+def test_single_flight_coalesce_chamadas_simultaneas(app):
+    """Várias threads pedindo a mesma chave devem gerar uma única execução."""
+    metrics_util.reset()
+    flight = SingleFlight('teste', use_redis=False)
+    liberar = threading.Event()
+    execucoes = []
+
+    def buscar():
+        execucoes.append(1)
+        liberar.wait(2)
+        return {'id': 'album_1'}
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(flight.do('album_1', buscar))) for _ in range(5)]
+    for t in threads:
+        t.start()
+
+    # Espera todas entrarem antes de liberar o líder
+    for _ in range(100):
+        if metrics_util.get_counter('singleflight.teste.coalesced') == 4:
+            break
+        threading.Event().wait(0.01)
+    liberar.set()
+    for t in threads:
+        t.join()
+
+    assert len(execucoes) == 1
+    assert resultados == [{'id': 'album_1'}] * 5
+    assert metrics_util.get_counter('singleflight.teste.coalesced') == 4
+
+def test_single_flight_entre_workers_usa_o_resultado_publicado(app):
+    """Dois workers (instâncias separadas, mesmo Redis) buscando a mesma chave: uma só ida ao Spotify."""
+    metrics_util.reset()
+    redis_falso = fakeredis.FakeRedis()
+    worker_a = SingleFlight('teste.remoto', share_result=True)
+    worker_b = SingleFlight('teste.remoto', share_result=True)
+    liberar = threading.Event()
+    chamadas_spotify = []
+
+    def buscar_no_spotify():
+        chamadas_spotify.append(1)
+        liberar.wait(2)
+        return {'id': 'album_1', 'name': 'Álbum'}
+
+    resultados = {}
+    with patch.object(singleflight_util, 'get_redis', return_value=redis_falso):
+        lider = threading.Thread(target=lambda: resultados.update(a=worker_a.do('album_1', buscar_no_spotify)))
+        lider.start()
+        for _ in range(100):
+            if chamadas_spotify:
+                break
+            threading.Event().wait(0.01)
+
+        seguidor = threading.Thread(target=lambda: resultados.update(b=worker_b.do('album_1', buscar_no_spotify)))
+        seguidor.start()
+        for _ in range(100):
+            if metrics_util.get_counter('singleflight.teste.remoto.remote_waits') == 1:
+                break
+            threading.Event().wait(0.01)
+
+        # O líder termina e solta a trava antes de commitar; o seguidor não pode ir ao Spotify de novo
+        liberar.set()
+        lider.join()
+        seguidor.join()
+
+    assert len(chamadas_spotify) == 1
+    assert resultados['a'] == resultados['b'] == {'id': 'album_1', 'name': 'Álbum'}
+    assert metrics_util.get_counter('singleflight.teste.remoto.remote_shared') == 1
+
+def test_bulk_upsert_sem_on_conflict_le_e_depois_grava(app, test_db):
+    """Em banco sem ON CONFLICT, insere as chaves novas e atualiza só as que mudaram."""
+    test_db.session.add(Artist(spotify_artist_id='ar1', name='Antigo'))
+    test_db.session.commit()
+
+    with patch('app.utils.bulk_util._dialect_name', return_value='mysql'):
+        with pytest.raises(UnsupportedDatabaseError):
+            dialect_insert(Artist)
+
+        total = bulk_upsert(
+            Artist,
+            [{'spotify_artist_id': 'ar1', 'name': 'Novo'}, {'spotify_artist_id': 'ar2', 'name': 'Outro'}],
+            index_elements=['spotify_artist_id'], update_columns=['name']
+        )
+    test_db.session.expire_all()
+
+    assert total == 2
+    assert {a.spotify_artist_id: a.name for a in Artist.query.all()} == {'ar1': 'Novo', 'ar2': 'Outro'}